@@ -19,12 +19,16 @@
 
 import os
 import logging
+from multiprocessing.pool import ThreadPool
 from optparse import make_option
 
 os.environ['DJANGO_SETTINGS_MODULE'] = 'pootle.settings'
 
+from django.db import connection
 
 from pootle_app.management.commands import PootleCommand
+from pootle_misc import versioncontrol
+from pootle_store.util import statssum
 
 
 class Command(PootleCommand):
@@ -32,6 +36,13 @@ class Command(PootleCommand):
     option_list = PootleCommand.option_list + (
         make_option('--user', default='admin',
                     help="Username to list in the commit message"),
+        make_option('--single-commit', action='store_true',
+                    dest='single_commit', default=False,
+                    help="Commit all the translation projects of each "
+                         "project at once"),
+        make_option('--jobs', action='store', dest='jobs', type=int,
+                    default=1,
+                    help="Number of projects to commit in parallel"),
         )
 
     def handle_noargs(self, **options):
@@ -41,11 +52,79 @@ class Command(PootleCommand):
         except User.DoesNotExist:
             return "Unknown user (%s)\n" % options['user']
 
+        self.options = options
+        #: Translation projects to commit, grouped by project
+        self.batches = []
+        self.batched = options['single_commit'] or options['jobs'] > 1
+
         super(Command, self).handle_noargs(**options)
 
+        if not self.batched:
+            return
+
+        if options['jobs'] > 1:
+            pool = ThreadPool(options['jobs'])
+            pool.map(self.commit_batch, self.batches)
+            pool.close()
+        else:
+            map(self.commit_batch, self.batches)
+
     def handle_translation_project(self, tp, **options):
         """Commit to VCS all stores referred to by the translation project
 
         The translation project may be limited by language, filename, etc.
         """
-        tp.commit_dir(self.user, tp.directory)
+        if not self.batched:
+            tp.commit_dir(self.user, tp.directory)
+            return
+
+        if (not self.batches or
+            self.batches[-1][0].project_id != tp.project_id):
+            self.batches.append([])
+        self.batches[-1].append(tp)
+
+    def commit_batch(self, tps):
+        """Commits the translation projects in `tps`, which belong to the
+        same project.
+        """
+        single_commit = self.options['single_commit']
+        try:
+            if single_commit:
+                self.commit_translation_projects(tps)
+            else:
+                for tp in tps:
+                    tp.commit_dir(self.user, tp.directory)
+        except Exception as e:
+            logging.error(u"Failed to run %s over %s:\n%s",
+                          self.name, tps[0].project, e)
+        finally:
+            if self.options['jobs'] > 1:
+                # Each thread has its own database connection
+                connection.close()
+
+    def commit_translation_projects(self, tps):
+        """Commits the changed files of all `tps` in a single commit."""
+        project = tps[0].project
+        author, message = tps[0].get_commit_message(self.user, statssum(tps))
+
+        prepared = []
+        filestocommit = []
+        for tp in tps:
+            stores, files = tp.prepare_commit(tp.directory, author, message)
+            prepared.append((tp, stores))
+            filestocommit.extend(files)
+
+        success = True
+        if filestocommit:
+            logging.info(u"Committing %d files of %s",
+                         len(filestocommit), project)
+            try:
+                versioncontrol.add_files(project.get_real_path(),
+                                         filestocommit, message, author)
+            except Exception as e:
+                logging.error(u"Failed to commit: %s", e)
+                success = False
+
+        for tp, stores in prepared:
+            tp.finish_commit(self.user, tp.directory, stores,
+                             tp.getquickstats(), success)
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013 Zuza Software Foundation
+#
+# This file is part of Pootle.
+#
+# Pootle is free software; you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 2 of the License, or (at your option) any later
+# version.
+#
+# Pootle is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# Pootle; if not, see <http://www.gnu.org/licenses/>.
+
+import os
+os.environ['DJANGO_SETTINGS_MODULE'] = 'pootle.settings'
+
+from optparse import make_option
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import CommandError, NoArgsCommand
+from django.test.client import RequestFactory
+
+from pootle_language.models import Language
+from pootle_misc.explain import explain, record_queries
+from pootle_profile.models import get_profile
+from pootle_store.models import Unit
+from pootle_store.util import OBSOLETE, calculate_stats, find_altsrcs
+from pootle_store.views import (UNITS_ORDERING, _filter_ctx_units,
+                                get_step_query)
+from pootle_translationproject.models import TranslationProject
+
+
+#: Editor filters whose queries are explained
+STEP_FILTERS = (
+    {'filter': 'all'},
+    {'filter': 'incomplete'},
+    {'filter': 'suggestions'},
+    {'filter': 'user-submissions'},
+    {'filter': 'checks', 'checks': 'printf,variables'},
+)
+
+
+class Command(NoArgsCommand):
+    option_list = NoArgsCommand.option_list + (
+        make_option('--path', action='store', dest='pootle_path',
+                    help='Translation project to run the queries for, '
+                         'i.e. /af/tutorial/'),
+        make_option('--repeat', action='store', dest='repeat', type=int,
+                    default=3,
+                    help='Number of times each query is timed'),
+    )
+    help = "Print the query plans and timings of the editor's unit queries."
+
+    def handle_noargs(self, **options):
+        tps = TranslationProject.objects.exclude(language__code='templates')
+        if options['pootle_path']:
+            tps = tps.filter(pootle_path=options['pootle_path'])
+
+        try:
+            tp = tps[0]
+        except IndexError:
+            raise CommandError("No translation project to run queries for.")
+
+        tp.require_units()
+        units = list(Unit.objects.filter(store__translation_project=tp,
+                                         state__gt=OBSOLETE)
+                                 .select_related('store')
+                                 .order_by(*UNITS_ORDERING)[:10])
+        if not units:
+            raise CommandError("%s has no units." % tp.pootle_path)
+        # Pick a unit with some context around it
+        unit = units[-1]
+
+        for name, func in self.get_scenarios(tp, unit):
+            with record_queries() as queries:
+                func()
+
+            for sql, params in queries:
+                if not sql.lstrip().upper().startswith('SELECT'):
+                    continue
+
+                plan, timing = explain(sql, params, options['repeat'])
+                self.stdout.write("== %s (%.2f ms)\n%s\n%r\n" %
+                                  (name, timing, sql, tuple(params)))
+                for row in plan:
+                    self.stdout.write("  %s\n" % row)
+                self.stdout.write("\n")
+
+    def get_scenarios(self, tp, unit):
+        """Returns ``(name, function)`` tuples running the queries of the
+        editor on `tp`, with `unit` being the unit being edited.
+        """
+        store = unit.store
+        alt_src_langs = list(Language.objects.exclude(id=tp.language_id))
+        profile = get_profile(AnonymousUser())
+
+        scenarios = []
+        factory = RequestFactory()
+        for params in STEP_FILTERS:
+            def step_query(params=params):
+                request = factory.get(tp.pootle_path, params)
+                request.profile = profile
+                units_qs = Unit.objects.get_for_path(tp.pootle_path, profile)
+                list(get_step_query(request, units_qs)
+                     .order_by(*UNITS_ORDERING)[:10])
+            scenarios.append(('get_step_query %s' % params['filter'],
+                              step_query))
+
+        scenarios.extend([
+            ('_filter_ctx_units',
+             lambda: _filter_ctx_units(store.units, unit, 5)),
+            ('find_altsrcs',
+             lambda: list(find_altsrcs(unit, alt_src_langs, store=store,
+                                       project=tp.project))),
+            ('calculate_stats',
+             lambda: calculate_stats(store.units)),
+        ])
+
+        return scenarios
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013 Zuza Software Foundation
+#
+# This file is part of Pootle.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+
+import os
+import logging
+from optparse import make_option
+
+os.environ['DJANGO_SETTINGS_MODULE'] = 'pootle.settings'
+
+from pootle_app.management.commands import PootleCommand
+from pootle_translationproject.export import export_translation_projects
+
+
+class Command(PootleCommand):
+    help = "Export the translation files of each project as a ZIP archive."
+    option_list = PootleCommand.option_list + (
+        make_option('--output-dir', action='store', dest='output_dir',
+                    default='.',
+                    help="Directory to write the archives to"),
+        make_option('--jobs', action='store', dest='jobs', type=int,
+                    default=4,
+                    help="Number of files to read in parallel"),
+        )
+
+    def handle_noargs(self, **options):
+        #: Translation projects to export, grouped by project
+        self.batches = []
+
+        super(Command, self).handle_noargs(**options)
+
+        for tps in self.batches:
+            project = tps[0].project
+            path = os.path.join(options['output_dir'], '%s.zip' % project.code)
+            logging.info(u"Exporting %s to %s", project, path)
+
+            archive = export_translation_projects(
+                    tps, lambda tp: tp.language.code, options['jobs'],
+            )
+            with open(path, 'wb') as f:
+                for chunk in archive:
+                    f.write(chunk)
+
+    def handle_translation_project(self, translation_project, **options):
+        if (not self.batches or
+            self.batches[-1][0].project_id != translation_project.project_id):
+            self.batches.append([])
+        self.batches[-1].append(translation_project)
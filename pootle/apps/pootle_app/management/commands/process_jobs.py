@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013 Zuza Software Foundation
+#
+# This file is part of Pootle.
+#
+# Pootle is free software; you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 2 of the License, or (at your option) any later
+# version.
+#
+# Pootle is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# Pootle; if not, see <http://www.gnu.org/licenses/>.
+
+import logging
+import os
+import time
+os.environ['DJANGO_SETTINGS_MODULE'] = 'pootle.settings'
+
+from optparse import make_option
+
+from django.core.management.base import NoArgsCommand
+
+from pootle_misc.jobs import process_jobs
+
+
+class Command(NoArgsCommand):
+    option_list = NoArgsCommand.option_list + (
+        make_option('--batch-size', action='store', dest='batch_size',
+                    type=int, default=100,
+                    help='Number of jobs to process at once'),
+        make_option('--loop', action='store_true', dest='loop',
+                    default=False,
+                    help='Keep waiting for new jobs'),
+        make_option('--sleep', action='store', dest='sleep', type=int,
+                    default=5,
+                    help='Seconds to wait for new jobs when using --loop'),
+    )
+    help = "Run the jobs queued in the background."
+
+    def handle_noargs(self, **options):
+        verbosity = int(options.get('verbosity', 1))
+        debug_levels = {0: logging.ERROR, 1: logging.WARNING, 2: logging.DEBUG}
+        logging.getLogger().setLevel(debug_levels.get(verbosity,
+                                                      logging.DEBUG))
+
+        batch_size = options['batch_size']
+        while True:
+            if not process_jobs(batch_size) and not options['loop']:
+                break
+
+            if options['loop']:
+                time.sleep(options['sleep'])
@@ -22,6 +22,7 @@ import os
 os.environ['DJANGO_SETTINGS_MODULE'] = 'pootle.settings'
 
 from pootle_app.management.commands import PootleCommand
+from pootle_store.models import Unit
 
 class Command(PootleCommand):
     help = "Allow stats and text indices to be refreshed manually."
@@ -33,9 +34,13 @@ class Command(PootleCommand):
         translation_project.indexer
 
     def handle_all_stores(self, translation_project, **options):
+        Unit.objects.refresh_suggestion_counts(
+            Unit.objects.filter(store__translation_project=translation_project)
+        )
         translation_project.getcompletestats()
         translation_project.getquickstats()
 
     def handle_store(self, store, **options):
+        Unit.objects.refresh_suggestion_counts(store.unit_set.all())
         store.getcompletestats()
         store.getquickstats()
@@ -19,12 +19,32 @@
 # along with this program; if not, see <http://www.gnu.org/licenses/>.
 
 import os
+from optparse import make_option
+
 os.environ['DJANGO_SETTINGS_MODULE'] = 'pootle.settings'
 
 from pootle_app.management.commands import PootleCommand
 
 class Command(PootleCommand):
     help = "Mass update against templates."
+    option_list = PootleCommand.option_list + (
+        make_option('--jobs', action='store', dest='jobs', type=int,
+                    default=1,
+                    help="Number of translation projects to update in "
+                         "parallel"),
+        )
+
+    def handle_noargs(self, **options):
+        #: Translation projects to update, grouped by project
+        self.batches = []
+
+        super(Command, self).handle_noargs(**options)
+
+        for tps in self.batches:
+            tps[0].project.update_against_templates(tps, options['jobs'])
 
     def handle_translation_project(self, translation_project, **options):
-        translation_project.update_against_templates()
+        if (not self.batches or
+            self.batches[-1][0].project_id != translation_project.project_id):
+            self.batches.append([])
+        self.batches[-1].append(translation_project)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013 Zuza Software Foundation
+#
+# This file is part of Pootle.
+#
+# Pootle is free software; you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 2 of the License, or (at your option) any later
+# version.
+#
+# Pootle is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# Pootle; if not, see <http://www.gnu.org/licenses/>.
+
+import logging
+import os
+os.environ['DJANGO_SETTINGS_MODULE'] = 'pootle.settings'
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from pootle_app.management.commands import PootleCommand
+from pootle_store.models import UnitTrigram, use_trigram_table
+
+
+#: Unit fields covered by the native PostgreSQL trigram indexes
+NATIVE_INDEX_FIELDS = ('source_f', 'target_f', 'developer_comment',
+                       'translator_comment', 'locations')
+
+
+class Command(PootleCommand):
+    help = "Build the trigram index used to speed up exact searches."
+
+    def handle_noargs(self, **options):
+        if not settings.SEARCH_TRIGRAM_INDEX:
+            logging.error(u"SEARCH_TRIGRAM_INDEX is disabled, nothing to do.")
+            return
+
+        if use_trigram_table():
+            super(Command, self).handle_noargs(**options)
+        else:
+            self.create_native_indexes()
+
+    def create_native_indexes(self):
+        """Creates ``pg_trgm`` GIN indexes for case sensitive and case
+        insensitive lookups over the searchable unit fields.
+        """
+        cursor = connection.cursor()
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        cursor.execute("SELECT indexname FROM pg_indexes "
+                       "WHERE tablename = 'pootle_store_unit'")
+        existing = set(row[0] for row in cursor.fetchall())
+
+        for field in NATIVE_INDEX_FIELDS:
+            for name, expression in (
+                    ('pootle_store_unit_%s_trgm', '"%s"'),
+                    ('pootle_store_unit_%s_upper_trgm', 'UPPER("%s")')):
+                name = name % field
+                if name in existing:
+                    continue
+
+                logging.info(u"Creating index %s", name)
+                cursor.execute(
+                    'CREATE INDEX "%s" ON "pootle_store_unit" '
+                    'USING gin (%s gin_trgm_ops)' % (name, expression % field)
+                )
+
+        transaction.commit_unless_managed()
+
+    def handle_store(self, store, **options):
+        for unit in store.unit_set.iterator():
+            UnitTrigram.objects.update_for_unit(unit)
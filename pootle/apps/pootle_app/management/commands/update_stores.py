@@ -52,7 +52,7 @@ class Command(ModifiedSinceMixin, PootleCommand):
 
     def handle_translation_project(self, translation_project, **options):
         logging.info(u"Scanning for new files in %s", translation_project)
-        translation_project.scan_files()
+        translation_project.scan_files(force=options.get('force', False))
 
     def handle_store(self, store, **options):
         keep = options.get('keep', False)
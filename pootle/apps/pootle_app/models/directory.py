@@ -17,16 +17,21 @@
 # You should have received a copy of the GNU General Public License along with
 # Pootle; if not, see <http://www.gnu.org/licenses/>.
 
+from django.core.cache import cache
 from django.core.urlresolvers import reverse
 from django.db import models
+from django.db.models import Q
+from django.utils.encoding import iri_to_uri
 
-from pootle.core.url_helpers import get_editor_filter, split_pootle_path
+from pootle.core.url_helpers import (get_ancestor_paths, get_editor_filter,
+                                     split_pootle_path)
 from pootle_misc.aggregate import max_column
 from pootle_misc.baseurl import l
 from pootle_misc.util import cached_property, dictsum, getfromcache
-from pootle_store.models import Suggestion, Unit
+from pootle_store.models import Suggestion
 from pootle_store.util import (empty_quickstats, empty_completestats, statssum,
-                               completestatssum, suggestions_sum)
+                               completestatssum, get_path_lookups,
+                               suggestions_sum)
 
 
 class DirectoryManager(models.Manager):
@@ -45,6 +50,34 @@ class DirectoryManager(models.Manager):
         return self.get(pootle_path='/projects/')
     projects = property(_get_projects)
 
+    def update_activity(self, pootle_path, mtime=None, submission=None):
+        """Records a change within `pootle_path` in the directories
+        containing it, up to its translation project's directory.
+
+        Languages, projects and the root are left alone so their rows don't
+        become contention points, see :meth:`Directory.get_mtime`.
+
+        :param mtime: Modification time of the changed units.
+        :param submission: A new
+            :cls:`~pootle_statistics.models.Submission`.
+        """
+        ancestor_paths = get_ancestor_paths(pootle_path)
+        paths = [path for path in ancestor_paths
+                 if path.count(u'/') >= 3 and
+                    not path.startswith(u'/projects/')]
+        directories = self.filter(pootle_path__in=paths).order_by()
+
+        if mtime is not None:
+            directories.filter(Q(mtime=None) | Q(mtime__lt=mtime)) \
+                       .update(mtime=mtime)
+            cache.delete_many([iri_to_uri(path + u':get_mtime')
+                               for path in ancestor_paths])
+
+        if submission is not None:
+            directories.filter(Q(last_submission=None) |
+                               Q(last_submission__lt=submission.id)) \
+                       .update(last_submission=submission)
+
 
 class Directory(models.Model):
 
@@ -55,6 +88,14 @@ class Directory(models.Model):
                                null=True, db_index=True)
     pootle_path = models.CharField(max_length=255, null=False, db_index=True)
 
+    #: Latest modification time of the units within this directory
+    mtime = models.DateTimeField(null=True, editable=False)
+    #: Latest submission made within this directory
+    last_submission = models.ForeignKey('pootle_statistics.Submission',
+                                        null=True, related_name='+',
+                                        editable=False,
+                                        on_delete=models.SET_NULL)
+
     objects = DirectoryManager()
 
     class Meta:
@@ -119,15 +160,30 @@ class Directory(models.Model):
 
     @getfromcache
     def get_mtime(self):
-        criteria = {
-            'store__pootle_path__startswith': self.pootle_path,
-        }
-        return max_column(Unit.objects.filter(**criteria), 'mtime', None)
+        if (self.pootle_path.count(u'/') < 3 or
+            self.pootle_path.startswith(u'/projects/')):
+            # Languages, projects and the root aggregate the translation
+            # projects below them
+            from pootle_translationproject.models import TranslationProject
+
+            translation_projects = TranslationProject.objects.all()
+            if self.is_project():
+                translation_projects = translation_projects.filter(
+                    project__directory=self,
+                )
+            elif self.is_language() and self.pootle_path != u'/projects/':
+                translation_projects = translation_projects.filter(
+                    language__directory=self,
+                )
+
+            return max_column(translation_projects, 'directory__mtime', None)
+
+        return self.mtime
 
     def _get_stores(self):
         """Queryset with all descending stores."""
         from pootle_store.models import Store
-        return Store.objects.filter(pootle_path__startswith=self.pootle_path)
+        return Store.objects.filter(**get_path_lookups(self.pootle_path))
     stores = property(_get_stores)
 
     @cached_property
@@ -209,7 +265,8 @@ class Directory(models.Model):
     def get_suggestion_count(self):
         """check if any child store has suggestions"""
         return Suggestion.objects.filter(
-            unit__store__pootle_path__startswith=self.pootle_path).count()
+            **get_path_lookups(self.pootle_path, prefix='unit__store__')
+        ).count()
 
     def is_language(self):
         """does this directory point at a language"""
@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013 Zuza Software Foundation
+#
+# This file is part of Pootle.
+#
+# Pootle is free software; you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 2 of the License, or (at your option) any later
+# version.
+#
+# Pootle is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# Pootle; if not, see <http://www.gnu.org/licenses/>.
+
+from django.db import models
+
+
+class Job(models.Model):
+    """Side effect waiting to be run in the background by the
+    ``process_jobs`` command, see :mod:`pootle_misc.jobs`.
+    """
+
+    class Meta:
+        app_label = "pootle_app"
+        ordering = ['id']
+
+    #: Dotted path to the function handling a batch of jobs
+    handler = models.CharField(max_length=255, db_index=True)
+    #: JSON-encoded keyword arguments for the handler
+    data = models.TextField()
+    creation_time = models.DateTimeField(auto_now_add=True)
+
+    #: Token of the worker currently processing the job, if any
+    owner = models.CharField(max_length=32, blank=True, db_index=True)
+    claim_time = models.DateTimeField(null=True)
+    #: Number of failed attempts and the error from the last one
+    attempts = models.SmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+
+    def __unicode__(self):
+        return u"%s (%d)" % (self.handler, self.id)
@@ -19,13 +19,20 @@
 # along with translate; if not, write to the Free Software
 # Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
 
+import threading
+import uuid
+
 from django.db import models
+from django.db.models import Q
+from django.db.models.signals import m2m_changed
 from django.conf import settings
 from django.contrib.auth.models import Permission
 from django.contrib.contenttypes.models import ContentType
 from django.core.cache import cache
+from django.core.signals import request_started
 from django.utils.encoding import iri_to_uri
 
+from pootle.core.url_helpers import get_ancestor_paths
 from pootle_app.lib.util import RelatedManager
 
 
@@ -56,42 +63,122 @@ def get_pootle_permissions(codenames=None):
     return dict((permission.codename, permission) for permission in permissions)
 
 
-def get_permissions_by_username(username, directory):
-    pootle_path = directory.pootle_path
-    path_parts = filter(None, pootle_path.split('/'))
-    key = iri_to_uri('Permissions:%s' % username)
-    permissions_cache = cache.get(key, {})
-
-    if pootle_path not in permissions_cache:
-        try:
-            permissionset = PermissionSet.objects.filter(
-                directory__in=directory.trail(only_dirs=False),
-                profile__user__username=username) \
-                        .order_by('-directory__pootle_path')[0]
-        except IndexError:
-            permissionset = None
+#: Cache key holding the current version of the permission sets
+PERMISSIONS_VERSION_KEY = 'Permissions:version'
+
+#: Resolvers already used by the current request, with the permissions
+#: version they were loaded for, see :func:`get_resolver`
+_resolvers = threading.local()
+
+
+def get_permissions_version():
+    """Returns the version of the permission sets, which changes each time
+    any of them is modified.
+    """
+    version = cache.get(PERMISSIONS_VERSION_KEY)
+    if version is None:
+        version = uuid.uuid4().hex
+        if not cache.add(PERMISSIONS_VERSION_KEY, version,
+                         settings.OBJECT_CACHE_TIMEOUT):
+            version = cache.get(PERMISSIONS_VERSION_KEY, version)
+
+    return version
+
+
+def invalidate_permissions(**kwargs):
+    """Discards the cached permissions of all users."""
+    cache.set(PERMISSIONS_VERSION_KEY, uuid.uuid4().hex,
+              settings.OBJECT_CACHE_TIMEOUT)
+    clear_resolvers()
+
+
+def clear_resolvers(**kwargs):
+    _resolvers.by_username = {}
+
+request_started.connect(clear_resolvers)
+
+
+class PermissionResolver(object):
+    """Resolves the permissions of a user in any directory from all of the
+    user's permission sets, which are loaded at once.
+    """
+
+    def __init__(self, permission_sets):
+        #: Permissions dictionaries keyed by the directory's `pootle_path`
+        self.permission_sets = permission_sets
+
+    @classmethod
+    def load(cls, username):
+        permission_sets = {}
+        paths = {}
+        for pk, pootle_path in PermissionSet.objects.filter(
+                profile__user__username=username,
+            ).values_list('id', 'directory__pootle_path'):
+            permission_sets[pootle_path] = {}
+            paths[pk] = pootle_path
+
+        through = PermissionSet.positive_permissions.through
+        for row in through.objects.filter(permissionset__in=paths.keys()) \
+                                  .select_related('permission'):
+            permission = row.permission
+            pootle_path = paths[row.permissionset_id]
+            permission_sets[pootle_path][permission.codename] = permission
+
+        return cls(permission_sets)
+
+    def get_permissions(self, pootle_path):
+        """Returns the permissions dictionary applying to `pootle_path`, or
+        `None` if the user has no permissions there.
+
+        The permission set of the closest directory wins. Permissions at the
+        server or language level are overridden by the project ones.
+        """
+        path_parts = filter(None, pootle_path.split('/'))
+
+        permissions = None
+        depth = len(path_parts)
+        while depth >= 0:
+            path = u''.join(u'/' + part for part in path_parts[:depth]) + u'/'
+            if path in self.permission_sets:
+                permissions = self.permission_sets[path]
+                break
+            depth -= 1
 
         if (len(path_parts) > 1 and path_parts[0] != 'projects' and
-            (permissionset is None or
-            len(filter(None, permissionset.directory.pootle_path.split('/'))) < 2)):
-                # Active permission at language level or higher, check project
-                # level permission
-                try:
-                    project_path = '/projects/%s/' % path_parts[1]
-                    permissionset = PermissionSet.objects \
-                            .get(directory__pootle_path=project_path,
-                                 profile__user__username=username)
-                except PermissionSet.DoesNotExist:
-                    pass
+            depth < 2):
+            project_path = u'/projects/%s/' % path_parts[1]
+            permissions = self.permission_sets.get(project_path, permissions)
+
+        return permissions
+
+
+def get_resolver(username):
+    """Returns the :cls:`PermissionResolver` for `username`.
+
+    Resolvers are cached until any permission set changes, and kept in memory
+    for the rest of the request. Resolvers kept in memory are discarded too
+    once permissions change, so long running processes don't use stale ones.
+    """
+    if not hasattr(_resolvers, 'by_username'):
+        clear_resolvers()
 
-        if permissionset:
-            permissions_cache[pootle_path] = permissionset.to_dict()
-        else:
-            permissions_cache[pootle_path] = None
+    version = get_permissions_version()
+    known_version, resolver = _resolvers.by_username.get(username,
+                                                         (None, None))
+    if known_version != version:
+        key = iri_to_uri('Permissions:%s:%s' % (username, version))
+        resolver = cache.get(key)
+        if resolver is None:
+            resolver = PermissionResolver.load(username)
+            cache.set(key, resolver, settings.OBJECT_CACHE_TIMEOUT)
 
-        cache.set(key, permissions_cache, settings.OBJECT_CACHE_TIMEOUT)
+        _resolvers.by_username[username] = (version, resolver)
 
-    return permissions_cache[pootle_path]
+    return resolver
+
+
+def get_permissions_by_username(username, directory):
+    return get_resolver(username).get_permissions(directory.pootle_path)
 
 
 def get_matching_permissions(profile, directory, check_default=True):
@@ -136,6 +223,73 @@ def check_permission(permission_codename, request):
             permission_codename in request.permissions)
 
 
+def get_profiles_with_permission(permission_codename, directory,
+                                 check_default=True):
+    """Returns the profiles having the permission to perform
+    ``permission_codename`` in `directory`.
+
+    This gives the same results as calling :func:`check_profile_permission`
+    for every profile, but only the permission sets applying to `directory`
+    are loaded, all at once.
+    """
+    from pootle_profile.models import PootleProfile
+
+    codenames = ('administrate', permission_codename)
+
+    # Permission dictionaries by profile and directory, only holding the
+    # permissions that matter here
+    permission_sets = {}
+    set_keys = {}
+    for pk, profile_id, pootle_path in PermissionSet.objects.filter(
+            directory__pootle_path__in=get_ancestor_paths(directory.pootle_path),
+        ).values_list('id', 'profile', 'directory__pootle_path'):
+        permission_sets.setdefault(profile_id, {})[pootle_path] = {}
+        set_keys[pk] = (profile_id, pootle_path)
+
+    through = PermissionSet.positive_permissions.through
+    for pk, codename in through.objects.filter(
+            permissionset__in=set_keys.keys(),
+            permission__codename__in=codenames,
+        ).values_list('permissionset', 'permission__codename'):
+        profile_id, pootle_path = set_keys[pk]
+        permission_sets[profile_id][pootle_path][codename] = True
+
+    allowed = set()
+    denied = set()
+    for profile_id, profile_sets in permission_sets.iteritems():
+        permissions = PermissionResolver(profile_sets) \
+                .get_permissions(directory.pootle_path)
+        if permissions:
+            allowed.add(profile_id)
+        elif permissions is not None:
+            denied.add(profile_id)
+
+    profiles = PootleProfile.objects.all()
+    superusers = Q(user__is_superuser=True)
+
+    if check_default:
+        # Profiles without permissions of their own get the 'default' ones,
+        # or the 'nobody' ones if there aren't any
+        fallback_allowed = False
+        special_profiles = dict(PootleProfile.objects.filter(
+            user__username__in=('default', 'nobody'),
+        ).values_list('user__username', 'id'))
+        for username in ('default', 'nobody'):
+            profile_id = special_profiles.get(username)
+            if profile_id in allowed or profile_id in denied:
+                fallback_allowed = profile_id in allowed
+                break
+
+        if fallback_allowed:
+            if denied:
+                return profiles.filter(superusers | ~Q(id__in=denied))
+            return profiles
+
+    if allowed:
+        return profiles.filter(superusers | Q(id__in=allowed))
+    return profiles.filter(superusers)
+
+
 class PermissionSetManager(RelatedManager):
 
     def get_by_natural_key(self, username, pootle_path):
@@ -176,10 +330,12 @@ class PermissionSet(models.Model):
 
     def save(self, *args, **kwargs):
         super(PermissionSet, self).save(*args, **kwargs)
-        key = iri_to_uri('Permissions:%s' % self.profile.user.username)
-        cache.delete(key)
+        invalidate_permissions()
 
     def delete(self, *args, **kwargs):
         super(PermissionSet, self).delete(*args, **kwargs)
-        key = iri_to_uri('Permissions:%s' % self.profile.user.username)
-        cache.delete(key)
+        invalidate_permissions()
+
+
+m2m_changed.connect(invalidate_permissions,
+                    sender=PermissionSet.positive_permissions.through)
@@ -20,17 +20,22 @@
 # Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
 
 from django.db import models
+from django.db.models.signals import pre_save
 from django.utils.translation import ugettext_lazy as _
 
+from pootle.core.mixins import DirtyFieldsMixin
 from pootle_app.lib.util import RelatedManager
+from pootle_statistics.models import count_suggestion
 
-class Suggestion(models.Model):
+class Suggestion(DirtyFieldsMixin, models.Model):
 
     class Meta:
         app_label = "pootle_app"
 
     objects = RelatedManager()
 
+    tracked_fields = ('reviewer',)
+
     state_choices = [
         ('pending', _('Pending')),
         ('accepted', _('Accepted')),
@@ -51,3 +56,6 @@ class Suggestion(models.Model):
     reviewer = models.ForeignKey('pootle_profile.PootleProfile', null=True,
             related_name='reviewer', db_index=True)
     review_time = models.DateTimeField(null=True, db_index=True)
+
+
+pre_save.connect(count_suggestion, sender=Suggestion)
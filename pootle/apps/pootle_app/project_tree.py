@@ -18,13 +18,21 @@
 # You should have received a copy of the GNU General Public License
 # along with this program; if not, see <http://www.gnu.org/licenses/>.
 
+import copy
 import logging
 import os
 import re
 import shutil
+import threading
+from hashlib import md5
 
 from translate.lang import data as langdata
 
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction, DatabaseError
+from django.utils.encoding import smart_str
+
 from pootle_app.models.directory import Directory
 from pootle_language.models import Language
 from pootle_store.models import Store, PARSED
@@ -44,19 +52,54 @@ def language_match_filename(language_code, filename):
     return langdata.languagematch(language_code, name)
 
 
+def get_filename_language(path_name, language_codes=None):
+    """Returns the lowercased code of the language that :param:`path_name`
+    holds translations for, or ``None`` if it can't be told.
+
+    :param language_codes: lowercased codes of all the existing languages.
+        Defaults to the cached codes from the database.
+    """
+    if language_codes is None:
+        language_codes = Language.objects.get_codes()
+
+    name = os.path.splitext(os.path.basename(path_name))[0].lower()
+    if name in language_codes:
+        return name
+
+    detect = LANGCODE_POSTFIX_RE.split(name)
+    if len(detect) > 1:
+        return detect[1]
+
+    return None
+
+
 def direct_language_match_filename(language_code, path_name):
     name, ext = os.path.splitext(os.path.basename(path_name))
     if name == language_code or name.lower() == language_code.lower():
         return True
 
-    # check file doesn't match another language
-    if Language.objects.filter(code__iexact=name).count():
-        return False
+    return get_filename_language(path_name) == language_code.lower()
 
-    detect = LANGCODE_POSTFIX_RE.split(name)
-    return (len(detect) > 1 and
-            (detect[1] == language_code or
-             detect[1].lower() == language_code.lower()))
+
+def match_language_filenames(language_codes, filenames):
+    """Classifies :param:`filenames` in a single pass by the language they
+    hold translations for.
+
+    Matching is the same as in :func:`direct_language_match_filename`.
+
+    :return: A dictionary mapping each of :param:`language_codes` to the list
+        of its matching filenames.
+    """
+    all_codes = Language.objects.get_codes()
+    matches = dict((code, []) for code in language_codes)
+    lowercase_codes = dict((code.lower(), code) for code in language_codes)
+
+    for filename in filenames:
+        code = lowercase_codes.get(get_filename_language(filename, all_codes))
+        if code is not None:
+            matches[code].append(filename)
+
+    return matches
 
 
 def match_template_filename(project, filename):
@@ -183,10 +226,12 @@ def recursive_files_and_dirs(ignored_files, ext, real_dir, file_filter):
 def add_items(fs_items, db_items, create_db_item):
     """Add/remove the database items to correspond to the filesystem.
 
+    New items are not saved, so they can be inserted in bulk.
+
     :param fs_items: entries currently in the filesystem
     :param db_items: entries currently in the database
     :create_db_item: callable that will create a new db item with a given name
-    :return: list of all items, list of newly added items
+    :return: list of existing items, list of new items
     :rtype: tuple
     """
     items = []
@@ -204,44 +249,172 @@ def add_items(fs_items, db_items, create_db_item):
         items.append(db_items[name])
 
     for name in items_to_create:
-        item = create_db_item(name)
-        items.append(item)
-        new_items.append(item)
+        new_items.append(create_db_item(name))
+
+    return items, new_items
+
+
+def create_items(model, items):
+    """Inserts the new `items` of `model` in a single query.
+
+    If the bulk insert fails, the items are saved one at a time instead, so
+    a single bad item doesn't keep the rest from being added.
+
+    :return: list of the items which were added
+    """
+    if not items:
+        return []
+
+    sid = transaction.savepoint()
+    try:
+        model.objects.bulk_create(items)
+        transaction.savepoint_commit(sid)
+        return items
+    except DatabaseError as e:
+        transaction.savepoint_rollback(sid)
+        logging.debug(u"Bulk insert failed, adding items one at a time:\n%s",
+                      e)
+
+    added = []
+    for item in items:
+        sid = transaction.savepoint()
         try:
             item.save()
+            transaction.savepoint_commit(sid)
+            added.append(item)
         except Exception as e:
+            transaction.savepoint_rollback(sid)
             logging.error('Error while adding %s:\n%s', item, e)
-    return items, new_items
 
+    return added
 
-def add_files(translation_project, ignored_files, ext, relative_dir, db_dir,
-              file_filter=lambda _x: True):
+
+def get_scan_key(ignored_files, ext, relative_dir):
+    key = u':'.join([relative_dir, ext, u','.join(sorted(ignored_files))])
+    return 'ScanState:%s' % md5(smart_str(key)).hexdigest()
+
+
+def scan_dirs(ignored_files, ext, relative_dirs, file_filter, force=False):
+    """Lists the translation files and subdirectories in each of
+    `relative_dirs`.
+
+    The listings are cached along with the modification time and inode of
+    their directory, and reused as long as these don't change, unless
+    `force` is set. `file_filter` is applied to the cached listings, so the
+    translation projects of a GNU style project all share the listings of
+    the project directory.
+
+    :return: A list of ``(files, dirs)`` tuples for each directory.
+    """
     from pootle_misc import versioncontrol
-    podir_path = versioncontrol.to_podir_path(relative_dir)
-    files, dirs = split_files_and_dirs(ignored_files, ext, podir_path,
-                                       file_filter)
-    file_set = set(files)
-    dir_set = set(dirs)
 
-    existing_stores = dict((store.name, store) for store in
-                           db_dir.child_stores.exclude(file='').iterator())
-    existing_dirs = dict((dir.name, dir) for dir in
-                         db_dir.child_dirs.iterator())
-    files, new_files = add_items(file_set, existing_stores,
-              lambda name: Store(file=os.path.join(relative_dir, name),
-                                 parent=db_dir,
-                                 name=name,
-                                 translation_project=translation_project))
-
-    db_subdirs, new_db_subdirs = add_items(dir_set, existing_dirs,
-                           lambda name: Directory(name=name, parent=db_dir))
-
-    for db_subdir in db_subdirs:
-        fs_subdir = os.path.join(relative_dir, db_subdir.name)
-        _files, _new_files = add_files(translation_project, ignored_files, ext,
-                                       fs_subdir, db_subdir, file_filter)
-        files += _files
-        new_files += _new_files
+    keys = [get_scan_key(ignored_files, ext, relative_dir)
+            for relative_dir in relative_dirs]
+    cached = {}
+    if not force:
+        cached = cache.get_many(keys)
+
+    listings = []
+    scanned = {}
+    for key, relative_dir in zip(keys, relative_dirs):
+        podir_path = versioncontrol.to_podir_path(relative_dir)
+        stat = os.stat(podir_path)
+        signature = (stat.st_mtime, stat.st_ino, stat.st_dev)
+
+        if key in cached and cached[key][0] == signature:
+            files, dirs = cached[key][1:]
+        else:
+            files, dirs = split_files_and_dirs(ignored_files, ext, podir_path,
+                                               lambda _x: True)
+            scanned[key] = (signature, files, dirs)
+
+        files = [name for name in files
+                 if file_filter(os.path.join(podir_path, name))]
+        listings.append((files, dirs))
+
+    if scanned:
+        cache.set_many(scanned, settings.OBJECT_CACHE_TIMEOUT)
+
+    return listings
+
+
+def add_files(translation_project, ignored_files, ext, relative_dir, db_dir,
+              file_filter=lambda _x: True, force=False):
+    """Adds and removes stores and directories under `db_dir` to match the
+    translation files found in `relative_dir`.
+
+    The tree is scanned a level at a time, creating the new stores and
+    directories of each level with bulk inserts. Directories which didn't
+    change since they were last scanned aren't listed again, unless `force`
+    is set.
+
+    :return: A tuple with the stores found and the newly added stores.
+    """
+    stores = Store.objects.filter(pootle_path__startswith=db_dir.pootle_path) \
+                          .exclude(file='')
+
+    existing_stores = {}
+    for store in stores.iterator():
+        existing_stores.setdefault(store.parent_id, {})[store.name] = store
+
+    existing_dirs = {}
+    for directory in Directory.objects.filter(
+            pootle_path__startswith=db_dir.pootle_path,
+        ).exclude(id=db_dir.id).iterator():
+        existing_dirs.setdefault(directory.parent_id, {})[directory.name] = \
+                directory
+
+    new_store_paths = set()
+    level = [(relative_dir, db_dir)]
+    while level:
+        listings = scan_dirs(ignored_files, ext,
+                             [fs_dir for fs_dir, _db_dir in level],
+                             file_filter, force)
+
+        next_level = []
+        new_stores = []
+        new_dirs = []
+        new_dir_paths = {}
+        for (fs_dir, parent), (files, dirs) in zip(level, listings):
+            _stores, _new_stores = add_items(files,
+                    existing_stores.get(parent.id, {}),
+                    lambda name: Store(file=os.path.join(fs_dir, name),
+                                       parent=parent,
+                                       name=name,
+                                       pootle_path=parent.pootle_path + name,
+                                       translation_project=translation_project))
+            new_stores.extend(_new_stores)
+
+            db_subdirs, new_db_subdirs = add_items(dirs,
+                    existing_dirs.get(parent.id, {}),
+                    lambda name: Directory(name=name, parent=parent,
+                                           pootle_path=parent.pootle_path +
+                                                       name + '/'))
+            for db_subdir in db_subdirs:
+                next_level.append((os.path.join(fs_dir, db_subdir.name),
+                                   db_subdir))
+            new_dirs.extend(new_db_subdirs)
+            for db_subdir in new_db_subdirs:
+                new_dir_paths[db_subdir.pootle_path] = \
+                        os.path.join(fs_dir, db_subdir.name)
+
+        new_stores = create_items(Store, new_stores)
+        new_store_paths.update(store.pootle_path for store in new_stores)
+
+        if create_items(Directory, new_dirs):
+            # Bulk inserts don't set primary keys, so read them back
+            for directory in Directory.objects.filter(
+                    pootle_path__startswith=db_dir.pootle_path,
+                ).iterator():
+                if directory.pootle_path in new_dir_paths:
+                    next_level.append((new_dir_paths[directory.pootle_path],
+                                       directory))
+
+        level = next_level
+
+    files = list(stores.iterator())
+    new_files = [store for store in files
+                 if store.pootle_path in new_store_paths]
 
     return files, new_files
 
@@ -278,6 +451,8 @@ def sync_from_vcs(ignored_files, ext, relative_dir,
         vcs_f = os.path.join(vcs_path, f)
         new_path = os.path.join(podir_path, f)
         shutil.copy2(vcs_f, new_path)
+    versioncontrol.record_synced([os.path.join(relative_dir, f)
+                                  for f in vcs_file_set - file_set])
 
     # remove from podir
     #TODO: review this carefully, as we are now deleting stuff
@@ -300,7 +475,7 @@ def find_lang_postfix(filename):
     if match:
         return match.groups()[0]
 
-    for code in Language.objects.values_list('code', flat=True):
+    for code in Language.objects.get_codes().itervalues():
         if (name.endswith('-'+code) or name.endswith('_'+code) or
             name.endswith('.'+code) or
             name.lower().endswith('-'+code.lower()) or
@@ -342,6 +517,26 @@ def translation_project_should_exist(language, project):
     return False
 
 
+def gnu_project_languages(project, languages):
+    """Returns the :param:`languages` which might have translation files in
+    the GNU style :param:`project`.
+
+    Unlike :func:`translation_project_should_exist`, the project directory is
+    walked once for all the languages. The templates language is always
+    included, as it is matched differently.
+    """
+    filenames = []
+    for dirpath, dirnames, _filenames in os.walk(project.get_real_path()):
+        filenames.extend(filename for filename in _filenames
+                         if project.file_belongs_to_project(
+                                filename, match_templates=False))
+
+    matches = match_language_filenames([language.code for language in
+                                        languages], filenames)
+    return [language for language in languages
+            if language.code == 'templates' or matches[language.code]]
+
+
 def get_extension(language, project):
     """File extension used for this project, returns pot if it's a po project
     and language is templates.
@@ -366,18 +561,100 @@ def read_original_target(target_path):
         return None
 
 
+class TemplateCache(object):
+    """Parsed template stores shared by the translation projects of a project
+    while they are updated against templates.
+
+    Each template is parsed once. As pot2po modifies the stores it converts,
+    every translation project gets its own copy of the parsed template.
+
+    The digest of the template converted into each target file is recorded,
+    so targets whose template and file didn't change since they were last
+    converted can be skipped.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.parsed = {}
+        self.digests = {}
+
+    def get_digest(self, template_store):
+        from pootle_misc.versioncontrol import get_file_state
+
+        if not template_store.file:
+            return None
+
+        with self.lock:
+            if template_store.pootle_path not in self.digests:
+                self.digests[template_store.pootle_path] = \
+                        get_file_state(template_store.file.path)[2]
+
+            return self.digests[template_store.pootle_path]
+
+    def get_copy(self, template_store):
+        """Returns a copy of the parsed `template_store` for pot2po to
+        modify.
+        """
+        if not template_store.file:
+            return template_store
+
+        with self.lock:
+            if template_store.pootle_path not in self.parsed:
+                template_file = template_store.file.store
+                self.parsed[template_store.pootle_path] = template_file
+                # Not needed in the store cache anymore
+                template_store.file._delete_store_cache()
+
+            template_file = self.parsed[template_store.pootle_path]
+
+            try:
+                return copy.deepcopy(template_file)
+            except Exception:
+                # Some storage classes wrap objects which can't be copied
+                return template_file.__class__.parsestring(str(template_file))
+
+    def _get_key(self, target_pootle_path):
+        return 'TemplateState:%s' % \
+                md5(smart_str(target_pootle_path)).hexdigest()
+
+    def _get_target_state(self, template_store, target_path):
+        digest = self.get_digest(template_store)
+        if digest is None or not target_path or \
+           not os.path.exists(target_path):
+            return None
+
+        stat = os.stat(target_path)
+        return (digest, stat.st_size, stat.st_mtime)
+
+    def is_unchanged(self, template_store, target_pootle_path, target_path):
+        state = self._get_target_state(template_store, target_path)
+        return (state is not None and
+                cache.get(self._get_key(target_pootle_path)) == state)
+
+    def record(self, template_store, target_pootle_path, target_path):
+        state = self._get_target_state(template_store, target_path)
+        if state is not None:
+            cache.set(self._get_key(target_pootle_path), state,
+                      settings.OBJECT_CACHE_TIMEOUT)
+
+
 def convert_template(translation_project, template_store, target_pootle_path,
-                     target_path, monolingual=False):
+                     target_path, monolingual=False, template_file=None):
     """Run pot2po to update or initialize the file on `target_path` with
     `template_store`.
+
+    :param template_file: parsed copy of `template_store` to convert instead
+        of reading the template's file.
     """
 
     ensure_target_dir_exists(target_path)
 
-    if template_store.file:
-        template_file = template_store.file.store
-    else:
-        template_file = template_store
+    shared_template = template_file is not None
+    if not shared_template:
+        if template_store.file:
+            template_file = template_store.file.store
+        else:
+            template_file = template_store
 
     try:
         store = Store.objects.get(pootle_path=target_pootle_path)
@@ -419,7 +696,7 @@ def convert_template(translation_project, template_store, target_pootle_path,
         output_file.save()
 
     # pot2po modifies its input stores so clear caches is needed
-    if template_store.file:
+    if template_store.file and not shared_template:
         template_store.file._delete_store_cache()
     if store and store.file:
         store.file._delete_store_cache()
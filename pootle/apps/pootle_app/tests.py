@@ -1,14 +1,33 @@
 import time
 import os
+import shutil
+import tempfile
 import zipfile
 
+from django.core.cache import cache
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.utils import timezone
+
 from translate.misc import wStringIO
 
 from pootle.tests import PootleTestCase, formset_dict
 
+from pootle_app import project_tree
+from pootle_app.models import Directory, Job, PermissionSet
+from pootle_app.models.permissions import (PermissionResolver,
+                                           check_profile_permission,
+                                           get_matching_permissions,
+                                           get_pootle_permission,
+                                           get_profiles_with_permission)
 from pootle_project.models import Project
 from pootle_language.models import Language
+from pootle_misc import exportcache, zipstream
+from pootle_misc.jobs import enqueue, process_jobs
+from pootle_profile.models import PootleProfile
+from pootle_statistics.models import ServerStats, Submission
 from pootle_store.models import Store
+from pootle_translationproject.models import TranslationProject
 
 
 def unit_dict(pootle_path):
@@ -25,12 +44,44 @@ def unit_dict(pootle_path):
     return result
 
 
+def run_test_jobs(batch):
+    """Job handler failing for any job with a true `fail` argument."""
+    if any(data['fail'] for data in batch):
+        raise ValueError
+
+
+class JobTests(TestCase):
+    def test_failing_job(self):
+        """checks only failing jobs are released when a batch fails"""
+        for i in range(5):
+            enqueue('pootle_app.tests.run_test_jobs', fail=(i == 3))
+
+        self.assertEqual(process_jobs(), 5)
+        jobs = list(Job.objects.all())
+        self.assertEqual(len(jobs), 1)
+        self.assertEqual(jobs[0].attempts, 1)
+        self.assertEqual(jobs[0].owner, '')
+
+
 class AnonTests(PootleTestCase):
     def test_admin_not_logged(self):
         """checks that admin pages are not accessible without login"""
         response = self.client.get("/admin/")
         self.assertContains(response, '', status_code=403)
 
+    def test_index_last_activity(self):
+        """checks the front page lists the latest submissions"""
+        tp = TranslationProject.objects.get(pootle_path='/af/tutorial/')
+        Submission.objects.create(
+            creation_time=timezone.now(), translation_project=tp,
+            submitter=PootleProfile.objects.get(user__username='admin'),
+        )
+        tp = TranslationProject.objects.get(id=tp.id)
+        self.assertNotEqual(tp.last_submission, None)
+
+        response = self.client.get("/")
+        self.assertContains(response, '<a href="/accounts/admin/">admin</a>')
+
     def test_missing_end_slash(self):
         response = self.client.get("/ar")
         self.assertRedirects(response, "/ar/", status_code=301)
@@ -50,6 +101,19 @@ class AdminTests(PootleTestCase):
         response = self.client.get('/admin/')
         self.assertContains(response, 'Dependency Checks')
 
+    def test_server_stats(self):
+        """Checks the dashboard shows the precalculated server stats."""
+        response = self.client.get('/admin/')
+        self.assertContains(response, 'refresh_server_stats')
+
+        stats = ServerStats.objects.refresh()
+        response = self.client.get('/admin/')
+        self.assertContains(response, 'As of')
+        response = self.client.get('/admin/stats/more',
+                                   HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertContains(response, 'Active users')
+        self.assertEqual(ServerStats.objects.get(), stats)
+
     def test_add_project(self):
         """Checks that we can add a project successfully."""
         response = self.client.get("/admin/projects.html")
@@ -419,6 +483,61 @@ msgstr "resto"
         self.assertEqual(store.units[0].getnotes(), 'goodbye\nand thanks for all the fish')
 
 
+class PermissionTests(PootleTestCase):
+    def test_permission_resolver(self):
+        resolver = PermissionResolver({
+            '/': {'view': None},
+            '/af/': {'suggest': None},
+            '/af/tutorial/subdir/': {'review': None},
+            '/projects/tutorial/': {'translate': None},
+        })
+        expected = {
+            '/ar/': {'view': None},
+            '/af/': {'suggest': None},
+            '/af/terminology/': {'suggest': None},
+            '/af/tutorial/': {'translate': None},
+            '/af/tutorial/subdir/other/': {'review': None},
+            '/projects/tutorial/': {'translate': None},
+        }
+        for pootle_path, permissions in expected.iteritems():
+            self.assertEqual(resolver.get_permissions(pootle_path),
+                             permissions)
+
+    def test_permissions_invalidation(self):
+        profile = PootleProfile.objects.get(user__username='nonpriv')
+        directory = Directory.objects.get(pootle_path='/af/tutorial/')
+        permissions = get_matching_permissions(profile, directory)
+        self.assertFalse('administrate' in permissions)
+
+        permission_set = PermissionSet.objects.create(profile=profile,
+                                                      directory=directory)
+        permission_set.positive_permissions = [
+            get_pootle_permission('administrate'),
+        ]
+        permissions = get_matching_permissions(profile, directory)
+        self.assertTrue('administrate' in permissions)
+
+    def test_profiles_with_permission(self):
+        profile = PootleProfile.objects.get(user__username='nonpriv')
+        permission_set = PermissionSet.objects.create(
+            profile=profile,
+            directory=Directory.objects.get(pootle_path='/projects/tutorial/'),
+        )
+        permission_set.positive_permissions = [get_pootle_permission('view')]
+
+        for pootle_path in ('/', '/af/', '/af/tutorial/', '/projects/'):
+            directory = Directory.objects.get(pootle_path=pootle_path)
+            for check_default in (True, False):
+                expected = set(
+                    p.id for p in PootleProfile.objects.all()
+                    if check_profile_permission(p, 'view', directory,
+                                                check_default)
+                )
+                profiles = get_profiles_with_permission('view', directory,
+                                                        check_default)
+                self.assertEqual(set(p.id for p in profiles), expected)
+
+
 class NonprivTests(PootleTestCase):
     def setUp(self):
         super(NonprivTests, self).setUp()
@@ -447,3 +566,192 @@ class NonprivTests(PootleTestCase):
         self.assertFalse('msgstr "samaka"' in store.file.read())
         suggestions = [str(sug) for sug in store.findunit('test').get_suggestions()]
         self.assertTrue('samaka' in suggestions)
+
+
+class ProjectTreeTests(PootleTestCase):
+    def setUp(self):
+        super(ProjectTreeTests, self).setUp()
+        self.tp = TranslationProject.objects.get(pootle_path='/af/tutorial/')
+        self.listed_dirs = []
+
+        original = project_tree.split_files_and_dirs
+
+        def split_files_and_dirs(ignored_files, ext, real_dir, file_filter):
+            self.listed_dirs.append(real_dir)
+            return original(ignored_files, ext, real_dir, file_filter)
+
+        project_tree.split_files_and_dirs = split_files_and_dirs
+        self.addCleanup(setattr, project_tree, 'split_files_and_dirs',
+                        original)
+
+    def _write_po(self, *path):
+        pofile = file(os.path.join(self.tp.abs_real_path, *path), 'w')
+        pofile.write('#: test.c\nmsgid "test"\nmsgstr ""\n')
+        pofile.close()
+
+    def test_new_file(self):
+        """checks new files are added as stores"""
+        self._write_po('new.po')
+        all_files, new_files = self.tp.scan_files()
+        self.assertEqual([store.pootle_path for store in new_files],
+                         ['/af/tutorial/new.po'])
+        self.assertEqual(len(all_files), 2)
+
+    def test_new_dir(self):
+        """checks files in new nested directories are added"""
+        os.makedirs(os.path.join(self.tp.abs_real_path, 'sub', 'subsub'))
+        self._write_po('sub', 'subsub', 'new.po')
+        all_files, new_files = self.tp.scan_files()
+        self.assertEqual([store.pootle_path for store in new_files],
+                         ['/af/tutorial/sub/subsub/new.po'])
+        directory = Directory.objects.get(
+                pootle_path='/af/tutorial/sub/subsub/')
+        self.assertEqual(directory.parent.pootle_path, '/af/tutorial/sub/')
+        self.assertEqual(new_files[0].parent, directory)
+
+    def test_deleted_file(self):
+        """checks stores are removed along with their files"""
+        os.remove(os.path.join(self.tp.abs_real_path, 'pootle.po'))
+        all_files, new_files = self.tp.scan_files()
+        self.assertEqual(all_files, [])
+        self.assertFalse(Store.objects.filter(
+                pootle_path='/af/tutorial/pootle.po').exists())
+
+    def test_unchanged_dir(self):
+        """checks unchanged directories aren't listed again"""
+        all_files, new_files = self.tp.scan_files()
+        self.assertEqual(self.listed_dirs, [])
+        self.assertEqual(len(all_files), 1)
+        self.assertEqual(new_files, [])
+
+    def test_force(self):
+        """checks forced scans list unchanged directories again"""
+        self.tp.scan_files(force=True)
+        self.assertEqual(self.listed_dirs, [self.tp.abs_real_path])
+
+    def test_gnu_shared_listing(self):
+        """checks languages of GNU style projects share directory listings"""
+        project = Project.objects.get(code='terminology')
+        project_dir = os.path.join(self.testpodir, 'terminology')
+        pofile = file(os.path.join(project_dir, 'fr.po'), 'w')
+        pofile.write('#: test.c\nmsgid "test"\nmsgstr "teste"\n')
+        pofile.close()
+
+        tp = project.translationproject_set.get(language__code='ar')
+        tp.scan_files()
+        self.assertEqual(self.listed_dirs, [project_dir])
+
+        ignored_files = set(p.strip() for p in project.ignoredfiles.split(','))
+        file_filter = lambda filename: \
+                project_tree.direct_language_match_filename('fr', filename)
+        listings = project_tree.scan_dirs(ignored_files, '.po',
+                                          ['terminology'], file_filter)
+        self.assertEqual(listings, [(['fr.po'], [])])
+        self.assertEqual(self.listed_dirs, [project_dir])
+
+
+class ZipStreamTests(TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tempdir)
+
+    def test_round_trip(self):
+        """checks zipfile reads back the streamed archives"""
+        big_path = os.path.join(self.tempdir, 'big.po')
+        big_data = ''.join('msgid "%d"\nmsgstr ""\n\n' % i
+                           for i in range(20000))
+        self.assertTrue(len(big_data) > zipstream.BLOCK_SIZE)
+        with open(big_path, 'wb') as f:
+            f.write(big_data)
+
+        empty_path = os.path.join(self.tempdir, 'empty.po')
+        open(empty_path, 'wb').close()
+
+        unicode_name = u'af/\u015dan\u011dita.po'
+        members = [
+            (big_path, u'af/big.po'),
+            (empty_path, u'af/empty.po'),
+            (empty_path, unicode_name, 'msgid "x"\nmsgstr "y"\n'),
+        ]
+        archive = zipfile.ZipFile(wStringIO.StringIO(''.join(
+                zipstream.iter_zip(members))))
+
+        self.assertEqual(archive.testzip(), None)
+        self.assertEqual(archive.namelist(),
+                         [u'af/big.po', u'af/empty.po', unicode_name])
+        self.assertEqual(archive.read(u'af/big.po'), big_data)
+        self.assertEqual(archive.read(u'af/empty.po'), '')
+        self.assertEqual(archive.read(unicode_name),
+                         'msgid "x"\nmsgstr "y"\n')
+
+
+class ExportCacheTests(TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tempdir)
+        podir_settings = override_settings(PODIRECTORY=self.tempdir)
+        podir_settings.enable()
+        self.addCleanup(podir_settings.disable)
+        cache.delete(exportcache.SIZE_KEY)
+
+    def _store(self, export_path, data, generation=u'1'):
+        def write(path):
+            with open(path, 'wb') as f:
+                f.write(data)
+
+        return exportcache.store_artifact(export_path, generation, write)
+
+    def test_store_get(self):
+        """checks artifacts are found for the generation they were stored"""
+        export_path = 'POOTLE_EXPORT/af/pootle.xlf'
+        manifest = self._store(export_path, 'fish')
+        self.assertEqual(manifest['size'], 4)
+
+        self.assertEqual(exportcache.get_artifact(export_path, u'1'),
+                         manifest)
+        self.assertEqual(exportcache.get_artifact(export_path, u'2'), None)
+        self.assertEqual(exportcache.get_artifact('POOTLE_EXPORT/af/other.xlf',
+                                                  u'1'),
+                         None)
+
+        with open(os.path.join(self.tempdir, export_path)) as f:
+            self.assertEqual(f.read(), 'fish')
+
+    def test_evict(self):
+        """checks the least recently used artifacts are evicted first"""
+        now = time.time()
+        for i, name in enumerate(('old', 'used', 'new')):
+            export_path = 'POOTLE_EXPORT/af/%s.xlf' % name
+            self._store(export_path, 'x' * 10)
+            os.utime(os.path.join(self.tempdir, export_path +
+                                  exportcache.MANIFEST_SUFFIX),
+                     (now - 100 + i, now - 100 + i))
+
+        # Using an artifact makes it the most recently used one
+        exportcache.get_artifact('POOTLE_EXPORT/af/old.xlf', u'1')
+
+        exportcache.evict(20)
+        self.assertEqual(exportcache.get_artifact('POOTLE_EXPORT/af/used.xlf',
+                                                  u'1'),
+                         None)
+        self.assertFalse(os.path.exists(
+                os.path.join(self.tempdir, 'POOTLE_EXPORT/af/used.xlf')))
+        for name in ('old', 'new'):
+            self.assertNotEqual(exportcache.get_artifact(
+                    'POOTLE_EXPORT/af/%s.xlf' % name, u'1'), None)
+        self.assertEqual(cache.get(exportcache.SIZE_KEY), 20)
+
+    def test_needs_eviction(self):
+        """checks eviction is only needed once the size limit is crossed"""
+        with self.settings(EXPORT_CACHE_SIZE=15):
+            self.assertTrue(exportcache.needs_eviction())
+            exportcache.evict()
+            self.assertFalse(exportcache.needs_eviction())
+
+            self._store('POOTLE_EXPORT/af/pootle.xlf', 'x' * 10)
+            self.assertFalse(exportcache.needs_eviction())
+            self._store('POOTLE_EXPORT/af/other.xlf', 'x' * 10)
+            self.assertTrue(exportcache.needs_eviction())
+
+        with self.settings(EXPORT_CACHE_SIZE=0):
+            self.assertFalse(exportcache.needs_eviction())
@@ -21,8 +21,6 @@
 import locale
 
 from django.conf import settings
-from django.contrib.auth.models import User
-from django.core.cache import cache
 from django.http import HttpResponse
 from django.shortcuts import render_to_response
 from django.template import RequestContext
@@ -32,12 +30,7 @@ from django.utils.translation import ugettext as _
 from pootle import depcheck
 from pootle.core.decorators import admin_required
 from pootle.core.markup import get_markup_filter
-from pootle_app.models import Suggestion as SuggestionStat
-from pootle_misc.aggregate import sum_column
-from pootle_profile.models import PootleProfile
-from pootle_statistics.models import Submission
-from pootle_store.models import Unit, Suggestion
-from pootle_store.util import TRANSLATED
+from pootle_statistics.models import ServerStats
 
 
 def required_depcheck():
@@ -234,38 +227,44 @@ def _format_numbers(dict):
         dict[k] = locale.format("%d", dict[k], grouping=True)
 
 
+def get_server_stats():
+    """Returns the latest :cls:`ServerStats` or `None` if the statistics
+    haven't been calculated yet.
+    """
+    try:
+        return ServerStats.objects.latest()
+    except ServerStats.DoesNotExist:
+        return None
+
+
 def server_stats():
-    result = cache.get("server_stats")
-    if result is None:
-        result = {}
-        result['user_count'] = max(User.objects.filter(is_active=True).count()-2, 0)
-        # 'default' and 'nobody' might be counted
-        # FIXME: the special users should not be retuned with is_active
-        result['submission_count'] = Submission.objects.count() + SuggestionStat.objects.count()
-        result['pending_count'] = Suggestion.objects.count()
-        cache.set("server_stats", result, 86400)
+    stats = get_server_stats()
+    if stats is None:
+        return None
+
+    result = {
+        'user_count': stats.user_count,
+        'submission_count': stats.submission_count,
+        'pending_count': stats.pending_count,
+    }
     _format_numbers(result)
+    result['creation_time'] = stats.creation_time
     return result
 
 
 @admin_required
 def server_stats_more(request):
-    result = cache.get("server_stats_more")
-    if result is None:
-        result = {}
-        unit_query = Unit.objects.filter(state__gte=TRANSLATED).exclude(
-            store__translation_project__project__code__in=('pootle', 'tutorial', 'terminology')).exclude(
-            store__translation_project__language__code='templates').order_by()
-        result['store_count'] = unit_query.values('store').distinct().count()
-        result['project_count'] = unit_query.values('store__translation_project__project').distinct().count()
-        result['language_count'] = unit_query.values('store__translation_project__language').distinct().count()
-        sums = sum_column(unit_query, ('source_wordcount',), count=True)
-        result['string_count'] = sums['count']
-        result['word_count'] = sums['source_wordcount'] or 0
-        result['user_active_count'] = (PootleProfile.objects.exclude(submission=None) |\
-                                       PootleProfile.objects.exclude(suggestion=None) |\
-                                       PootleProfile.objects.exclude(suggester=None)).order_by().count()
-        cache.set("server_stats_more", result, 86400)
+    stats = get_server_stats()
+    result = {}
+    if stats is not None:
+        result = {
+            'store_count': stats.store_count,
+            'project_count': stats.project_count,
+            'language_count': stats.language_count,
+            'string_count': stats.string_count,
+            'word_count': stats.word_count,
+            'user_active_count': stats.user_active_count,
+        }
     _format_numbers(result)
     stat_strings = {
         'store_count': _('Files'),
@@ -35,24 +35,56 @@ from pootle_app.views.top_stats import gentopstats_root
 from pootle_language.models import Language
 from pootle_misc.browser import get_table_headings
 from pootle_misc.stats import get_raw_stats
+from pootle_misc.util import getmanyfromcache
 from pootle_profile.models import get_profile
 from pootle_project.models import Project
 from pootle_statistics.models import Submission
+from pootle_translationproject.models import TranslationProject
 
 
-def get_items(request, model, get_last_action, name_func):
+def get_last_actions(field):
+    """Returns the latest submission of every language or project.
+
+    :param field: Either ``'language'`` or ``'project'``.
+    :return: Dictionary mapping language or project IDs to the HTML
+        describing their latest submission.
+    """
+    last_submissions = {}
+    translation_projects = TranslationProject.objects \
+            .exclude(last_submission=None) \
+            .values_list(field, 'last_submission').order_by()
+    for item_id, submission_id in translation_projects:
+        last_submissions[item_id] = max(submission_id,
+                                        last_submissions.get(item_id, 0))
+
+    submissions = Submission.objects.filter(
+            id__in=last_submissions.values(),
+        ).select_related('submitter__user')
+    submissions = dict((submission.id, submission)
+                       for submission in submissions)
+
+    return dict((item_id, submissions[submission_id].as_html())
+                for item_id, submission_id in last_submissions.iteritems()
+                if submission_id in submissions)
+
+
+def get_items(request, model, field, name_func):
     items = []
     if not check_permission('view', request):
         return items
 
-    for item in model.objects.iterator():
-        stats = get_raw_stats(item)
+    objects = list(model.objects.iterator())
+    quick_stats = getmanyfromcache(objects, 'getquickstats')
+    last_actions = get_last_actions(field)
+
+    for item, item_quick_stats in zip(objects, quick_stats):
+        stats = get_raw_stats(item, quick_stats=item_quick_stats)
 
         translated_percentage = stats['translated']['percentage']
         items.append({
             'code': item.code,
             'name': name_func(item.fullname),
-            'lastactivity': get_last_action(item),
+            'lastactivity': last_actions.get(item.id, ''),
             'stats': stats,
             'completed_title': _("%(percentage)d%% complete",
                                  {'percentage': translated_percentage}),
@@ -64,25 +96,11 @@ def get_items(request, model, get_last_action, name_func):
 
 
 def getlanguages(request):
-    def get_last_action(item):
-        try:
-            return Submission.objects.filter(
-                translation_project__language=item).latest().as_html()
-        except Submission.DoesNotExist:
-            return ''
-
-    return get_items(request, Language, get_last_action, tr_lang)
+    return get_items(request, Language, 'language', tr_lang)
 
 
 def getprojects(request):
-    def get_last_action(item):
-        try:
-            return Submission.objects.filter(
-                translation_project__project=item).latest().as_html()
-        except Submission.DoesNotExist:
-            return ''
-
-    return get_items(request, Project, get_last_action, lambda name: name)
+    return get_items(request, Project, 'project', lambda name: name)
 
 
 @get_path_obj
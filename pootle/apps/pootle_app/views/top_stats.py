@@ -19,12 +19,25 @@
 # along with Pootle; if not, write to the Free Software
 # Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
 
-from django.contrib.auth.models import User
 from django.conf import settings
 from django.core.cache import cache
 from django.utils.encoding import iri_to_uri
 
-from pootle_misc.aggregate import group_by_sort
+from pootle_statistics.models import ContributorStats
+
+
+def _gentopstats(pootle_path):
+    """Returns rows with the top suggesters, reviewers and submitters
+    within `pootle_path`."""
+    stats = ContributorStats.objects.filter(pootle_path=pootle_path)
+    columns = []
+    for field in ('suggestions', 'reviews', 'submissions'):
+        top = stats.filter(**{'%s__gt' % field: 0}) \
+                   .order_by('-' + field, 'profile') \
+                   .values_list('profile__user__username', field)
+        columns.append([{'username': username, 'count': count}
+                        for username, count in top[:settings.TOPSTAT_SIZE]])
+    return map(None, *columns)
 
 def gentopstats_root():
     """
@@ -34,13 +47,7 @@ def gentopstats_root():
     key = "/:gentopstats"
     result = cache.get(key)
     if result is None:
-        top_sugg   = group_by_sort(User.objects.exclude(pootleprofile__suggester=None),
-                                   'pootleprofile__suggester', ['username'])[:settings.TOPSTAT_SIZE]
-        top_review = group_by_sort(User.objects.exclude(pootleprofile__reviewer=None),
-                                   'pootleprofile__reviewer', ['username'])[:settings.TOPSTAT_SIZE]
-        top_sub    = group_by_sort(User.objects.exclude(pootleprofile__submission=None),
-                                   'pootleprofile__submission', ['username'])[:settings.TOPSTAT_SIZE]
-        result = map(None, top_sugg, top_review, top_sub)
+        result = _gentopstats("/")
         cache.set(key, result, settings.CACHE_MIDDLEWARE_SECONDS * 3)
     return result
 
@@ -58,14 +65,7 @@ def gentopstats_language(language):
     key = iri_to_uri("%s:gentopstats" % language.pootle_path)
     result = cache.get(key)
     if result is None:
-        top_sugg   = group_by_sort(User.objects.filter(pootleprofile__suggester__translation_project__language=language),
-                                   'pootleprofile__suggester', ['username'])[:settings.TOPSTAT_SIZE]
-        top_review = group_by_sort(User.objects.filter(pootleprofile__reviewer__translation_project__language=language),
-                                   'pootleprofile__reviewer', ['username'])[:settings.TOPSTAT_SIZE]
-        top_sub    = group_by_sort(User.objects.filter(pootleprofile__submission__translation_project__language=language),
-                                   'pootleprofile__submission', ['username'])[:settings.TOPSTAT_SIZE]
-
-        result = map(None, top_sugg, top_review, top_sub)
+        result = _gentopstats(language.pootle_path)
         cache.set(key, result, settings.CACHE_MIDDLEWARE_SECONDS * 2)
     return result
 
@@ -83,14 +83,7 @@ def gentopstats_project(project):
     key = iri_to_uri("%s:gentopstats" % project.pootle_path)
     result = cache.get(key)
     if result is None:
-        top_sugg   = group_by_sort(User.objects.filter(pootleprofile__suggester__translation_project__project=project),
-                                   'pootleprofile__suggester', ['username'])[:settings.TOPSTAT_SIZE]
-        top_review = group_by_sort(User.objects.filter(pootleprofile__reviewer__translation_project__project=project),
-                                   'pootleprofile__reviewer', ['username'])[:settings.TOPSTAT_SIZE]
-        top_sub    = group_by_sort(User.objects.filter(pootleprofile__submission__translation_project__project=project),
-                                   'pootleprofile__submission', ['username'])[:settings.TOPSTAT_SIZE]
-
-        result = map(None, top_sugg, top_review, top_sub)
+        result = _gentopstats(project.pootle_path)
         cache.set(key, result, settings.CACHE_MIDDLEWARE_SECONDS * 2)
     return result
 
@@ -108,13 +101,6 @@ def gentopstats_translation_project(translation_project):
     key = iri_to_uri("%s:gentopstats" % translation_project.pootle_path)
     result = cache.get(key)
     if result is None:
-        top_sugg   = group_by_sort(User.objects.filter(pootleprofile__suggester__translation_project=translation_project),
-                                   'pootleprofile__suggester', ['username'])[:settings.TOPSTAT_SIZE]
-        top_review = group_by_sort(User.objects.filter(pootleprofile__reviewer__translation_project=translation_project),
-                                   'pootleprofile__reviewer', ['username'])[:settings.TOPSTAT_SIZE]
-        top_sub    = group_by_sort(User.objects.filter(pootleprofile__submission__translation_project=translation_project),
-                                   'pootleprofile__submission', ['username'])[:settings.TOPSTAT_SIZE]
-
-        result = map(None, top_sugg, top_review, top_sub)
+        result = _gentopstats(translation_project.pootle_path)
         cache.set(key, result, settings.CACHE_MIDDLEWARE_SECONDS)
     return result
@@ -27,7 +27,7 @@ from pootle_app.models import Directory
 from pootle_misc.stats import stats_message_raw
 from pootle_notifications.models import Notice
 from pootle_profile.models import get_profile
-from pootle_store.models import Unit
+from pootle_store.util import FUZZY, TRANSLATED
 
 
 ##### Model Events #####
@@ -94,8 +94,8 @@ def unit_updated(sender, instance, raw=False, **kwargs):
         return
 
     if instance.id is not None and instance.istranslated():
-        dbcopy = Unit.objects.get(id=instance.id)
-        if dbcopy.istranslated():
+        old_state = instance.get_original_value('state')
+        if old_state >= TRANSLATED:
             # unit state didn't change, let's quit
             return
 
@@ -111,7 +111,7 @@ def unit_updated(sender, instance, raw=False, **kwargs):
             quickstats = translation_project.getquickstats()
             quickstats['translated'] += 1
 
-            if dbcopy.isfuzzy():
+            if old_state == FUZZY:
                 quickstats['fuzzy'] -= 1
 
             message += stats_message_raw("Project now at", quickstats)
@@ -19,22 +19,25 @@
 # You should have received a copy of the GNU General Public License
 # along with this program; if not, see <http://www.gnu.org/licenses/>.
 
+from django.conf import settings
 from django.core.cache import cache
 from django.core.urlresolvers import reverse
 from django.db import models
+from django.db.models import Q
 from django.utils.translation import ugettext_lazy as _
 
 from pootle.core.markup import get_markup_filter_name, MarkupField
 from pootle.i18n.gettext import tr_lang, language_dir
 from pootle_app.lib.util import RelatedManager
-from pootle_misc.aggregate import max_column
 from pootle_misc.baseurl import l
 from pootle_misc.util import getfromcache
-from pootle_store.models import Unit, Suggestion
+from pootle_store.models import (Store, Suggestion,
+                                 delete_meta_from_cache)
 from pootle_store.util import statssum, OBSOLETE
 
 
 CACHE_KEY = 'pootle-languages'
+CODES_CACHE_KEY = 'pootle-language-codes'
 
 
 class LanguageManager(RelatedManager):
@@ -42,6 +45,20 @@ class LanguageManager(RelatedManager):
     def get_by_natural_key(self, code):
         return self.get(code=code)
 
+    def get_codes(self):
+        """Returns a dictionary mapping the lowercased code of every
+        language to its actual code.
+
+        The mapping is cached until a language is saved or deleted.
+        """
+        codes = cache.get(CODES_CACHE_KEY)
+        if codes is None:
+            codes = dict((code.lower(), code) for code in
+                         self.values_list('code', flat=True))
+            cache.set(CODES_CACHE_KEY, codes, settings.OBJECT_CACHE_TIMEOUT)
+
+        return codes
+
 
 class LiveLanguageManager(models.Manager):
     """Manager that only considers `live` languages.
@@ -117,16 +134,21 @@ class Language(models.Model):
         super(Language, self).save(*args, **kwargs)
 
         # FIXME: far from ideal, should cache at the manager level instead
-        cache.delete(CACHE_KEY)
+        cache.delete_many([CACHE_KEY, CODES_CACHE_KEY])
         cache.set(CACHE_KEY, Language.live.all(), 0)
 
+        delete_meta_from_cache(Store.objects.filter(
+            Q(translation_project__language=self) |
+            Q(translation_project__project__source_language=self)
+        ))
+
     def delete(self, *args, **kwargs):
         directory = self.directory
         super(Language, self).delete(*args, **kwargs)
         directory.delete()
 
         # FIXME: far from ideal, should cache at the manager level instead
-        cache.delete(CACHE_KEY)
+        cache.delete_many([CACHE_KEY, CODES_CACHE_KEY])
 
     def __repr__(self):
         return u'<%s: %s>' % (self.__class__.__name__, self.fullname)
@@ -134,10 +156,8 @@ class Language(models.Model):
     def __unicode__(self):
         return u"%s - %s" % (self.name, self.code)
 
-    @getfromcache
     def get_mtime(self):
-        return max_column(Unit.objects.filter(
-            store__translation_project__language=self), 'mtime', None)
+        return self.directory.get_mtime()
 
     @getfromcache
     def getquickstats(self):
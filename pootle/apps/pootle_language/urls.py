@@ -31,6 +31,10 @@ urlpatterns = patterns('pootle_language.views',
         'translate',
         name='pootle-language-translate'),
 
+    url(r'^(?P<language_code>[^/]*)/export/zip$',
+        'export_zip',
+        name='pootle-language-export-zip'),
+
     # Admin
     (r'^(?P<language_code>[^/]*)/edit_settings.html$',
         'language_settings_edit'),
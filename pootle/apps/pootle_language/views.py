@@ -28,7 +28,8 @@ from django.utils.translation import ugettext as _, ungettext
 from pootle.core.decorators import get_path_obj, permission_required
 from pootle.core.helpers import get_translation_context
 from pootle.i18n.gettext import tr_lang
-from pootle_app.models.permissions import check_permission
+from pootle_app.models.permissions import (check_permission,
+                                           check_profile_permission)
 from pootle_app.views.admin.permissions import admin_permissions
 from pootle_app.views.top_stats import gentopstats_language
 from pootle_language.models import Language
@@ -37,6 +38,8 @@ from pootle_misc.stats import (get_raw_stats, stats_descriptions)
 from pootle_misc.util import nice_percentage, jsonify, ajax_required
 from pootle_profile.models import get_profile
 from pootle_statistics.models import Submission
+from pootle_translationproject.export import (archive_response,
+                                              export_translation_projects)
 
 
 def get_last_action(translation_project):
@@ -197,3 +200,21 @@ def language_admin(request, language):
         "feed_path": '%s/' % language.code,
     }
     return admin_permissions(request, language.directory, "language/language_admin.html", template_vars)
+
+
+@get_path_obj
+@permission_required('archive')
+def export_zip(request, language):
+    """Streams an archive with the files of all projects in `language`."""
+    # Permissions can be restricted for each translation project
+    profile = get_profile(request.user)
+    translation_projects = [
+        tp for tp in language.translationproject_set.select_related(
+            'language', 'project', 'directory',
+        )
+        if check_profile_permission(profile, 'archive', tp.directory)
+    ]
+    archive = export_translation_projects(translation_projects,
+                                          lambda tp: tp.project.code)
+
+    return archive_response(archive, '%s.zip' % language.code)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013 Zuza Software Foundation
+#
+# This file is part of Pootle.
+#
+# Pootle is free software; you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 2 of the License, or (at your option) any later
+# version.
+#
+# Pootle is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# Pootle; if not, see <http://www.gnu.org/licenses/>.
+
+"""Helpers for inspecting the query plans of the SQL run by Pootle."""
+
+from contextlib import contextmanager
+from time import time
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.util import CursorWrapper
+
+
+#: Statement prefix asking each database backend for a query plan
+EXPLAIN_PREFIXES = {
+    'sqlite': 'EXPLAIN QUERY PLAN ',
+    'mysql': 'EXPLAIN ',
+    'postgresql': 'EXPLAIN ',
+}
+
+
+class RecordingCursorWrapper(CursorWrapper):
+    """Cursor keeping the SQL and parameters of the queries it runs."""
+
+    def __init__(self, cursor, db, queries):
+        super(RecordingCursorWrapper, self).__init__(cursor, db)
+        self.queries = queries
+
+    def execute(self, sql, params=()):
+        self.queries.append((sql, params))
+        return self.cursor.execute(sql, params)
+
+
+@contextmanager
+def record_queries(using=DEFAULT_DB_ALIAS):
+    """Records the queries run within the block.
+
+    Yields a list which gets filled with ``(sql, params)`` tuples.
+    """
+    connection = connections[using]
+    queries = []
+    use_debug_cursor = connection.use_debug_cursor
+
+    connection.use_debug_cursor = True
+    connection.make_debug_cursor = \
+        lambda cursor: RecordingCursorWrapper(cursor, connection, queries)
+    try:
+        yield queries
+    finally:
+        connection.use_debug_cursor = use_debug_cursor
+        del connection.make_debug_cursor
+
+
+def explain(sql, params=(), repeat=3, using=DEFAULT_DB_ALIAS):
+    """Returns the query plan of a SELECT query along with the best time,
+    in milliseconds, out of `repeat` runs of the query.
+    """
+    connection = connections[using]
+    cursor = connection.cursor()
+
+    plan = []
+    prefix = EXPLAIN_PREFIXES.get(connection.vendor)
+    if prefix is not None:
+        cursor.execute(prefix + sql, params)
+        plan = [u' | '.join(unicode(column) for column in row)
+                for row in cursor.fetchall()]
+
+    timings = []
+    for i in range(repeat):
+        start = time()
+        cursor.execute(sql, params)
+        cursor.fetchall()
+        timings.append((time() - start) * 1000)
+
+    return plan, min(timings)
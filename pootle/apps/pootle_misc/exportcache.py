@@ -0,0 +1,243 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013 Zuza Software Foundation
+#
+# This file is part of Pootle.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+
+"""On-disk cache of exported files.
+
+Exported files (artifacts) are kept under ``POOTLE_EXPORT``. Each of them
+has a manifest stored next to it, recording the change generation of the
+exported object it was generated from, its size and its ETag. An artifact
+is valid as long as the generation of its object is the same, regardless
+of what happens to the cache backend.
+
+Manifests are touched whenever their artifact is used, so when the
+artifacts grow larger than :setting:`EXPORT_CACHE_SIZE` the least recently
+used ones are evicted first. The size of the artifacts is tracked in the
+cache backend, so the export directory is only walked once the limit is
+crossed.
+"""
+
+import logging
+import mimetypes
+import os
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.servers.basehttp import FileWrapper
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils import simplejson
+from django.utils.cache import add_never_cache_headers
+
+from pootle_misc import ptempfile as tempfile
+from pootle_misc.util import get_content_disposition
+from pootle_store.util import absolute_real_path
+
+
+#: Manifests are stored along their artifact with this suffix
+MANIFEST_SUFFIX = '.manifest'
+
+#: Cache key holding the approximate size of all the artifacts
+SIZE_KEY = 'ExportCache:size'
+
+
+def get_generation(path_obj):
+    """Returns the change generation of `path_obj`, which changes whenever
+    its translations change.
+    """
+    return unicode(path_obj.get_mtime())
+
+
+def _write_atomically(abs_path, write):
+    """Calls `write` with a temporary file name, then moves the file written
+    there to `abs_path`.
+    """
+    from pootle_app.project_tree import ensure_target_dir_exists
+
+    ensure_target_dir_exists(abs_path)
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(abs_path),
+                                     prefix='.',
+                                     suffix=os.path.basename(abs_path))
+    os.close(fd)
+    try:
+        write(temp_path)
+        os.rename(temp_path, abs_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def get_artifact(export_path, generation):
+    """Returns the manifest of the artifact at `export_path`, or ``None``
+    if there is no such artifact or it wasn't generated for `generation`.
+    """
+    abs_export_path = absolute_real_path(export_path)
+    manifest_path = abs_export_path + MANIFEST_SUFFIX
+
+    try:
+        with open(manifest_path) as f:
+            manifest = simplejson.load(f)
+    except (IOError, ValueError):
+        return None
+
+    if (manifest.get('generation') != generation or
+        not os.path.isfile(abs_export_path)):
+        return None
+
+    try:
+        os.utime(manifest_path, None)
+    except OSError:
+        pass
+
+    return manifest
+
+
+def store_artifact(export_path, generation, write):
+    """Generates the artifact at `export_path` and records its manifest.
+
+    :param write: callable writing the artifact to the file name it is
+        given.
+    :return: The manifest of the artifact.
+    """
+    abs_export_path = absolute_real_path(export_path)
+    _write_atomically(abs_export_path, write)
+
+    digest = md5()
+    with open(abs_export_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), ''):
+            digest.update(chunk)
+
+    manifest = {
+        'generation': generation,
+        'size': os.path.getsize(abs_export_path),
+        'etag': '"%s"' % digest.hexdigest(),
+    }
+
+    def write_manifest(path):
+        with open(path, 'w') as f:
+            simplejson.dump(manifest, f)
+
+    _write_atomically(abs_export_path + MANIFEST_SUFFIX, write_manifest)
+
+    try:
+        cache.incr(SIZE_KEY, manifest['size'])
+    except ValueError:
+        # The size is unknown until the next eviction measures it
+        pass
+
+    return manifest
+
+
+def needs_eviction():
+    """Tells whether the artifacts may take more than
+    :setting:`EXPORT_CACHE_SIZE` bytes, so :func:`evict` should run.
+    """
+    if not settings.EXPORT_CACHE_SIZE:
+        return False
+
+    total_size = cache.get(SIZE_KEY)
+    return total_size is None or total_size > settings.EXPORT_CACHE_SIZE
+
+
+def evict(max_size=None):
+    """Removes the least recently used artifacts until the artifacts take at
+    most `max_size` bytes, :setting:`EXPORT_CACHE_SIZE` by default.
+
+    Artifacts without manifests are left alone.
+    """
+    if max_size is None:
+        max_size = settings.EXPORT_CACHE_SIZE
+    if not max_size:
+        return
+
+    export_dir = absolute_real_path('POOTLE_EXPORT')
+    artifacts = []
+    total_size = 0
+    for dirpath, dirnames, filenames in os.walk(export_dir):
+        for filename in filenames:
+            if not filename.endswith(MANIFEST_SUFFIX):
+                continue
+
+            manifest_path = os.path.join(dirpath, filename)
+            abs_export_path = manifest_path[:-len(MANIFEST_SUFFIX)]
+            try:
+                last_used = os.path.getmtime(manifest_path)
+                size = os.path.getsize(abs_export_path)
+            except OSError:
+                continue
+
+            artifacts.append((last_used, size, abs_export_path))
+            total_size += size
+
+    artifacts.sort()
+    for last_used, size, abs_export_path in artifacts:
+        if total_size <= max_size:
+            break
+
+        logging.debug(u"Evicting %s from the export cache", abs_export_path)
+        for path in (abs_export_path + MANIFEST_SUFFIX, abs_export_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        total_size -= size
+
+    cache.set(SIZE_KEY, total_size, settings.OBJECT_CACHE_TIMEOUT)
+
+
+def serve_artifact(request, export_path, manifest, regenerate=None):
+    """Returns a response sending the artifact at `export_path`, or a *304
+    Not Modified* response if the client has it already.
+
+    :param regenerate: callable generating the artifact again and returning
+        its new manifest, used if the artifact went away after it was looked
+        up, e.g. when it was evicted meanwhile.
+    """
+    etag = manifest['etag']
+    if request.META.get('HTTP_IF_NONE_MATCH') == etag:
+        response = HttpResponseNotModified()
+    else:
+        abs_export_path = absolute_real_path(export_path)
+        try:
+            artifact = open(abs_export_path, 'rb')
+        except IOError as e:
+            if regenerate is None:
+                raise
+
+            logging.debug(u"Regenerating %s: %s", abs_export_path, e)
+            manifest = regenerate()
+            etag = manifest['etag']
+            artifact = open(abs_export_path, 'rb')
+
+        mimetype = (mimetypes.guess_type(abs_export_path)[0] or
+                    'application/octet-stream')
+        response = HttpResponse(FileWrapper(artifact), mimetype=mimetype)
+        response['Content-Length'] = manifest['size']
+        response['Content-Disposition'] = get_content_disposition(
+            os.path.basename(abs_export_path),
+        )
+        # Keep middleware from reading the whole file into memory
+        response.streaming = True
+
+    response['ETag'] = etag
+    # Clients revalidate with the ETag, and the file can't be pickled into
+    # the cache anyway
+    add_never_cache_headers(response)
+
+    return response
@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013 Zuza Software Foundation
+#
+# This file is part of Pootle.
+#
+# Pootle is free software; you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 2 of the License, or (at your option) any later
+# version.
+#
+# Pootle is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# Pootle; if not, see <http://www.gnu.org/licenses/>.
+
+"""Durable queue for side effects that can be run in the background.
+
+When :setting:`BACKGROUND_JOBS` is enabled, jobs are stored as
+:cls:`~pootle_app.models.job.Job` rows within the current transaction and
+run later by the ``process_jobs`` command. Pending jobs for the same handler
+are processed together: handlers receive a list with the keyword arguments
+of each job, so they can do their work in bulk.
+"""
+
+import logging
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import simplejson, timezone
+from django.utils.importlib import import_module
+
+
+#: Failing jobs are retried this many times before being left aside
+MAX_ATTEMPTS = 5
+
+#: Jobs claimed longer than this ago are assumed to belong to a dead worker
+CLAIM_TIMEOUT = timedelta(hours=1)
+
+
+def enqueue(handler, **data):
+    """Queues a call to `handler` with the `data` keyword arguments.
+
+    :param handler: Dotted path to a function accepting a list of `data`
+        dictionaries.
+    :param data: JSON-serializable job arguments.
+    """
+    from pootle_app.models.job import Job
+    Job.objects.create(handler=handler, data=simplejson.dumps(data))
+
+
+def get_handler(path):
+    module_name, function_name = path.rsplit('.', 1)
+    return getattr(import_module(module_name), function_name)
+
+
+def process_jobs(batch_size=100):
+    """Claims up to `batch_size` pending jobs and runs them.
+
+    Several workers can run concurrently, each job is only claimed by one of
+    them. Jobs whose handler fails are released so they can be retried, see
+    :func:`run_jobs`.
+
+    :return: The number of jobs claimed.
+    """
+    from pootle_app.models.job import Job
+
+    owner = uuid.uuid4().hex
+    now = timezone.now()
+
+    pending = Job.objects.filter(attempts__lt=MAX_ATTEMPTS).filter(
+        Q(owner='') | Q(claim_time__lt=now - CLAIM_TIMEOUT),
+    )
+    ids = list(pending.values_list('id', flat=True)[:batch_size])
+    # Other workers might be claiming these very same jobs, so only the
+    # ones still pending at update time are ours
+    pending.filter(id__in=ids).update(owner=owner, claim_time=now)
+
+    batches = {}
+    handlers = []
+    jobs = Job.objects.filter(owner=owner)
+    for job in jobs:
+        if job.handler not in batches:
+            batches[job.handler] = []
+            handlers.append(job.handler)
+        batches[job.handler].append(job)
+
+    for handler in handlers:
+        logging.info(u"Running %d %s jobs", len(batches[handler]), handler)
+        run_jobs(handler, batches[handler])
+
+    return len(jobs)
+
+
+def run_jobs(handler, jobs):
+    """Runs `jobs` with `handler` in a single transaction.
+
+    If they fail, they are split in halves and run again, so that only the
+    failing jobs are released with one more attempt.
+    """
+    from pootle_app.models.job import Job
+
+    job_ids = [job.id for job in jobs]
+    try:
+        with transaction.commit_on_success():
+            get_handler(handler)([simplejson.loads(job.data)
+                                  for job in jobs])
+    except Exception:
+        error = traceback.format_exc()
+        if len(jobs) > 1:
+            logging.warning(u"Failed to run %d %s jobs, retrying them in "
+                            u"smaller batches", len(jobs), handler)
+            middle = len(jobs) // 2
+            run_jobs(handler, jobs[:middle])
+            run_jobs(handler, jobs[middle:])
+            return
+
+        logging.error(u"Failed to run %s job:\n%s", handler, error)
+        Job.objects.filter(id__in=job_ids).update(
+            owner='', claim_time=None, attempts=F('attempts') + 1,
+            error=error,
+        )
+    else:
+        Job.objects.filter(id__in=job_ids).delete()
@@ -22,6 +22,11 @@ from django.core.mail import get_connection, EmailMultiAlternatives
 from django.core.mail.message import EmailMessage
 
 
+#: Maximum number of recipients of each message sent by
+#: :func:`send_mass_bcc_mail`
+BCC_BATCH_SIZE = 100
+
+
 def send_mail(subject, message, from_email=None, recipient_list=[],
               bcc=[], cc=[], fail_silently=False, auth_user=None,
               auth_password=None, connection=None, html_message=False):
@@ -63,3 +68,23 @@ def send_mail(subject, message, from_email=None, recipient_list=[],
     else:
         return EmailMessage(subject, message, from_email, recipient_list,
                             bcc=bcc, cc=cc, connection=connection).send()
+
+
+def send_mass_bcc_mail(subject, message, bcc, from_email=None,
+                       fail_silently=False, connection=None,
+                       batch_size=BCC_BATCH_SIZE):
+    """Sends the same message to many recipients, hiding their addresses.
+
+    Recipients are split in messages of up to `batch_size` addresses in the
+    `Bcc` header, which are all sent through the same connection.
+
+    :param bcc: List of recipient addresses.
+    :param connection: An e-mail backend instance. If unset, a new
+                       connection will be created.
+    :return: The number of messages sent.
+    """
+    connection = connection or get_connection(fail_silently=fail_silently)
+    messages = [EmailMessage(subject, message, from_email,
+                             bcc=bcc[i:i + batch_size])
+                for i in range(0, len(bcc), batch_size)]
+    return connection.send_messages(messages)
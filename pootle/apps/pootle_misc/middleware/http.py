@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013 Zuza Software Foundation
+#
+# This file is part of Pootle.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+
+"""Response middleware letting streamed responses through.
+
+Django's versions read the whole content of responses to compute their
+length, compress them or cache them, which defeats streaming. Responses
+with a true ``streaming`` attribute are left untouched instead.
+"""
+
+from django.middleware.cache import \
+        UpdateCacheMiddleware as BaseUpdateCacheMiddleware
+from django.middleware.gzip import GZipMiddleware as BaseGZipMiddleware
+from django.middleware.http import \
+        ConditionalGetMiddleware as BaseConditionalGetMiddleware
+
+
+class UpdateCacheMiddleware(BaseUpdateCacheMiddleware):
+
+    def process_response(self, request, response):
+        if getattr(response, 'streaming', False):
+            return response
+
+        return super(UpdateCacheMiddleware, self) \
+                .process_response(request, response)
+
+
+class ConditionalGetMiddleware(BaseConditionalGetMiddleware):
+
+    def process_response(self, request, response):
+        if getattr(response, 'streaming', False):
+            return response
+
+        return super(ConditionalGetMiddleware, self) \
+                .process_response(request, response)
+
+
+class GZipMiddleware(BaseGZipMiddleware):
+
+    def process_response(self, request, response):
+        if getattr(response, 'streaming', False):
+            return response
+
+        return super(GZipMiddleware, self).process_response(request, response)
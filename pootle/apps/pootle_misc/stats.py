@@ -25,12 +25,14 @@ from django.utils.translation import ugettext_lazy as _, ungettext
 from pootle_misc.util import add_percentages
 
 
-def get_raw_stats(path_obj, include_suggestions=False):
+def get_raw_stats(path_obj, include_suggestions=False, quick_stats=None):
     """Returns a dictionary of raw stats for `path_obj`.
 
     :param path_obj: A Directory/Store object.
     :param include_suggestions: Whether to include suggestion count in the
                                 output or not.
+    :param quick_stats: The result of ``path_obj.getquickstats()``, if it
+                        was already retrieved.
 
     Example::
 
@@ -40,7 +42,9 @@ def get_raw_stats(path_obj, include_suggestions=False):
          'total': {'units': 34, 'percentage': 100, 'words': 181}
          'suggestions': 4 }
     """
-    quick_stats = add_percentages(path_obj.getquickstats())
+    if quick_stats is None:
+        quick_stats = path_obj.getquickstats()
+    quick_stats = add_percentages(quick_stats)
 
     stats = {
         'total': {
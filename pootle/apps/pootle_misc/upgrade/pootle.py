@@ -146,3 +146,90 @@ def upgrade_to_22000():
         if last_sync:
             store.sync_time = last_sync
             store.save()
+
+
+def upgrade_to_25101():
+    """Post-upgrade actions for upgrades to 25101."""
+    from pootle_statistics.models import ContributorStats
+
+    logging.info('Calculating contribution counters for top contributors')
+
+    ContributorStats.objects.rebuild()
+
+
+def upgrade_to_25102():
+    """Post-upgrade actions for upgrades to 25102."""
+    from pootle_statistics.models import ServerStats
+
+    logging.info('Calculating server statistics')
+
+    ServerStats.objects.refresh()
+
+
+def upgrade_to_25103():
+    """Post-upgrade actions for upgrades to 25103."""
+    from pootle_statistics.models import Submission
+    from pootle_translationproject.models import TranslationProject
+
+    logging.info('Storing the latest submission of translation projects')
+
+    for tp in TranslationProject.objects.iterator():
+        try:
+            last_submission = Submission.objects.filter(
+                translation_project=tp,
+            ).latest()
+        except Submission.DoesNotExist:
+            continue
+
+        TranslationProject.objects.filter(id=tp.id) \
+                                  .update(last_submission=last_submission)
+
+
+def upgrade_to_25104():
+    """Post-upgrade actions for upgrades to 25104."""
+    from pootle_app.models.directory import Directory
+    from pootle_statistics.models import Submission
+    from pootle_store.models import Store
+    from pootle_translationproject.models import TranslationProject
+
+    logging.info('Storing the latest activity of directories')
+
+    for tp in TranslationProject.objects.iterator():
+        try:
+            last_submission = Submission.objects.filter(
+                translation_project=tp,
+            ).latest()
+        except Submission.DoesNotExist:
+            continue
+
+        Directory.objects.update_activity(tp.pootle_path,
+                                          submission=last_submission)
+
+    for store in Store.objects.iterator():
+        store.update_directory_mtime()
+
+        try:
+            last_submission = Submission.objects.filter(
+                unit__store=store,
+            ).latest()
+        except Submission.DoesNotExist:
+            continue
+
+        Directory.objects.update_activity(store.pootle_path,
+                                          submission=last_submission)
+
+
+def upgrade_to_25105():
+    """Post-upgrade actions for upgrades to 25105."""
+    from pootle_statistics.models import UnitSubmitter
+    from pootle_store.models import Unit
+
+    logging.info('Counting the suggestions of units')
+
+    Unit.objects.refresh_suggestion_counts(
+        Unit.objects.filter(suggestion__isnull=False).distinct()
+    )
+
+    logging.info('Storing the submitters of units')
+
+    UnitSubmitter.objects.rebuild()
@@ -18,6 +18,7 @@
 # Pootle; if not, see <http://www.gnu.org/licenses/>.
 
 import logging
+import urllib
 from datetime import datetime
 from functools import wraps
 
@@ -50,6 +51,28 @@ def getfromcache(function, timeout=settings.OBJECT_CACHE_TIMEOUT):
     return _getfromcache
 
 
+def getmanyfromcache(instances, function_name):
+    """Bulk version of :func:`getfromcache` for a list of `instances`.
+
+    All the cached results are retrieved at once, and only the missing
+    ones are calculated by calling the `function_name` method.
+
+    :return: List with the result for each of the `instances`.
+    """
+    keys = [iri_to_uri(instance.pootle_path + ":" + function_name)
+            for instance in instances]
+    cached = cache.get_many(keys)
+
+    results = []
+    for key, instance in zip(keys, instances):
+        if key in cached:
+            results.append(cached[key])
+        else:
+            results.append(getattr(instance, function_name)())
+
+    return results
+
+
 def deletefromcache(sender, functions, **kwargs):
     path = iri_to_uri(sender.pootle_path)
     path_parts = path.split("/")
@@ -173,6 +196,26 @@ def ajax_required(f):
     return wrapper
 
 
+def get_content_disposition(filename):
+    """Returns the value of a ``Content-Disposition`` header sending a file
+    to be saved as `filename`.
+
+    Non-ASCII names are given in the RFC 5987 ``filename*`` parameter,
+    along with an ASCII approximation for older clients.
+    """
+    filename = force_unicode(filename)
+    ascii_filename = filename.encode('ascii', 'replace')
+    quoted_filename = ascii_filename.replace('\\', '\\\\') \
+                                    .replace('"', '\\"')
+    value = 'attachment; filename="%s"' % quoted_filename
+
+    if ascii_filename != filename:
+        value += "; filename*=UTF-8''%s" % \
+                urllib.quote(filename.encode('utf-8'), safe='')
+
+    return value
+
+
 def cached_property(f):
     """A property which value is computed only once and then stored with
     the instance for quick repeated retrieval.
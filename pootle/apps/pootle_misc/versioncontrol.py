@@ -21,10 +21,13 @@
 
 import os.path
 import shutil
+from hashlib import md5
 
 from translate.storage import versioncontrol
 
 from django.conf import settings
+from django.core.cache import cache
+from django.utils.encoding import smart_str
 
 from pootle_store.util import relative_real_path
 
@@ -40,30 +43,139 @@ def to_podir_path(path):
     return os.path.join(settings.PODIRECTORY, path)
 
 
+def get_manifest_key(path):
+    path = smart_str(relative_real_path(path))
+    return 'VCSManifest:%s' % md5(path).hexdigest()
+
+
+def get_commit_key(path):
+    path = smart_str(relative_real_path(path))
+    return 'VCSCommitted:%s' % md5(path).hexdigest()
+
+
+def get_file_state(path, known=None):
+    """Returns the ``(size, mtime, digest)`` tuple describing the file at
+    `path`.
+
+    The file is only read when its size or modification time differ from
+    the `known` state.
+    """
+    stat = os.stat(path)
+    if known is not None and known[:2] == (stat.st_size, stat.st_mtime):
+        return known
+
+    digest = md5()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), ''):
+            digest.update(chunk)
+
+    return (stat.st_size, stat.st_mtime, digest.hexdigest())
+
+
+def record_synced(paths):
+    """Records the state of the VCS copies of `paths`, after syncing them
+    with the PO directory.
+    """
+    states = {}
+    for path in paths:
+        vcs_path = to_vcs_path(path)
+        if os.path.exists(vcs_path):
+            states[get_manifest_key(path)] = get_file_state(vcs_path)
+
+    cache.set_many(states, settings.OBJECT_CACHE_TIMEOUT)
+
+
+def record_committed(paths):
+    """Records the state of the PO directory copies of `paths`, once they
+    match what is committed to version control.
+    """
+    states = {}
+    for path in paths:
+        podir_path = to_podir_path(path)
+        if os.path.exists(podir_path):
+            states[get_commit_key(path)] = get_file_state(podir_path)
+
+    cache.set_many(states, settings.OBJECT_CACHE_TIMEOUT)
+
+
+def get_changed(paths):
+    """Returns the set of `paths` whose VCS copy changed since it was last
+    synced with the PO directory.
+
+    Paths whose state wasn't recorded, or is no longer cached, are assumed
+    to have changed.
+    """
+    keys = dict((get_manifest_key(path), path) for path in paths)
+    known_states = cache.get_many(keys.keys())
+
+    changed = set()
+    touched = {}
+    for key, path in keys.iteritems():
+        vcs_path = to_vcs_path(path)
+        known = known_states.get(key)
+        if known is None or not os.path.exists(vcs_path):
+            changed.add(path)
+            continue
+
+        state = get_file_state(vcs_path, tuple(known))
+        if state[2] != known[2]:
+            changed.add(path)
+        elif state != tuple(known):
+            # Same contents, keep the new mtime so the file isn't read again
+            touched[key] = state
+
+    if touched:
+        cache.set_many(touched, settings.OBJECT_CACHE_TIMEOUT)
+
+    return changed
+
+
 def hasversioning(path):
     path = to_vcs_path(path)
     return versioncontrol.hasversioning(path, settings.VCS_DIRECTORY)
 
 
+def is_modified(path):
+    """Tells whether the file at `path` changed since it was last committed
+    to, or updated from, version control.
+
+    Files whose committed state wasn't recorded, or is no longer cached,
+    are assumed to be modified. Failed commits don't record anything, so
+    their files are committed again next time.
+    """
+    podir_path = to_podir_path(path)
+    known = cache.get(get_commit_key(path))
+    if known is None or not os.path.exists(podir_path):
+        return True
+
+    return get_file_state(podir_path, tuple(known))[2] != known[2]
+
+
 def commit_file(path, message, author):
     vcs_path = to_vcs_path(path)
     path = to_podir_path(path)
     shutil.copy2(path, vcs_path)
     versioncontrol.commitfile(vcs_path, message=message, author=author)
+    record_synced([path])
+    record_committed([path])
 
 
 def copy_to_podir(path):
     """Copy the given path from the VCS directory to the PO directory."""
     vcs_path = to_vcs_path(path)
-    path = to_podir_path(path)
-    shutil.copy2(vcs_path, path)
+    podir_path = to_podir_path(path)
+    shutil.copy2(vcs_path, podir_path)
+    record_synced([path])
+    record_committed([path])
 
 
 def update_file(path):
     vcs_path = to_vcs_path(path)
-    path = to_podir_path(path)
+    podir_path = to_podir_path(path)
     versioncontrol.updatefile(vcs_path)
-    shutil.copy2(vcs_path, path)
+    shutil.copy2(vcs_path, podir_path)
+    record_synced([path])
+    record_committed([path])
 
 
 def update_dir(path):
@@ -91,6 +203,10 @@ def add_files(path, files, message, author=None):
         vcs_dir = os.path.dirname(vcs_path)
         if not os.path.exists(vcs_dir):
             os.makedirs(vcs_dir)
-        shutil.copy(podir_path, vcs_path)
+        # Keep the modification time so :func:`get_changed` can tell
+        # unchanged files apart without reading them
+        shutil.copy2(podir_path, vcs_path)
     output = vcs.add([to_vcs_path(f) for f in files], message, author)
+    record_synced(files)
+    record_committed(files)
     return output
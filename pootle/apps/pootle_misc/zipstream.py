@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013 Zuza Software Foundation
+#
+# This file is part of Pootle.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+
+"""Streaming ZIP archive writer.
+
+:mod:`zipfile` needs to seek back into the archive to write the sizes and
+checksum of each member, so archives can't be sent out while they are
+being written. Here each member is followed by a data descriptor holding
+these instead, and the archive is yielded as chunks of compressed data,
+reading members a block at a time.
+
+ZIP64 extensions are not supported, so archives are limited to 4GB.
+"""
+
+import os
+import struct
+import time
+import zlib
+
+
+#: Size of the blocks read from member files
+BLOCK_SIZE = 64 * 1024
+
+ZIP_VERSION = 20
+ZIP_DEFLATED = 8
+
+#: Bit 3: sizes and CRC follow the data, bit 11: names are UTF-8
+FLAGS = 0x08 | 0x800
+
+LOCAL_HEADER = struct.Struct('<LHHHHHLLLHH')
+DATA_DESCRIPTOR = struct.Struct('<LLLL')
+CENTRAL_HEADER = struct.Struct('<LHHHHHHLLLHHHHHLL')
+END_RECORD = struct.Struct('<LHHHHLLH')
+
+
+def dos_datetime(timestamp):
+    """Returns the DOS ``(time, date)`` pair for `timestamp`."""
+    t = time.localtime(timestamp)
+    year = max(t.tm_year, 1980)
+    return ((t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2),
+            ((year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday)
+
+
+def iter_blocks(path, contents=None):
+    """Yields the contents of the file at `path` a block at a time, unless
+    they are given in `contents` already.
+    """
+    if contents is not None:
+        yield contents
+        return
+
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(BLOCK_SIZE), ''):
+            yield block
+
+
+def iter_zip(members):
+    """Yields the chunks of a ZIP archive holding `members`.
+
+    :param members: iterable of ``(path, arcname)`` tuples, where `path` is
+        the file to add to the archive and `arcname` its name within the
+        archive. A third item can hold the contents of the file, if they
+        were read already.
+    """
+    entries = []
+    offset = 0
+
+    for member in members:
+        path, arcname = member[:2]
+        if isinstance(arcname, unicode):
+            arcname = arcname.encode('utf-8')
+        if isinstance(path, unicode):
+            path = path.encode('utf-8')
+
+        dos_time, dos_date = dos_datetime(os.path.getmtime(path))
+        header = LOCAL_HEADER.pack(0x04034b50, ZIP_VERSION, FLAGS,
+                                   ZIP_DEFLATED, dos_time, dos_date,
+                                   0, 0, 0, len(arcname), 0)
+        yield header + arcname
+
+        crc = 0
+        size = 0
+        compressed_size = 0
+        compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION,
+                                      zlib.DEFLATED, -zlib.MAX_WBITS)
+        for block in iter_blocks(path, *member[2:]):
+            crc = zlib.crc32(block, crc)
+            size += len(block)
+            data = compressor.compress(block)
+            if data:
+                compressed_size += len(data)
+                yield data
+
+        data = compressor.flush()
+        compressed_size += len(data)
+        crc &= 0xffffffff
+        yield data + DATA_DESCRIPTOR.pack(0x08074b50, crc, compressed_size,
+                                          size)
+
+        entries.append((arcname, dos_time, dos_date, crc, compressed_size,
+                        size, offset))
+        offset += (LOCAL_HEADER.size + len(arcname) + compressed_size +
+                   DATA_DESCRIPTOR.size)
+
+    directory = []
+    for arcname, dos_time, dos_date, crc, compressed_size, size, \
+        header_offset in entries:
+        directory.append(CENTRAL_HEADER.pack(0x02014b50, ZIP_VERSION,
+                                             ZIP_VERSION, FLAGS, ZIP_DEFLATED,
+                                             dos_time, dos_date, crc,
+                                             compressed_size, size,
+                                             len(arcname), 0, 0, 0, 0,
+                                             0644 << 16, header_offset))
+        directory.append(arcname)
+
+    directory = ''.join(directory)
+    yield directory + END_RECORD.pack(0x06054b50, 0, 0, len(entries),
+                                      len(entries), len(directory), offset, 0)
@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013 Zuza Software Foundation
+#
+# This file is part of Pootle.
+#
+# Pootle is free software; you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 2 of the License, or (at your option) any later
+# version.
+#
+# Pootle is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# Pootle; if not, see <http://www.gnu.org/licenses/>.
+
+"""Background job handlers, see :mod:`pootle_misc.jobs`."""
+
+from django.core.mail import get_connection
+
+from pootle_misc.mail import send_mass_bcc_mail
+
+
+def send_notice_email(batch):
+    """Mails notices to their recipients, reusing a single connection for
+    all of the batch.
+    """
+    connection = get_connection(fail_silently=True)
+    connection.open()
+    try:
+        for data in batch:
+            send_mass_bcc_mail(data['subject'], data['message'],
+                               data['recipients'], connection=connection)
+    finally:
+        connection.close()
@@ -18,6 +18,7 @@
 # You should have received a copy of the GNU General Public License
 # along with this program; if not, see <http://www.gnu.org/licenses/>.
 
+from django.conf import settings
 from django.core.exceptions import PermissionDenied
 from django.shortcuts import get_object_or_404, render_to_response
 from django.template import RequestContext
@@ -26,12 +27,14 @@ from django.utils.translation import ugettext as _
 from pootle.i18n.gettext import tr_lang
 from pootle_app.models import Directory
 from pootle_app.models.permissions import (get_matching_permissions,
+                                           get_profiles_with_permission,
                                            check_permission,
                                            check_profile_permission)
-from pootle_misc.mail import send_mail
+from pootle_misc.jobs import enqueue
+from pootle_misc.mail import BCC_BATCH_SIZE, send_mass_bcc_mail
 from pootle_notifications.forms import form_factory
 from pootle_notifications.models import Notice
-from pootle_profile.models import get_profile, PootleProfile
+from pootle_profile.models import get_profile
 from pootle_translationproject.models import TranslationProject
 
 
@@ -117,24 +120,29 @@ def create_notice(creator, message, directory):
 
 
 def get_recipients(restrict_to_active_users, directory):
-    to_list = PootleProfile.objects.all()
+    to_list = get_profiles_with_permission('view', directory,
+                                           check_default=False)
 
     # Take into account 'only active users' flag from the form.
     if restrict_to_active_users:
         to_list = to_list.exclude(submission=None).exclude(suggestion=None) \
                                                   .exclude(suggester=None)
 
-    recipients = []
-    for person in to_list:
-        # Check if the User profile has permissions in the directory.
-        if not check_profile_permission(person, 'view', directory,
-                                        check_default=False):
-            continue
+    return list(to_list.exclude(user__email='')
+                       .values_list('user__email', flat=True))
 
-        if person.user.email:
-            recipients.append(person.user.email)
 
-    return recipients
+def send_notice_email(subject, message, recipients):
+    """Mails a notice to `recipients`, from background jobs if
+    :setting:`BACKGROUND_JOBS` is enabled.
+    """
+    if settings.BACKGROUND_JOBS:
+        for i in range(0, len(recipients), BCC_BATCH_SIZE):
+            enqueue('pootle_notifications.jobs.send_notice_email',
+                    subject=subject, message=message,
+                    recipients=recipients[i:i + BCC_BATCH_SIZE])
+    else:
+        send_mass_bcc_mail(subject, message, recipients, fail_silently=True)
 
 
 def handle_form(request, current_directory, current_project, current_language,
@@ -213,7 +221,7 @@ def handle_form(request, current_directory, current_project, current_language,
             form.cleaned_data['directory']
         )
         # Send the email to the recipients, ensuring addresses are hidden
-        send_mail(email_header, message, bcc=recipients, fail_silently=True)
+        send_notice_email(email_header, message, recipients)
 
     form = form_factory(current_directory)()
 
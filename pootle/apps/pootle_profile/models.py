@@ -21,18 +21,21 @@
 
 from hashlib import md5
 
+from django.conf import settings
 from django.contrib.auth.models import User, UserManager, AnonymousUser
+from django.core.cache import cache
 from django.db import models
-from django.db.models import Q
-from django.db.models.signals import post_save
+from django.db.models import Count, Q
+from django.db.models.signals import post_save, pre_save
 from django.utils.html import simple_email_re as email_re
 from django.utils.translation import ugettext_lazy as _
 
 from pootle.i18n.override import lang_choices
-from pootle_language.models import Language
+from pootle_app.models import Suggestion as SuggestionStat
 from pootle_misc.baseurl import l
 from pootle_misc.util import cached_property
 from pootle_statistics.models import Submission, SubmissionTypes
+from pootle_store.models import Unit
 from pootle_translationproject.models import TranslationProject
 
 
@@ -235,71 +238,153 @@ class PootleProfile(models.Model):
               ]),
             ]
         """
-        # TODO: optimize — we need a schema that helps reduce the number
-        # of needed queries for these kind of data retrievals
         contributions = []
         username = self.user.username
 
-        languages = Language.objects.filter(
-                translationproject__submission__submitter=self,
-                translationproject__submission__type=SubmissionTypes.NORMAL,
-            ).distinct()
-
-        for language in languages:
-            translation_projects = TranslationProject.objects.filter(
-                    language=language,
-                    submission__submitter=self,
-                    submission__type=SubmissionTypes.NORMAL,
-                ).distinct().order_by('project__fullname')
-
-            tp_user_stats = []
-            # Retrieve tp-specific stats for this user
-            for tp in translation_projects:
-                tp_stats = [
-                    {
-                        'id': 'suggestions-pending',
-                        'count': self.pending_suggestion_count(tp),
-                        'url': tp.get_translate_url('user-suggestions',
-                                                    user=username),
-                    },
-                    {
-                        'id': 'suggestions-accepted',
-                        'count': self.accepted_suggestion_count(tp),
-                        'url': tp.get_translate_url(
-                            'user-suggestions-accepted',
-                            user=username,
-                        ),
-                    },
-                    {
-                        'id': 'suggestions-rejected',
-                        'count': self.rejected_suggestion_count(tp),
-                        'url': tp.get_translate_url(
-                            'user-suggestions-rejected',
-                            user=username,
-                        ),
-                    },
-                    {
-                        'id': 'submissions-total',
-                        'count': self.total_submission_count(tp),
-                        'url': tp.get_translate_url('user-submissions',
-                                                      user=username),
-                    },
-                    {
-                        'id': 'submissions-overwritten',
-                        'count': self.overwritten_submission_count(tp),
-                        'url': tp.get_translate_url(
-                            'user-submissions-overwritten',
-                            user=username,
-                        ),
-                    },
-                ]
-
-                tp_user_stats.append((tp, tp_stats))
-
-            contributions.append((language, tp_user_stats))
+        counts = self.get_contribution_counts()
+        translation_projects = TranslationProject.objects.filter(
+                id__in=counts.keys(),
+            ).select_related('language', 'project') \
+             .order_by('language__code', 'project__fullname')
+
+        for tp in translation_projects:
+            if not contributions or contributions[-1][0] != tp.language:
+                contributions.append((tp.language, []))
+
+            tp_counts = counts[tp.id]
+            tp_stats = [
+                {
+                    'id': 'suggestions-pending',
+                    'count': tp_counts['suggestions-pending'],
+                    'url': tp.get_translate_url(
+                        state='user-suggestions',
+                        user=username,
+                    ),
+                },
+                {
+                    'id': 'suggestions-accepted',
+                    'count': tp_counts['suggestions-accepted'],
+                    'url': tp.get_translate_url(
+                        state='user-suggestions-accepted',
+                        user=username,
+                    ),
+                },
+                {
+                    'id': 'suggestions-rejected',
+                    'count': tp_counts['suggestions-rejected'],
+                    'url': tp.get_translate_url(
+                        state='user-suggestions-rejected',
+                        user=username,
+                    ),
+                },
+                {
+                    'id': 'submissions-total',
+                    'count': tp_counts['submissions-total'],
+                    'url': tp.get_translate_url(
+                        state='user-submissions',
+                        user=username,
+                    ),
+                },
+                {
+                    'id': 'submissions-overwritten',
+                    'count': tp_counts['submissions-overwritten'],
+                    'url': tp.get_translate_url(
+                        state='user-submissions-overwritten',
+                        user=username,
+                    ),
+                },
+            ]
+
+            contributions[-1][1].append((tp, tp_stats))
 
         return contributions
 
+    def get_contribution_counts(self):
+        """Returns the counters shown in :attr:`contributions` for all the
+        translation projects the user submitted translations to.
+
+        The counters are calculated with one grouped query per kind of
+        contribution and cached until the user contributes again.
+
+        :return: Dictionary mapping translation project IDs to dictionaries
+            with the counters keyed by their ``id`` in :attr:`contributions`.
+        """
+        key = get_contributions_cache_key(self.id)
+        counts = cache.get(key)
+        if counts is not None:
+            return counts
+
+        counts = {}
+        submissions = Submission.objects.filter(
+            submitter=self,
+            type=SubmissionTypes.NORMAL,
+        )
+        for counter, queryset in (
+                ('submissions-total', submissions),
+                ('submissions-overwritten',
+                 submissions.exclude(unit__submitted_by=self))):
+            rows = queryset.values('translation_project') \
+                           .annotate(count=Count('id')).order_by()
+            for row in rows:
+                if row['translation_project'] not in counts:
+                    counts[row['translation_project']] = {
+                        'suggestions-pending': 0,
+                        'suggestions-accepted': 0,
+                        'suggestions-rejected': 0,
+                        'submissions-total': 0,
+                        'submissions-overwritten': 0,
+                    }
+                counts[row['translation_project']][counter] = row['count']
+
+        # Only translation projects with submissions are listed
+        rows = self.suggester.filter(translation_project__in=counts.keys()) \
+                             .values('translation_project', 'state') \
+                             .annotate(count=Count('id')).order_by()
+        for row in rows:
+            counter = 'suggestions-%s' % row['state']
+            counts[row['translation_project']][counter] = row['count']
+
+        cache.set(key, counts, settings.OBJECT_CACHE_TIMEOUT)
+        return counts
+
+
+def get_contributions_cache_key(profile_id):
+    return 'profile:%d:contributions' % profile_id
+
+
+def delete_contributions_from_cache(profile_ids):
+    """Invalidates the cached contribution counters of the given profiles."""
+    cache.delete_many([get_contributions_cache_key(profile_id)
+                       for profile_id in profile_ids
+                       if profile_id is not None])
+
+
+def submission_saved(sender, instance, created=False, raw=False, **kwargs):
+    if created and not raw:
+        delete_contributions_from_cache([instance.submitter_id])
+
+
+def suggestion_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        delete_contributions_from_cache([instance.suggester_id])
+
+
+def unit_saved(sender, instance, raw=False, **kwargs):
+    """Invalidates the counters of the previous submitter of a unit, whose
+    submission is now overwritten.
+    """
+    if raw or instance.id is None:
+        return
+
+    old_submitter_id = instance.get_original_value('submitted_by_id')
+    if old_submitter_id != instance.submitted_by_id:
+        delete_contributions_from_cache([old_submitter_id])
+
+
+post_save.connect(submission_saved, sender=Submission)
+post_save.connect(suggestion_saved, sender=SuggestionStat)
+pre_save.connect(unit_saved, sender=Unit)
+
 
 def create_pootle_profile(sender, instance, **kwargs):
     """A post-save hook for the User model which ensures that it gets an
@@ -18,12 +18,14 @@
 # You should have received a copy of the GNU General Public License along with
 # Pootle; if not, see <http://www.gnu.org/licenses/>.
 
+import logging
 import os
+from multiprocessing.pool import ThreadPool
 
 from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
 from django.core.urlresolvers import reverse
-from django.db import models
+from django.db import connection, models
 from django.db.models import Q
 from django.utils.translation import ugettext_lazy as _
 
@@ -32,12 +34,11 @@ from translate.lang.data import langcode_re
 
 from pootle.core.markup import get_markup_filter_name, MarkupField
 from pootle_app.lib.util import RelatedManager
-from pootle_misc.aggregate import max_column
 from pootle_misc.baseurl import l
 from pootle_misc.util import getfromcache, cached_property
 from pootle_store.filetypes import (filetype_choices, factory_classes,
                                     is_monolingual)
-from pootle_store.models import Unit, Suggestion
+from pootle_store.models import Store, Suggestion, delete_meta_from_cache
 from pootle_store.util import absolute_real_path, statssum, OBSOLETE
 
 
@@ -131,6 +132,10 @@ class Project(models.Model):
         cache.delete(CACHE_KEY)
         cache.set(CACHE_KEY, Project.objects.order_by('fullname').all(), 0)
 
+        delete_meta_from_cache(
+            Store.objects.filter(translation_project__project=self),
+        )
+
     def get_absolute_url(self):
         return l(self.pootle_path)
 
@@ -190,12 +195,8 @@ class Project(models.Model):
         # FIXME: far from ideal, should cache at the manager level instead
         cache.delete(CACHE_KEY)
 
-    @getfromcache
     def get_mtime(self):
-        project_units = Unit.objects.filter(
-                store__translation_project__project=self
-        )
-        return max_column(project_units, 'mtime', None)
+        return self.directory.get_mtime()
 
     @getfromcache
     def getquickstats(self):
@@ -327,3 +328,44 @@ class Project(models.Model):
                            .get(language=self.source_language_id)
             except ObjectDoesNotExist:
                 pass
+
+    def update_against_templates(self, translation_projects=None, jobs=1):
+        """Updates translation projects of this project from templates.
+
+        Templates are parsed once for all the translation projects, and
+        targets which didn't change since they were last updated are
+        skipped.
+
+        :param translation_projects: translation projects to update, all of
+            the project's translation projects by default.
+        :param jobs: number of translation projects updated in parallel.
+        """
+        from pootle_app.project_tree import TemplateCache
+
+        if translation_projects is None:
+            translation_projects = self.translationproject_set.all()
+
+        template_tp = self.get_template_translationproject()
+        translation_projects = [tp for tp in translation_projects
+                                if tp != template_tp]
+        templates = TemplateCache()
+
+        def update(translation_project):
+            try:
+                translation_project.update_against_templates(
+                        templates=templates,
+                )
+            except Exception as e:
+                logging.error(u"Failed to update %s against templates:\n%s",
+                              translation_project, e)
+            finally:
+                if jobs > 1:
+                    # Each thread has its own database connection
+                    connection.close()
+
+        if jobs > 1:
+            pool = ThreadPool(jobs)
+            pool.map(update, translation_projects)
+            pool.close()
+        else:
+            map(update, translation_projects)
@@ -36,7 +36,8 @@ from pootle.core.decorators import get_path_obj, permission_required
 from pootle.core.helpers import get_translation_context
 from pootle.i18n.gettext import tr_lang
 from pootle_app.models import Directory
-from pootle_app.models.permissions import check_permission
+from pootle_app.models.permissions import (check_permission,
+                                           check_profile_permission)
 from pootle_app.views.admin import util
 from pootle_app.views.admin.permissions import admin_permissions
 from pootle_app.views.index.index import getprojects
@@ -51,6 +52,8 @@ from pootle_profile.models import get_profile
 from pootle_project.forms import TranslationProjectTagForm
 from pootle_project.models import Project
 from pootle_statistics.models import Submission
+from pootle_translationproject.export import (archive_response,
+                                              export_translation_projects)
 from pootle_translationproject.models import TranslationProject
 
 
@@ -463,3 +466,21 @@ def projects_index(request, root):
 
     return render_to_response('project/projects.html', templatevars,
                               RequestContext(request))
+
+
+@get_path_obj
+@permission_required('archive')
+def export_zip(request, project):
+    """Streams an archive with the files of all languages of `project`."""
+    # Permissions can be restricted for each translation project
+    profile = get_profile(request.user)
+    translation_projects = [
+        tp for tp in project.translationproject_set.select_related(
+            'language', 'project', 'directory',
+        )
+        if check_profile_permission(profile, 'archive', tp.directory)
+    ]
+    archive = export_translation_projects(translation_projects,
+                                          lambda tp: tp.language.code)
+
+    return archive_response(archive, '%s.zip' % project.code)
@@ -19,8 +19,11 @@
 # along with translate; if not, write to the Free Software
 # Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
 
-from django.db import models
+from django.db import models, transaction, IntegrityError
+from django.db.models import Count, F
+from django.db.models.signals import post_save
 from django.template.defaultfilters import escape, truncatechars
+from django.utils import timezone
 from django.utils.safestring import mark_safe
 from django.utils.translation import ugettext_lazy as _
 
@@ -93,14 +96,9 @@ class Submission(models.Model):
         The submission is returned as an action bundle. An empty string is
         returned if no submission exists for the given directory.
         """
-        try:
-            criteria = {
-                'unit__store__pootle_path__startswith': directory.pootle_path,
-            }
-            sub = Submission.objects.filter(**criteria).latest()
-        except Submission.DoesNotExist:
+        if directory.last_submission_id is None:
             return ''
-        return sub.get_submission_message()
+        return directory.last_submission.get_submission_message()
 
     def as_html(self):
         # Sadly we may not have submitter information in all the situations yet
@@ -187,3 +185,269 @@ class Submission(models.Model):
             '    title="%(date)s" datetime="%(isoformat_date)s">&nbsp;'
             '  </time>'
             '</div>' % action_bundle)
+
+
+def get_scope_paths(tp_pootle_path):
+    """Returns the paths of the scopes a translation project's contributions
+    count towards: the whole server, its language, its project and itself.
+    """
+    language_code, project_code = tp_pootle_path.strip('/').split('/')
+    return ('/', '/%s/' % language_code, '/projects/%s/' % project_code,
+            tp_pootle_path)
+
+
+class ContributorStatsManager(models.Manager):
+
+    def increment(self, profile_id, tp_pootle_path, field, amount=1):
+        """Adds `amount` to the `field` counter of the given profile in the
+        translation project and all its parent scopes.
+        """
+        for pootle_path in get_scope_paths(tp_pootle_path):
+            stats = self.filter(profile=profile_id, pootle_path=pootle_path)
+            if stats.update(**{field: F(field) + amount}):
+                continue
+
+            sid = transaction.savepoint()
+            try:
+                self.create(profile_id=profile_id, pootle_path=pootle_path,
+                            **{field: amount})
+                transaction.savepoint_commit(sid)
+            except IntegrityError:
+                # Someone else created the row in the meantime
+                transaction.savepoint_rollback(sid)
+                stats.update(**{field: F(field) + amount})
+
+    def rebuild(self):
+        """Recalculates all the counters from the recorded suggestions and
+        submissions.
+        """
+        from pootle_app.models import Suggestion as SuggestionStat
+
+        sources = (
+            ('suggestions', SuggestionStat.objects.exclude(suggester=None),
+             'suggester'),
+            ('reviews', SuggestionStat.objects.exclude(reviewer=None),
+             'reviewer'),
+            ('submissions', Submission.objects.exclude(submitter=None),
+             'submitter'),
+        )
+
+        counts = {}
+        for field, queryset, profile_field in sources:
+            rows = queryset.values(profile_field,
+                                   'translation_project__pootle_path') \
+                           .annotate(count=Count('id')).order_by()
+            for row in rows.iterator():
+                tp_pootle_path = row['translation_project__pootle_path']
+                for pootle_path in get_scope_paths(tp_pootle_path):
+                    key = (row[profile_field], pootle_path)
+                    if key not in counts:
+                        counts[key] = {
+                            'suggestions': 0,
+                            'reviews': 0,
+                            'submissions': 0,
+                        }
+                    counts[key][field] += row['count']
+
+        self.all().delete()
+        self.bulk_create([
+            ContributorStats(profile_id=profile_id, pootle_path=pootle_path,
+                             **fields)
+            for (profile_id, pootle_path), fields in counts.iteritems()
+        ])
+
+
+class ContributorStats(models.Model):
+    """Number of contributions of a user within a scope (server, language,
+    project or translation project), so the top contributors can be
+    retrieved without aggregating suggestions and submissions.
+    """
+
+    class Meta:
+        unique_together = ('pootle_path', 'profile')
+
+    objects = ContributorStatsManager()
+
+    profile = models.ForeignKey('pootle_profile.PootleProfile', db_index=True)
+    pootle_path = models.CharField(max_length=255, db_index=True)
+
+    suggestions = models.PositiveIntegerField(default=0)
+    reviews = models.PositiveIntegerField(default=0)
+    submissions = models.PositiveIntegerField(default=0)
+
+    def __unicode__(self):
+        return u"%s (%s)" % (self.pootle_path, unicode(self.profile))
+
+
+def count_submission(sender, instance, created=False, raw=False, **kwargs):
+    if raw or not created or instance.submitter_id is None:
+        return
+
+    ContributorStats.objects.increment(
+        instance.submitter_id, instance.translation_project.pootle_path,
+        'submissions',
+    )
+
+post_save.connect(count_submission, sender=Submission)
+
+
+class UnitSubmitterManager(models.Manager):
+
+    def add(self, unit_id, submitter_id):
+        """Records `submitter_id` as a submitter of `unit_id`."""
+        if self.filter(unit=unit_id, submitter=submitter_id).exists():
+            return
+
+        sid = transaction.savepoint()
+        try:
+            self.create(unit_id=unit_id, submitter_id=submitter_id)
+            transaction.savepoint_commit(sid)
+        except IntegrityError:
+            # Someone else created the row in the meantime
+            transaction.savepoint_rollback(sid)
+
+    def rebuild(self):
+        """Recalculates all the submitters from the recorded submissions."""
+        rows = Submission.objects.exclude(unit=None).exclude(submitter=None) \
+                                 .values_list('unit', 'submitter') \
+                                 .order_by().distinct()
+
+        self.all().delete()
+        self.bulk_create([
+            UnitSubmitter(unit_id=unit_id, submitter_id=submitter_id)
+            for unit_id, submitter_id in rows.iterator()
+        ])
+
+
+class UnitSubmitter(models.Model):
+    """Users who made submissions for a unit, so units can be filtered by
+    submitter without joining and deduplicating all their submissions.
+    """
+
+    class Meta:
+        unique_together = ('unit', 'submitter')
+
+    objects = UnitSubmitterManager()
+
+    unit = models.ForeignKey('pootle_store.Unit')
+    submitter = models.ForeignKey('pootle_profile.PootleProfile',
+                                  db_index=True)
+
+    def __unicode__(self):
+        return u"%d (%s)" % (self.unit_id, unicode(self.submitter))
+
+
+def add_unit_submitter(sender, instance, created=False, raw=False, **kwargs):
+    if (raw or not created or instance.unit_id is None or
+        instance.submitter_id is None):
+        return
+
+    UnitSubmitter.objects.add(instance.unit_id, instance.submitter_id)
+
+post_save.connect(add_unit_submitter, sender=Submission)
+
+
+def count_suggestion(sender, instance, raw=False, **kwargs):
+    """Counts new suggestions and reviews, for use in a ``pre_save``
+    handler for :cls:`pootle_app.models.Suggestion`.
+    """
+    if raw:
+        return
+
+    tp_pootle_path = None
+    if instance.id is None:
+        old_reviewer_id = None
+        if instance.suggester_id is not None:
+            tp_pootle_path = instance.translation_project.pootle_path
+            ContributorStats.objects.increment(instance.suggester_id,
+                                               tp_pootle_path, 'suggestions')
+    else:
+        old_reviewer_id = instance.get_original_value('reviewer_id')
+
+    if instance.reviewer_id not in (None, old_reviewer_id):
+        tp_pootle_path = (tp_pootle_path or
+                          instance.translation_project.pootle_path)
+        ContributorStats.objects.increment(instance.reviewer_id,
+                                           tp_pootle_path, 'reviews')
+
+
+class ServerStatsManager(models.Manager):
+
+    def refresh(self):
+        """Calculates the server wide statistics and stores them, replacing
+        any previous ones.
+        """
+        from django.contrib.auth.models import User
+
+        from pootle_app.models import Suggestion as SuggestionStat
+        from pootle_misc.aggregate import sum_column
+        from pootle_store.models import Suggestion, Unit
+
+        stats = ServerStats(creation_time=timezone.now())
+
+        # 'default' and 'nobody' might be counted
+        # FIXME: the special users should not be retuned with is_active
+        stats.user_count = max(User.objects.filter(is_active=True).count() - 2,
+                               0)
+        stats.submission_count = (Submission.objects.count() +
+                                  SuggestionStat.objects.count())
+        stats.pending_count = Suggestion.objects.count()
+
+        unit_query = Unit.objects.filter(state__gte=TRANSLATED) \
+            .exclude(store__translation_project__project__code__in=(
+                'pootle', 'tutorial', 'terminology')) \
+            .exclude(store__translation_project__language__code='templates') \
+            .order_by()
+        stats.store_count = unit_query.values('store').distinct().count()
+        stats.project_count = unit_query.values(
+            'store__translation_project__project').distinct().count()
+        stats.language_count = unit_query.values(
+            'store__translation_project__language').distinct().count()
+        sums = sum_column(unit_query, ('source_wordcount',), count=True)
+        stats.string_count = sums['count']
+        stats.word_count = sums['source_wordcount'] or 0
+
+        # Collecting the IDs separately is much cheaper than OR-ing the
+        # joins with all three tables
+        active_users = set()
+        for queryset, column in (
+                (Submission.objects.exclude(submitter=None), 'submitter'),
+                (Suggestion.objects.exclude(user=None), 'user'),
+                (SuggestionStat.objects.exclude(suggester=None),
+                 'suggester')):
+            active_users.update(queryset.order_by().values_list(column,
+                                                                flat=True)
+                                        .distinct())
+        stats.user_active_count = len(active_users)
+
+        self.all().delete()
+        stats.save()
+
+        return stats
+
+
+class ServerStats(models.Model):
+    """Summary of the server wide statistics displayed in the admin
+    dashboard, as calculated by the ``refresh_server_stats`` command.
+    """
+
+    objects = ServerStatsManager()
+
+    class Meta:
+        get_latest_by = 'creation_time'
+
+    creation_time = models.DateTimeField()
+
+    user_count = models.PositiveIntegerField(default=0)
+    submission_count = models.PositiveIntegerField(default=0)
+    pending_count = models.PositiveIntegerField(default=0)
+
+    store_count = models.PositiveIntegerField(default=0)
+    project_count = models.PositiveIntegerField(default=0)
+    language_count = models.PositiveIntegerField(default=0)
+    string_count = models.PositiveIntegerField(default=0)
+    word_count = models.PositiveIntegerField(default=0)
+    user_active_count = models.PositiveIntegerField(default=0)
+
+    def __unicode__(self):
+        return unicode(self.creation_time)
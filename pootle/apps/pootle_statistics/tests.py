@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013 Zuza Software Foundation
+#
+# This file is part of Pootle.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+
+from django.utils import timezone
+
+from pootle.tests import PootleTestCase
+from pootle_app.models import Suggestion as SuggestionStat
+from pootle_profile.models import PootleProfile
+from pootle_statistics.models import ContributorStats, Submission
+from pootle_store.models import Store
+
+
+class ContributorStatsTests(PootleTestCase):
+    def setUp(self):
+        super(ContributorStatsTests, self).setUp()
+        self.store = Store.objects.get(pootle_path="/af/tutorial/pootle.po")
+
+    def test_increment_and_rebuild(self):
+        translation_project = self.store.translation_project
+        profile = PootleProfile.objects.get(user__username='admin')
+        unit = self.store.units[0]
+        suggestion = SuggestionStat.objects.create(
+            translation_project=translation_project, suggester=profile,
+            unit=unit.id,
+        )
+        suggestion.reviewer = profile
+        suggestion.state = 'accepted'
+        suggestion.save()
+        Submission.objects.create(
+            creation_time=timezone.now(), submitter=profile, unit=unit,
+            translation_project=translation_project,
+        )
+
+        def get_counts():
+            return dict(
+                (stats.pootle_path,
+                 (stats.suggestions, stats.reviews, stats.submissions))
+                for stats in ContributorStats.objects.filter(profile=profile)
+            )
+
+        counts = get_counts()
+        for pootle_path in ('/', '/af/', '/projects/tutorial/',
+                            '/af/tutorial/'):
+            self.assertEqual(counts[pootle_path], (1, 1, 1))
+
+        ContributorStats.objects.rebuild()
+        self.assertEqual(get_counts(), counts)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013 Zuza Software Foundation
+#
+# This file is part of Pootle.
+#
+# Pootle is free software; you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 2 of the License, or (at your option) any later
+# version.
+#
+# Pootle is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# Pootle; if not, see <http://www.gnu.org/licenses/>.
+
+"""Exporting stores to other file formats, see
+:mod:`pootle_misc.exportcache`."""
+
+import os
+
+from django.conf import settings
+
+from pootle_misc import exportcache
+
+
+def get_export_path(store, filetype):
+    """Returns the path of the export of `store` as `filetype`, relative to
+    the PO directory.
+    """
+    path = store.real_path
+    if not path:
+        # bug 2106
+        if store.translation_project.project.get_treestyle() == "gnu":
+            path = "/".join(store.pootle_path.split(os.path.sep)[2:])
+        else:
+            parts = store.pootle_path.split(os.path.sep)[1:]
+            path = "%s/%s/%s" % (parts[1], parts[0], "/".join(parts[2:]))
+
+    path, ext = os.path.splitext(path)
+    return "/".join(['POOTLE_EXPORT', path + os.path.extsep + filetype])
+
+
+def write_export(store, filetype, path):
+    """Writes `store` converted to `filetype` into `path`."""
+    if filetype == 'xlf':
+        from translate.storage.poxliff import PoXliffFile
+        outputstore = store.convert(PoXliffFile)
+        outputstore.switchfile(store.name, createifmissing=True)
+    else:
+        from pootle_store.filetypes import factory_classes
+        outputstore = store.convert(factory_classes[filetype])
+
+    outputstore.savefile(path)
+
+
+def export_store(store, filetype, force=False):
+    """Exports `store` as `filetype`, unless its export is up to date.
+
+    :param force: Export `store` even if its export is up to date.
+    :return: A tuple with the export path and the manifest of the export.
+    """
+    export_path = get_export_path(store, filetype)
+    generation = exportcache.get_generation(store)
+
+    manifest = None
+    if not force:
+        manifest = exportcache.get_artifact(export_path, generation)
+
+    if manifest is None:
+        manifest = exportcache.store_artifact(
+            export_path, generation,
+            lambda path: write_export(store, filetype, path),
+        )
+
+        if exportcache.needs_eviction():
+            if settings.BACKGROUND_JOBS:
+                from pootle_misc.jobs import enqueue
+                enqueue('pootle_store.jobs.evict_exports')
+            else:
+                exportcache.evict()
+
+    return export_path, manifest
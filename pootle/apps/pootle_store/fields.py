@@ -22,8 +22,10 @@
 
 import logging
 import os
+import threading
 
 from django.db import models
+from django.db.models import F
 from django.db.models.fields.files import FieldFile, FileField
 
 from south.modelsinspector import add_introspection_rules
@@ -119,6 +121,26 @@ add_introspection_rules(
     )
 
 
+class CounterField(models.IntegerField):
+    """Integer field which is only ever changed through ``F()`` updates.
+
+    Saving an existing instance leaves the column as it is in the database,
+    so instances loaded before a concurrent update don't overwrite it with
+    their stale value.
+    """
+
+    def pre_save(self, model_instance, add):
+        if add:
+            return super(CounterField, self).pre_save(model_instance, add)
+
+        return F(self.attname)
+
+add_introspection_rules(
+        [],
+        ["^pootle_store\.fields\.CounterField"],
+    )
+
+
 ################# File ###############################
 
 
@@ -140,6 +162,8 @@ class TranslationStoreFieldFile(FieldFile):
 
     _store_cache = LRUCachingDict(settings.PARSE_POOL_SIZE,
                                   settings.PARSE_POOL_CULL_FREQUENCY)
+    # LRUCachingDict isn't thread-safe, and commands can use several threads
+    _store_cache_lock = threading.RLock()
 
     def getpomtime(self):
         file_stat = os.stat(self.realpath)
@@ -176,7 +200,8 @@ class TranslationStoreFieldFile(FieldFile):
         if (not hasattr(self, "_store_tuple") or
             self._store_tuple.mod_info != mod_info):
             try:
-                self._store_tuple = self._store_cache[self.path]
+                with self._store_cache_lock:
+                    self._store_tuple = self._store_cache[self.path]
                 if self._store_tuple.mod_info != mod_info:
                     # if file is modified act as if it doesn't exist in cache
                     raise KeyError
@@ -190,7 +215,8 @@ class TranslationStoreFieldFile(FieldFile):
                                               classes=factory_classes)
                 self._store_tuple = StoreTuple(store_obj, mod_info,
                                                self.realpath)
-                self._store_cache[self.path] = self._store_tuple
+                with self._store_cache_lock:
+                    self._store_cache[self.path] = self._store_tuple
 
                 translation_file_updated.send(sender=self, path=self.path)
 
@@ -208,7 +234,8 @@ class TranslationStoreFieldFile(FieldFile):
     def _delete_store_cache(self):
         """Remove translation store from cache."""
         try:
-            del self._store_cache[self.path]
+            with self._store_cache_lock:
+                del self._store_cache[self.path]
         except KeyError:
             pass
 
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013 Zuza Software Foundation
+#
+# This file is part of Pootle.
+#
+# Pootle is free software; you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 2 of the License, or (at your option) any later
+# version.
+#
+# Pootle is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# Pootle; if not, see <http://www.gnu.org/licenses/>.
+
+"""Background job handlers, see :mod:`pootle_misc.jobs`."""
+
+import logging
+
+from django.conf import settings
+
+from pootle_misc import exportcache
+from pootle_misc.jobs import enqueue
+from pootle_misc.util import deletefromcache
+
+from .export import export_store
+from .models import PARSED, Store, Unit, UnitTrigram
+from .signals import translation_submitted
+
+
+def update_units(batch):
+    """Runs the updates deferred by :meth:`Unit.save` for a batch of units.
+
+    Each job holds the unit id along with whether its quality checks and
+    search trigrams need to be updated. Caches are flushed and directory
+    modification times updated once per store, and exports of the stores
+    in :setting:`EXPORT_PREGENERATE_FORMATS` are queued.
+    """
+    flags = {}
+    for data in batch:
+        checks, trigrams = flags.get(data['unit'], (False, False))
+        flags[data['unit']] = (checks or data['checks'],
+                               trigrams or data['trigrams'])
+
+    stores = {}
+    for unit in Unit.objects.filter(id__in=flags.keys()).iterator():
+        checks, trigrams = flags[unit.id]
+        if trigrams:
+            UnitTrigram.objects.update_for_unit(unit)
+        if checks:
+            unit.update_qualitychecks()
+
+        stores[unit.store_id] = unit.store
+
+    for store in stores.itervalues():
+        if store.state >= PARSED:
+            deletefromcache(store, ["getquickstats", "getcompletestats",
+                                    "get_mtime", "get_suggestion_count"])
+            store.update_directory_mtime()
+
+            for filetype in settings.EXPORT_PREGENERATE_FORMATS:
+                enqueue('pootle_store.jobs.export_stores', store=store.id,
+                        filetype=filetype)
+
+
+def send_translation_submitted(batch):
+    """Sends the :data:`~pootle_store.signals.translation_submitted` signal
+    for each submitted unit.
+    """
+    from pootle_profile.models import PootleProfile
+    from pootle_translationproject.models import TranslationProject
+
+    units = Unit.objects.in_bulk(set(data['unit'] for data in batch))
+    profiles = PootleProfile.objects.in_bulk(
+        set(data['profile'] for data in batch),
+    )
+    translation_projects = TranslationProject.objects.in_bulk(
+        set(data['translation_project'] for data in batch),
+    )
+
+    for data in batch:
+        if data['unit'] not in units:
+            continue  # the unit is gone already
+
+        translation_submitted.send(
+                sender=translation_projects[data['translation_project']],
+                unit=units[data['unit']],
+                profile=profiles[data['profile']],
+        )
+
+
+def export_stores(batch):
+    """Generates the exports of stores which are out of date."""
+    exports = set((data['store'], data['filetype']) for data in batch)
+    stores = Store.objects.in_bulk(set(store_id for store_id, filetype
+                                       in exports))
+
+    for store_id, filetype in exports:
+        store = stores.get(store_id)
+        if store is None or store.pootle_path.endswith(filetype):
+            continue
+
+        try:
+            export_store(store, filetype)
+        except Exception as e:
+            logging.error(u"Failed to export %s as %s:\n%s",
+                          store.pootle_path, filetype, e)
+
+
+def evict_exports(batch):
+    """Evicts the least recently used exports if they take too much space."""
+    exportcache.evict()
@@ -28,30 +28,36 @@ from translate.filters.decorators import Category
 from translate.storage import base
 
 from django.conf import settings
+from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist
 from django.core.files.storage import FileSystemStorage
 from django.core.urlresolvers import reverse
-from django.db import models, DatabaseError, IntegrityError
-from django.db.models.signals import post_delete
+from django.db import connection, models, DatabaseError, IntegrityError
+from django.db.models import Count, F
+from django.db.models.signals import post_delete, post_save
 from django.db.transaction import commit_on_success
 from django.utils import timezone, tzinfo
+from django.utils.encoding import iri_to_uri
 from django.utils.translation import ugettext_lazy as _
 
 from taggit.managers import TaggableManager
 
+from pootle.core.mixins import DirtyFieldsMixin
 from pootle.core.url_helpers import get_editor_filter, split_pootle_path
 from pootle_app.lib.util import RelatedManager
 from pootle_misc.aggregate import group_by_count_extra, max_column
 from pootle_misc.baseurl import l
 from pootle_misc.checks import check_names
+from pootle_misc.jobs import enqueue
 from pootle_misc.util import (cached_property, getfromcache, deletefromcache,
                               datetime_min)
 from pootle_statistics.models import SubmissionFields, SubmissionTypes
 from pootle_store.fields import (TranslationStoreField, MultiStringField,
-                                 PLURAL_PLACEHOLDER, SEPARATOR)
+                                 CounterField, PLURAL_PLACEHOLDER, SEPARATOR,
+                                 to_db)
 from pootle_store.filetypes import factory_classes, is_monolingual
 from pootle_store.util import (calculate_stats, empty_quickstats,
-                               OBSOLETE, UNTRANSLATED, FUZZY, TRANSLATED)
+                               get_path_lookups, get_trigrams, OBSOLETE, UNTRANSLATED, FUZZY, TRANSLATED)
 
 
 #
@@ -159,6 +165,23 @@ def delete_votes(sender, instance, **kwargs):
 post_delete.connect(delete_votes, sender=Suggestion)
 
 
+def suggestion_added(sender, instance, created=False, raw=False, **kwargs):
+    if raw or not created:
+        return
+
+    Unit.objects.filter(id=instance.unit_id) \
+                .update(suggestion_count=F('suggestion_count') + 1)
+
+post_save.connect(suggestion_added, sender=Suggestion)
+
+
+def suggestion_deleted(sender, instance, **kwargs):
+    Unit.objects.filter(id=instance.unit_id) \
+                .update(suggestion_count=F('suggestion_count') - 1)
+
+post_delete.connect(suggestion_deleted, sender=Suggestion)
+
+
 ############### Unit ####################
 
 def fix_monolingual(oldunit, newunit, monolingual=None):
@@ -213,24 +236,38 @@ class UnitManager(RelatedManager):
 
         # /projects/<project_code>/translate/*
         if lang is None and proj is not None:
-            units_qs = units_qs.extra(
-                where=[
-                    '`pootle_store_store`.`pootle_path` LIKE %s',
-                    '`pootle_store_store`.`pootle_path` NOT LIKE %s',
-                ], params=[''.join(['/%/', proj ,'/%']), '/templates/%']
+            units_qs = units_qs.filter(
+                store__translation_project__project__code=proj,
+            ).exclude(
+                store__translation_project__language__code='templates',
             )
         # /<lang_code>/<project_code>/translate/*
         # /<lang_code>/translate/*
         # /translate/*
         else:
             units_qs = units_qs.filter(
-                store__pootle_path__startswith=pootle_path,
+                **get_path_lookups(pootle_path, prefix='store__')
             )
 
         return units_qs
 
+    def refresh_suggestion_counts(self, units):
+        """Recomputes the suggestion counts of `units`, fixing the ones
+        which went out of sync.
+        """
+        counts = dict(Suggestion.objects.filter(unit__in=units)
+                                        .values_list('unit')
+                                        .annotate(count=Count('id'))
+                                        .order_by())
+
+        for unit_id, suggestion_count in units.values_list(
+                'id', 'suggestion_count').iterator():
+            count = counts.get(unit_id, 0)
+            if count != suggestion_count:
+                self.filter(id=unit_id).update(suggestion_count=count)
+
 
-class Unit(models.Model, base.TranslationUnit):
+class Unit(DirtyFieldsMixin, models.Model, base.TranslationUnit):
     store = models.ForeignKey("pootle_store.Store", db_index=True)
     index = models.IntegerField(db_index=True)
     unitid = models.TextField(editable=False)
@@ -270,8 +307,16 @@ class Unit(models.Model, base.TranslationUnit):
     commented_on = models.DateTimeField(auto_now_add=True, db_index=True,
             null=True)
 
+    #: Number of pending suggestions, kept up to date by signal handlers.
+    #: Saving a unit doesn't write it, see :cls:`CounterField`.
+    suggestion_count = CounterField(default=0, db_index=True, editable=False)
+
     objects = UnitManager()
 
+    tracked_fields = ('state', 'target_f', 'source_wordcount',
+                      'target_wordcount', 'developer_comment',
+                      'translator_comment', 'locations', 'submitted_by')
+
     class Meta:
         ordering = ['store', 'index']
         unique_together = ('store', 'unitid_hash')
@@ -314,6 +359,10 @@ class Unit(models.Model, base.TranslationUnit):
             elif self.state > FUZZY:
                 self.state = UNTRANSLATED
 
+        created = self.id is None
+        search_updated = (created or self._source_updated or
+                          self._target_updated or self._notes_updated())
+
         super(Unit, self).save(*args, **kwargs)
 
         if (settings.AUTOSYNC and self.store.file and
@@ -324,20 +373,53 @@ class Unit(models.Model, base.TranslationUnit):
             self.store.update_store_header()
             self.store.file.savestore()
 
-        if (self.store.state >= CHECKED and
-            (self._source_updated or self._target_updated)):
-            #FIXME: are we sure only source and target affect quality checks?
-            self.update_qualitychecks()
+        #FIXME: are we sure only source and target affect quality checks?
+        update_checks = (self.store.state >= CHECKED and
+                         (self._source_updated or self._target_updated))
+        update_trigrams = search_updated and use_trigram_table()
+
+        if settings.BACKGROUND_JOBS:
+            if (update_checks or update_trigrams or
+                self.store.state >= PARSED):
+                enqueue('pootle_store.jobs.update_units', unit=self.id,
+                        checks=update_checks, trigrams=update_trigrams)
+        else:
+            if update_trigrams:
+                UnitTrigram.objects.update_for_unit(self, created=created)
+
+            if update_checks:
+                self.update_qualitychecks()
+
+            if self.store.state >= PARSED:
+                # updated caches
+                store = self.store
+                deletefromcache(store, ["getquickstats", "getcompletestats",
+                                        "get_mtime", "get_suggestion_count"])
+
+                from pootle_app.models.directory import Directory
+                Directory.objects.update_activity(store.pootle_path,
+                                                  mtime=self.mtime)
 
         # done processing source/target update remove flag
         self._source_updated = False
         self._target_updated = False
 
-        if self.store.state >= PARSED:
-            # updated caches
-            store = self.store
-            deletefromcache(store, ["getquickstats", "getcompletestats",
-                                    "get_mtime", "get_suggestion_count"])
+    def _notes_updated(self):
+        dirty_fields = self.get_dirty_fields()
+        return any(field in dirty_fields for field in
+                   ('developer_comment', 'translator_comment', 'locations'))
+
+    def get_search_texts(self):
+        """Returns a dictionary with the raw database value of each field
+        covered by the search trigram index.
+        """
+        return {
+            'source_f': to_db(self.source_f),
+            'target_f': to_db(self.target_f),
+            'developer_comment': self.developer_comment,
+            'translator_comment': self.translator_comment,
+            'locations': self.locations,
+        }
 
     def get_absolute_url(self):
         return l(self.store.pootle_path)
@@ -782,6 +864,8 @@ class Unit(models.Model, base.TranslationUnit):
         suggestion.target = translation
         try:
             suggestion.save()
+            # The database count is updated by the `suggestion_added` handler
+            self.suggestion_count += 1
             if touch:
                 self.save()
         except:
@@ -805,6 +889,7 @@ class Unit(models.Model, base.TranslationUnit):
         # ``save``, otherwise the quality checks won't be properly updated
         # when saving the unit.
         suggestion.delete()
+        self.suggestion_count -= 1
         self.save()
 
         if settings.AUTOSYNC and self.file:
@@ -822,6 +907,7 @@ class Unit(models.Model, base.TranslationUnit):
             return False
 
         suggestion.delete()
+        self.suggestion_count -= 1
         # Update timestamp
         self.save()
 
@@ -838,8 +924,91 @@ class Unit(models.Model, base.TranslationUnit):
         return result
 
 
+################# Search Trigrams ################
+
+def use_trigram_table():
+    """Whether search trigrams are maintained in the
+    :cls:`~pootle_store.models.UnitTrigram` table.
+
+    PostgreSQL relies on the native ``pg_trgm`` indexes instead.
+    """
+    return (settings.SEARCH_TRIGRAM_INDEX and
+            connection.vendor != 'postgresql')
+
+
+class UnitTrigramManager(RelatedManager):
+
+    def update_for_unit(self, unit, created=False):
+        """Brings the trigrams stored for `unit` in sync with its current
+        searchable fields.
+        """
+        trigrams = set()
+        for field, text in unit.get_search_texts().iteritems():
+            trigrams.update((field, trigram) for trigram in get_trigrams(text))
+
+        if not created:
+            stale_ids = []
+            for id, field, trigram in self.filter(unit=unit) \
+                                          .values_list('id', 'field',
+                                                       'trigram'):
+                if (field, trigram) in trigrams:
+                    trigrams.remove((field, trigram))
+                else:
+                    stale_ids.append(id)
+
+            if stale_ids:
+                self.filter(id__in=stale_ids).delete()
+
+        self.bulk_create([
+            UnitTrigram(unit=unit, field=field, trigram=trigram)
+            for field, trigram in trigrams
+        ])
+
+    def get_unit_ids(self, field, text):
+        """Returns a queryset with the ids of the units whose `field`
+        contains all the trigrams of `text`.
+
+        These units are candidates only, callers still need to check the
+        actual field contents. ``None`` is returned when the trigram table
+        can't be used to narrow down the search.
+        """
+        trigrams = get_trigrams(text)
+        if not trigrams or not use_trigram_table():
+            return None
+
+        # Case/accent insensitive collations can match a stored trigram
+        # more than once, hence the lower bound
+        return self.filter(field=field, trigram__in=trigrams) \
+                   .values('unit') \
+                   .annotate(matches=Count('id')) \
+                   .filter(matches__gte=len(trigrams)) \
+                   .values_list('unit', flat=True)
+
+
+class UnitTrigram(models.Model):
+    """Trigram found in one of the searchable fields of a unit."""
+    unit = models.ForeignKey('pootle_store.Unit', db_index=True)
+    field = models.CharField(max_length=32)
+    trigram = models.CharField(max_length=3, db_index=True)
+
+    objects = UnitTrigramManager()
+
+    def __unicode__(self):
+        return self.trigram
+
+
 ###################### Store ###########################
 
+def delete_meta_from_cache(stores):
+    """Removes the cached :meth:`Store.get_meta` records for the `stores`
+    queryset.
+    """
+    cache.delete_many([
+        iri_to_uri(pootle_path + ":get_meta")
+        for pootle_path in stores.values_list('pootle_path', flat=True)
+    ])
+
+
 # custom storage otherwise djago assumes all files are uploads headed to
 # media dir
 fs = FileSystemStorage(location=settings.PODIRECTORY)
@@ -917,6 +1086,17 @@ class Store(models.Model, base.TranslationStore):
             # new units, let's flush cache
             deletefromcache(self, ["getquickstats", "getcompletestats",
                                    "get_mtime", "get_suggestion_count"])
+            self.update_directory_mtime()
+
+    def update_directory_mtime(self):
+        """Propagates the latest unit change to the containing
+        directories.
+        """
+        from pootle_app.models.directory import Directory
+
+        mtime = self.get_mtime()
+        if mtime != datetime_min:
+            Directory.objects.update_activity(self.pootle_path, mtime=mtime)
 
     def get_absolute_url(self):
         return l(self.pootle_path)
@@ -937,6 +1117,26 @@ class Store(models.Model, base.TranslationStore):
     def get_mtime(self):
         return max_column(self.unit_set.all(), 'mtime', datetime_min)
 
+    @getfromcache
+    def get_meta(self):
+        """Returns the language and project metadata the editor needs to
+        display the units of this store.
+
+        The cached record is removed by :func:`delete_meta_from_cache`
+        whenever the project or languages involved change.
+        """
+        tp = self.translation_project
+        project = tp.project
+        return {
+            'source_lang': project.source_language.code,
+            'source_dir': project.source_language.get_direction(),
+            'target_lang': tp.language.code,
+            'target_dir': tp.language.get_direction(),
+            'target_nplurals': tp.language.nplurals,
+            'project_code': project.code,
+            'project_style': project.checkstyle,
+        }
+
     @classmethod
     def _get_mtime_from_header(cls, store):
         mtime = None
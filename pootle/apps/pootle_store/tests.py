@@ -17,15 +17,25 @@
 #
 # You should have received a copy of the GNU General Public License
 # along with this program; if not, see <http://www.gnu.org/licenses/>.
+import os
 import time
 
-from django.utils import simplejson
+from django.core.urlresolvers import reverse
+from django.test.utils import override_settings
+from django.utils import simplejson, timezone
 
 from translate.storage import factory
 from translate.storage import statsdb
 
 from pootle.tests import PootleTestCase
-from pootle_store.models import Store, Unit
+from pootle_app.models import Directory, Job
+from pootle_app.models import Suggestion as SuggestionStat
+from pootle_misc.jobs import process_jobs
+from pootle_profile.models import PootleProfile
+from pootle_statistics.models import (Submission, SubmissionTypes,
+                                      UnitSubmitter)
+from pootle_store.models import Store, Unit, UnitTrigram
+from pootle_store.util import UNTRANSLATED
 
 class UnitTests(PootleTestCase):
     def setUp(self):
@@ -130,6 +140,40 @@ class UnitTests(PootleTestCase):
         pofile = factory.getobject(self.store.file.path)
         self.assertEqual(dbunit.getnotes(origin="translator"), pofile.units[dbunit.index].getnotes(origin="translator"))
 
+    def test_original_values(self):
+        unit = self.store.units.filter(state=UNTRANSLATED)[0]
+        unit.target = u'samaka'
+        unit.translator_comment = u'7amada'
+        dirty_fields = unit.get_dirty_fields()
+        self.assertTrue('target_f' in dirty_fields)
+        self.assertTrue('translator_comment' in dirty_fields)
+
+        unit.save()
+        self.assertEqual(unit.get_original_value('state'), unit.state)
+        self.assertEqual(unit.get_dirty_fields(), {})
+
+    def test_get_for_path(self):
+        profile = PootleProfile.objects.get(user__username='admin')
+        unit_count = self.store.units.count()
+        for pootle_path in ('/af/', '/af/tutorial/', '/projects/tutorial/',
+                            self.store.pootle_path):
+            units = Unit.objects.get_for_path(pootle_path, profile)
+            self.assertEqual(units.filter(store=self.store).count(),
+                             unit_count)
+            self.assertFalse(units.filter(
+                store__pootle_path__startswith='/templates/').exists())
+
+    def test_directory_stores(self):
+        self.store.getitem(0).add_suggestion(u'gras')
+        for pootle_path in ('/', '/af/', '/af/tutorial/'):
+            directory = Directory.objects.get(pootle_path=pootle_path)
+            self.assertTrue(directory.stores.filter(pk=self.store.pk).exists())
+            self.assertEqual(directory.get_suggestion_count(), 1)
+        for pootle_path in ('/projects/', '/projects/tutorial/'):
+            directory = Directory.objects.get(pootle_path=pootle_path)
+            self.assertEqual(directory.stores.count(), 0)
+            self.assertEqual(directory.get_suggestion_count(), 0)
+
 
 class SuggestionTests(PootleTestCase):
     def setUp(self):
@@ -146,6 +190,62 @@ class SuggestionTests(PootleTestCase):
         suggestion.target = "gras++"
         assert first_hash != second_hash != suggestion.target_hash
 
+    def test_suggestion_count(self):
+        unit = self.store.getitem(0)
+        first = unit.add_suggestion(u"gras")
+        unit.add_suggestion(u"gras++", touch=False)
+        self.assertEqual(unit.suggestion_count, 2)
+        self.assertEqual(Unit.objects.get(id=unit.id).suggestion_count, 2)
+
+        # Saving a unit loaded earlier doesn't overwrite the count
+        unit.save()
+        self.assertEqual(Unit.objects.get(id=unit.id).suggestion_count, 2)
+
+        unit.reject_suggestion(first.id)
+        self.assertEqual(unit.suggestion_count, 1)
+        self.assertEqual(Unit.objects.get(id=unit.id).suggestion_count, 1)
+        units = Unit.objects.filter(store=self.store, suggestion_count__gt=0)
+        self.assertEqual(list(units), [unit])
+
+        Unit.objects.filter(id=unit.id).update(suggestion_count=5)
+        Unit.objects.refresh_suggestion_counts(self.store.unit_set.all())
+        self.assertEqual(Unit.objects.get(id=unit.id).suggestion_count, 1)
+
+
+class UnitTrigramTests(PootleTestCase):
+    def setUp(self):
+        super(UnitTrigramTests, self).setUp()
+        self.store = Store.objects.get(pootle_path="/af/tutorial/pootle.po")
+
+    @override_settings(SEARCH_TRIGRAM_INDEX=True)
+    def test_candidates(self):
+        unit = self.store.getitem(0)
+        unit.target = u'Samaka kaMPU'
+        unit.save()
+
+        candidates = UnitTrigram.objects.get_unit_ids('target_f', u'ka kamp')
+        self.assertEqual(list(candidates), [unit.id])
+
+        unit.target = u'gras'
+        unit.save()
+        candidates = UnitTrigram.objects.get_unit_ids('target_f', u'kamp')
+        self.assertEqual(list(candidates), [])
+
+        self.assertEqual(UnitTrigram.objects.get_unit_ids('target_f', u'ka'),
+                         None)
+
+    @override_settings(SEARCH_TRIGRAM_INDEX=True)
+    def test_new_unit(self):
+        unit = Unit(store=self.store, index=self.store.max_index() + 1,
+                    unitid=u'samaka', source_f=u'samaka',
+                    target_f=u'kampu')
+        unit.save()
+
+        candidates = UnitTrigram.objects.get_unit_ids('source_f', u'samak')
+        self.assertEqual(list(candidates), [unit.id])
+        candidates = UnitTrigram.objects.get_unit_ids('target_f', u'kampu')
+        self.assertEqual(list(candidates), [unit.id])
+
 
 class StoreTests(PootleTestCase):
     def setUp(self):
@@ -167,6 +267,93 @@ class StoreTests(PootleTestCase):
         self.assertEqual(dbstats['translatedsourcewords'], filestats['translatedsourcewords'])
         self.assertEqual(dbstats['translatedtargetwords'], filestats['translatedtargetwords'])
 
+    def test_meta(self):
+        self.assertEqual(self.store.get_meta()['target_lang'], 'af')
+
+        project = self.store.translation_project.project
+        project.checkstyle = 'mozilla'
+        project.save()
+        store = Store.objects.get(pootle_path=self.store.pootle_path)
+        self.assertEqual(store.get_meta()['project_style'], 'mozilla')
+
+    def test_contributions(self):
+        translation_project = self.store.translation_project
+        profile = PootleProfile.objects.get(user__username='admin')
+        unit = self.store.units[0]
+        self.assertEqual(profile.contributions, [])
+
+        SuggestionStat.objects.create(
+            translation_project=translation_project, suggester=profile,
+            unit=unit.id,
+        )
+        for i in range(2):
+            Submission.objects.create(
+                creation_time=timezone.now(), submitter=profile, unit=unit,
+                translation_project=translation_project,
+                type=SubmissionTypes.NORMAL,
+            )
+            language, tp_user_stats = profile.contributions[0]
+            self.assertEqual(tp_user_stats[0][0], translation_project)
+            counts = dict((stat['id'], stat['count'])
+                          for stat in tp_user_stats[0][1])
+            self.assertEqual(counts['suggestions-pending'], 1)
+            self.assertEqual(counts['submissions-total'], i + 1)
+
+        submitters = UnitSubmitter.objects.filter(unit=unit)
+        self.assertEqual([s.submitter for s in submitters], [profile])
+
+    def test_directory_activity(self):
+        translation_project = self.store.translation_project
+        unit = self.store.units[0]
+        unit.target = u'Hallo'
+        unit.save()
+        submission = Submission.objects.create(
+            creation_time=timezone.now(), unit=unit,
+            translation_project=translation_project,
+            submitter=PootleProfile.objects.get(user__username='admin'),
+        )
+
+        mtime = Unit.objects.get(id=unit.id).mtime
+        for pootle_path in ('/', translation_project.pootle_path,
+                            translation_project.project.pootle_path,
+                            translation_project.language.pootle_path):
+            directory = Directory.objects.get(pootle_path=pootle_path)
+            self.assertEqual(directory.get_mtime(), mtime)
+
+        # Only directories within the translation project are updated
+        directory = Directory.objects.get(
+            pootle_path=translation_project.pootle_path,
+        )
+        self.assertEqual(directory.mtime, mtime)
+        self.assertEqual(directory.last_submission, submission)
+        self.assertEqual(Directory.objects.root.last_submission, None)
+
+    @override_settings(BACKGROUND_JOBS=True)
+    def test_background_jobs(self):
+        translated = self.store.getquickstats()['translated']
+        unit = self.store.unit_set.filter(state=UNTRANSLATED)[0]
+        unit.target = u'Hallo'
+        unit.save()
+        self.assertEqual(Job.objects.count(), 1)
+        self.assertEqual(self.store.getquickstats()['translated'], translated)
+
+        self.assertEqual(process_jobs(), 1)
+        self.assertEqual(Job.objects.count(), 0)
+        self.assertEqual(self.store.getquickstats()['translated'],
+                         translated + 1)
+
+    def test_export_anonymous(self):
+        url = reverse('pootle_store.views.export_as_xliff',
+                      args=[self.store.pootle_path])
+        for i in range(2):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue('max-age=0' in response['Cache-Control'])
+            self.assertTrue('<xliff' in ''.join(response))
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
 
 class XHRTestAnonymous(PootleTestCase):
     """
@@ -206,6 +393,73 @@ class XHRTestAnonymous(PootleTestCase):
                             HTTP_X_REQUESTED_WITH='XMLHttpRequest')
         self.assertEqual(r.status_code, 404)
 
+    #
+    # Tests for the get_units() view.
+    #
+    def test_get_units_uid_page(self):
+        """Requesting a unit's uid returns the page holding it."""
+        uids = list(self.store.units.values_list('id', flat=True))
+        r = self.client.get(reverse('pootle-xhr-units'),
+                            {'path': self.path, 'uid': uids[-1],
+                             'pager': 1},
+                            HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertEqual(r.status_code, 200)
+        pager = simplejson.loads(r.content)['pager']
+        self.assertEqual(pager['number'],
+                         (len(uids) - 1) / pager['per_page'] + 1)
+
+    def test_get_units_uid_page_path_order(self):
+        """Pages follow store paths, not the order stores were added."""
+        tp = self.store.translation_project
+        pofile = file(os.path.join(tp.abs_real_path, "aaa.po"), 'w')
+        for i in range(20):
+            pofile.write('msgid "fish %d"\nmsgstr ""\n\n' % i)
+        pofile.close()
+        tp.scan_files(force=True)
+        tp.require_units()
+
+        r = self.client.get(reverse('pootle-xhr-units'),
+                            {'path': tp.pootle_path, 'uid': self.uid,
+                             'pager': 1},
+                            HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertEqual(r.status_code, 200)
+        response = simplejson.loads(r.content)
+        per_page = response['pager']['per_page']
+        self.assertEqual(response['pager']['number'], 20 / per_page + 1)
+        units = response['unit_groups'][-1][self.path]['units']
+        self.assertTrue(self.uid in [unit['id'] for unit in units])
+
+    def test_get_units_count_changes(self):
+        """Cached unit counts follow changes to the listed units."""
+        def get_count(nocache):
+            # The cache buster keeps the page cache from answering
+            r = self.client.get(reverse('pootle-xhr-units'),
+                                {'path': self.path, 'filter': 'untranslated',
+                                 'pager': 1, '_': nocache},
+                                HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+            self.assertEqual(r.status_code, 200)
+            return simplejson.loads(r.content)['pager']['count']
+
+        count = get_count(1)
+        self.assertEqual(count, self.store.units.filter(
+                state=UNTRANSLATED).count())
+
+        unit = self.store.units.filter(state=UNTRANSLATED)[0]
+        unit.target = u'samaka'
+        unit.save()
+        self.assertEqual(get_count(2), count - 1)
+
+    def test_get_units_after(self):
+        """Units following the given one are returned."""
+        uids = list(self.store.units.values_list('id', flat=True))
+        r = self.client.get(reverse('pootle-xhr-units'),
+                            {'path': self.path, 'after': uids[0]},
+                            HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertEqual(r.status_code, 200)
+        unit_groups = simplejson.loads(r.content)['unit_groups']
+        units = unit_groups[0][self.path]['units']
+        self.assertEqual(units[0]['id'], uids[1])
+
     #
     # Tests for the get_more_context() view.
     #
@@ -255,6 +509,17 @@ class XHRTestAnonymous(PootleTestCase):
         self.assertEqual(r.status_code, 200)
         self.assertTemplateUsed(r, 'unit/edit.html')
 
+    def test_get_edit_units_good_response(self):
+        """Checks editing widgets are returned for all the units."""
+        uids = list(self.store.units.values_list('id', flat=True)[:2])
+        r = self.client.get(reverse('pootle-xhr-units-edit-bulk'),
+                            {'uids': ','.join(map(str, uids))},
+                            HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertEqual(r.status_code, 200)
+        self.assertTemplateUsed(r, 'unit/edit.html')
+        self.assertEqual(sorted(simplejson.loads(r.content).keys()),
+                         sorted(map(str, uids)))
+
     #
     # Tests for the get_failing_checks() view.
     #
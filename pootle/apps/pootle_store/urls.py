@@ -39,6 +39,9 @@ urlpatterns = patterns('pootle_store.views',
     url(r'^xhr/units/?$',
         'get_units',
         name='pootle-xhr-units'),
+    url(r'^xhr/units/edit/?$',
+        'get_edit_units',
+        name='pootle-xhr-units-edit-bulk'),
 
     url(r'^xhr/units/(?P<uid>[0-9]+)/?$',
         'submit',
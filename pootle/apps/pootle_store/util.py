@@ -25,6 +25,7 @@ import os
 from django.conf import settings
 from django.utils.translation import ugettext_lazy as _
 
+from pootle.core.url_helpers import split_pootle_path
 from pootle_misc.aggregate import sum_column
 from pootle_misc.util import dictsum
 
@@ -70,6 +71,50 @@ def absolute_real_path(p):
         return p
 
 
+def get_path_lookups(pootle_path, prefix=''):
+    """Returns lookups matching the stores that fall below `pootle_path`.
+
+    Languages and projects are matched by the indexed foreign keys of the
+    stores' translation projects rather than by `pootle_path` patterns,
+    which require a leading wildcard for project-wide paths.
+
+    Stores never live below the ``/projects/<code>/`` directories, so no
+    stores are matched for them.
+
+    :param prefix: Lookup path from the queried model to
+        :cls:`~pootle_store.models.Store`, i.e. ``'store__'`` when querying
+        units.
+    """
+    language_code, project_code, dir_path, filename = \
+        split_pootle_path(pootle_path)
+
+    if language_code is None and project_code is not None:
+        return {prefix + 'pootle_path__startswith': pootle_path}
+
+    lookups = {}
+    tp_prefix = prefix + 'translation_project__'
+    if language_code is not None:
+        lookups[tp_prefix + 'language__code'] = language_code
+    if project_code is not None:
+        lookups[tp_prefix + 'project__code'] = project_code
+
+    if filename:
+        lookups[prefix + 'pootle_path'] = pootle_path
+    elif dir_path:
+        lookups[prefix + 'pootle_path__startswith'] = pootle_path
+
+    return lookups
+
+
+def get_trigrams(text):
+    """Returns the set of case-folded trigrams found in `text`."""
+    if not text:
+        return set()
+
+    text = text.lower()
+    return set(text[i:i+3] for i in xrange(len(text) - 2))
+
+
 empty_quickstats = {'fuzzy': 0,
                     'fuzzysourcewords': 0,
                     'review': 0,
@@ -180,6 +225,41 @@ def find_altsrcs(unit, alt_src_langs, store=None, project=None):
     return altsrcs
 
 
+def find_altsrcs_bulk(units, alt_src_langs, project):
+    """Bulk version of :func:`find_altsrcs` for `units` belonging to
+    `project`.
+
+    :return: Dictionary mapping unit ids to lists of alternative source
+             units.
+    """
+    from pootle_store.models import Unit
+
+    altsrcs = dict((unit.id, []) for unit in units)
+    units_by_hash = {}
+    for unit in units:
+        units_by_hash.setdefault(unit.unitid_hash, []).append(unit)
+
+    if not units_by_hash:
+        return altsrcs
+
+    altunits = Unit.objects.filter(
+                    unitid_hash__in=units_by_hash.keys(),
+                    store__translation_project__project=project,
+                    store__translation_project__language__in=alt_src_langs,
+                    state=TRANSLATED) \
+                           .select_related(
+                                'store', 'store__translation_project',
+                                'store__translation_project__language')
+
+    nongnu = project.get_treestyle() == 'nongnu'
+    for altunit in altunits:
+        for unit in units_by_hash[altunit.unitid_hash]:
+            if not nongnu or altunit.store.name == unit.store.name:
+                altsrcs[unit.id].append(altunit)
+
+    return altsrcs
+
+
 def get_sugg_list(unit):
     """Get suggested translations and rated scores for the given unit.
 
@@ -202,3 +282,35 @@ def get_sugg_list(unit):
         sugg_list.append((sugg, score))
 
     return sugg_list
+
+
+def get_sugg_lists(units):
+    """Bulk version of :func:`get_sugg_list`.
+
+    :return: Dictionary mapping unit ids to lists of tuples containing the
+             suggestion and its score.
+    """
+    from pootle_store.models import Suggestion
+
+    sugg_lists = dict((unit.id, []) for unit in units)
+    suggestions = list(Suggestion.objects.filter(unit__in=sugg_lists.keys())
+                                         .select_related('user'))
+
+    # Only terminology suggestions are rated
+    terminology_ids = set(
+        unit.id for unit in units
+        if (unit.store.is_terminology or
+            unit.store.translation_project.project.is_terminology)
+    )
+    rated = [sugg for sugg in suggestions if sugg.unit_id in terminology_ids]
+
+    scores = {}
+    if rated:
+        from voting.models import Vote
+        scores = Vote.objects.get_scores_in_bulk(rated)
+
+    for sugg in suggestions:
+        score = scores.get(sugg.id, False)
+        sugg_lists[sugg.unit_id].append((sugg, score))
+
+    return sugg_lists
@@ -18,8 +18,9 @@
 # You should have received a copy of the GNU General Public License along with
 # Pootle; if not, see <http://www.gnu.org/licenses/>.
 
-import os
 import logging
+from hashlib import md5
+from functools import partial
 from itertools import groupby
 
 from translate.lang import data
@@ -36,24 +37,27 @@ from django.template import loader, RequestContext
 from django.utils.translation import to_locale, ugettext as _
 from django.utils.translation.trans_real import parse_accept_lang_header
 from django.utils import simplejson, timezone
-from django.utils.encoding import iri_to_uri
 from django.views.decorators.cache import never_cache
 from django.views.decorators.http import require_POST
 
 from taggit.models import Tag
 
+from pootle_app.models import Directory
 from pootle_app.models import Suggestion as SuggestionStat
 from pootle_app.models.permissions import (check_permission,
-                                           check_profile_permission)
+                                           check_profile_permission,
+                                           get_matching_permissions)
 from pootle.core.exceptions import Http400
 from pootle.core.url_helpers import split_pootle_path
 from pootle_language.models import Language
 from pootle_misc.baseurl import redirect
 from pootle_misc.checks import get_quality_check_failures
+from pootle_misc.exportcache import serve_artifact
 from pootle_misc.forms import make_search_form
+from pootle_misc.jobs import enqueue
 from pootle_misc.stats import get_raw_stats
 from pootle_misc.url_manip import ensure_uri
-from pootle_misc.util import paginate, ajax_required, jsonify
+from pootle_misc.util import ajax_required, jsonify
 from pootle_profile.models import get_profile
 from pootle_project.models import Project
 from pootle_statistics.models import (Submission, SubmissionFields,
@@ -63,50 +67,26 @@ from pootle_translationproject.models import TranslationProject
 
 from .decorators import (get_store_context, get_unit_context,
                          get_xhr_resource_context)
-from .models import Store, Unit
+from .export import export_store
+from .models import QualityCheck, Store, Unit, UnitTrigram
 from .forms import (unit_comment_form_factory, unit_form_factory,
                     highlight_whitespace)
 from .signals import translation_submitted
 from .templatetags.store_tags import (highlight_diffs, pluralize_source,
                                       pluralize_target)
 from .util import (UNTRANSLATED, FUZZY, TRANSLATED, STATES_MAP,
-                   absolute_real_path, find_altsrcs, get_sugg_list)
+                   find_altsrcs, find_altsrcs_bulk,
+                   get_sugg_list, get_sugg_lists)
 
 
 @get_store_context('view')
 def export_as_xliff(request, store):
     """Export given file to xliff for offline translation."""
-    path = store.real_path
-    if not path:
-        # bug 2106
-        project = request.translation_project.project
-        if project.get_treestyle() == "gnu":
-            path = "/".join(store.pootle_path.split(os.path.sep)[2:])
-        else:
-            parts = store.pootle_path.split(os.path.sep)[1:]
-            path = "%s/%s/%s" % (parts[1], parts[0], "/".join(parts[2:]))
-
-    path, ext = os.path.splitext(path)
-    export_path = "/".join(['POOTLE_EXPORT', path + os.path.extsep + 'xlf'])
-    abs_export_path = absolute_real_path(export_path)
-
-    key = iri_to_uri("%s:export_as_xliff" % store.pootle_path)
-    last_export = cache.get(key)
-    if (not (last_export and last_export == store.get_mtime() and
-        os.path.isfile(abs_export_path))):
-        from pootle_app.project_tree import ensure_target_dir_exists
-        from translate.storage.poxliff import PoXliffFile
-        from pootle_misc import ptempfile as tempfile
-        import shutil
-        ensure_target_dir_exists(abs_export_path)
-        outputstore = store.convert(PoXliffFile)
-        outputstore.switchfile(store.name, createifmissing=True)
-        fd, tempstore = tempfile.mkstemp(prefix=store.name, suffix='.xlf')
-        os.close(fd)
-        outputstore.savefile(tempstore)
-        shutil.move(tempstore, abs_export_path)
-        cache.set(key, store.get_mtime(), settings.OBJECT_CACHE_TIMEOUT)
-    return redirect('/export/' + export_path)
+    export_path, manifest = export_store(store, 'xlf')
+    return serve_artifact(
+        request, export_path, manifest,
+        lambda: export_store(store, 'xlf', force=True)[1],
+    )
 
 
 @get_store_context('view')
@@ -118,27 +98,11 @@ def export_as_type(request, store, filetype):
         store.pootle_path.endswith(filetype)):
         raise ValueError
 
-    path, ext = os.path.splitext(store.real_path)
-    export_path = os.path.join('POOTLE_EXPORT',
-                               path + os.path.extsep + filetype)
-    abs_export_path = absolute_real_path(export_path)
-
-    key = iri_to_uri("%s:export_as_%s" % (store.pootle_path, filetype))
-    last_export = cache.get(key)
-    if (not (last_export and last_export == store.get_mtime() and
-        os.path.isfile(abs_export_path))):
-        from pootle_app.project_tree import ensure_target_dir_exists
-        from pootle_misc import ptempfile as tempfile
-        import shutil
-        ensure_target_dir_exists(abs_export_path)
-        outputstore = store.convert(klass)
-        fd, tempstore = tempfile.mkstemp(prefix=store.name,
-                                         suffix=os.path.extsep + filetype)
-        os.close(fd)
-        outputstore.savefile(tempstore)
-        shutil.move(tempstore, abs_export_path)
-        cache.set(key, store.get_mtime(), settings.OBJECT_CACHE_TIMEOUT)
-    return redirect('/export/' + export_path)
+    export_path, manifest = export_store(store, filetype)
+    return serve_artifact(
+        request, export_path, manifest,
+        lambda: export_store(store, filetype, force=True)[1],
+    )
 
 @get_store_context('view')
 def download(request, store):
@@ -183,6 +147,19 @@ def get_alt_src_langs(request, profile, translation_project):
     return langs
 
 
+def _filter_contains(units_queryset, field, text, lookup='contains'):
+    """Filters `units_queryset` by units whose `field` contains `text`.
+
+    Candidates are narrowed down using the search trigram index first, when
+    available.
+    """
+    unit_ids = UnitTrigram.objects.get_unit_ids(field, text)
+    if unit_ids is not None:
+        units_queryset = units_queryset.filter(id__in=unit_ids)
+
+    return units_queryset.filter(**{'%s__%s' % (field, lookup): text})
+
+
 def get_non_indexed_search_step_query(form, units_queryset):
     words = form.cleaned_data['search'].split()
     result = units_queryset.none()
@@ -190,31 +167,34 @@ def get_non_indexed_search_step_query(form, units_queryset):
     if 'source' in form.cleaned_data['sfields']:
         subresult = units_queryset
         for word in words:
-            subresult = subresult.filter(source_f__icontains=word)
+            subresult = _filter_contains(subresult, 'source_f', word,
+                                         'icontains')
         result = result | subresult
 
     if 'target' in form.cleaned_data['sfields']:
         subresult = units_queryset
         for word in words:
-            subresult = subresult.filter(target_f__icontains=word)
+            subresult = _filter_contains(subresult, 'target_f', word,
+                                         'icontains')
         result = result | subresult
 
     if 'notes' in form.cleaned_data['sfields']:
         translator_subresult = units_queryset
         developer_subresult = units_queryset
         for word in words:
-            translator_subresult = translator_subresult.filter(
-                translator_comment__icontains=word,
+            translator_subresult = _filter_contains(
+                translator_subresult, 'translator_comment', word, 'icontains',
             )
-            developer_subresult = developer_subresult.filter(
-                developer_comment__icontains=word,
+            developer_subresult = _filter_contains(
+                developer_subresult, 'developer_comment', word, 'icontains',
             )
         result = result | translator_subresult | developer_subresult
 
     if 'locations' in form.cleaned_data['sfields']:
         subresult = units_queryset
         for word in words:
-            subresult = subresult.filter(locations__icontains=word)
+            subresult = _filter_contains(subresult, 'locations', word,
+                                         'icontains')
         result = result | subresult
 
     return result
@@ -224,26 +204,22 @@ def get_non_indexed_search_exact_query(form, units_queryset):
     result = units_queryset.none()
 
     if 'source' in form.cleaned_data['sfields']:
-        subresult = units_queryset.filter(source_f__contains=phrase)
+        subresult = _filter_contains(units_queryset, 'source_f', phrase)
         result = result | subresult
 
     if 'target' in form.cleaned_data['sfields']:
-        subresult = units_queryset.filter(target_f__contains=phrase)
+        subresult = _filter_contains(units_queryset, 'target_f', phrase)
         result = result | subresult
 
     if 'notes' in form.cleaned_data['sfields']:
-        translator_subresult = units_queryset
-        developer_subresult = units_queryset
-        translator_subresult = translator_subresult.filter(
-            translator_comment__contains=phrase,
-        )
-        developer_subresult = developer_subresult.filter(
-            developer_comment__contains=phrase,
-        )
+        translator_subresult = _filter_contains(units_queryset,
+                                                'translator_comment', phrase)
+        developer_subresult = _filter_contains(units_queryset,
+                                               'developer_comment', phrase)
         result = result | translator_subresult | developer_subresult
 
     if 'locations' in form.cleaned_data['sfields']:
-        subresult = units_queryset.filter(locations__contains=phrase)
+        subresult = _filter_contains(units_queryset, 'locations', phrase)
         result = result | subresult
 
     return result
@@ -368,8 +344,7 @@ def get_step_query(request, units_queryset):
                     Q(state=UNTRANSLATED) | Q(state=FUZZY),
                 )
             elif unit_filter == 'suggestions':
-                #FIXME: is None the most efficient query
-                match_queryset = units_queryset.exclude(suggestion=None)
+                match_queryset = units_queryset.filter(suggestion_count__gt=0)
             elif unit_filter == 'user-suggestions':
                 match_queryset = units_queryset.filter(
                         suggestion__user=profile,
@@ -395,20 +370,25 @@ def get_step_query(request, units_queryset):
                     ).distinct()
             elif unit_filter == 'user-submissions':
                 match_queryset = units_queryset.filter(
-                        submission__submitter=profile,
-                    ).distinct()
+                        unitsubmitter__submitter=profile,
+                    )
             elif unit_filter == 'user-submissions-overwritten':
                 match_queryset = units_queryset.filter(
-                        submission__submitter=profile,
-                    ).exclude(submitted_by=profile).distinct()
+                        unitsubmitter__submitter=profile,
+                    ).exclude(submitted_by=profile)
             elif unit_filter == 'checks' and 'checks' in request.GET:
                 checks = request.GET['checks'].split(',')
 
                 if checks:
+                    # A unit may fail several of the checks, so match them
+                    # with a subquery rather than a join to avoid DISTINCT
+                    failing_units = QualityCheck.objects.filter(
+                        false_positive=False,
+                        name__in=checks,
+                    ).values('unit')
                     match_queryset = units_queryset.filter(
-                        qualitycheck__false_positive=False,
-                        qualitycheck__name__in=checks
-                    ).distinct()
+                        id__in=failing_units,
+                    )
 
 
             units_queryset = match_queryset
@@ -447,13 +427,13 @@ def _filter_ctx_units(units_qs, unit, how_many, gap=0):
     return result
 
 
-def _prepare_unit(unit):
+def _prepare_unit(unit, nplurals=None):
     """Constructs a dictionary with relevant `unit` data."""
     return {
         'id': unit.id,
         'isfuzzy': unit.isfuzzy(),
         'source': [source[1] for source in pluralize_source(unit)],
-        'target': [target[1] for target in pluralize_target(unit)],
+        'target': [target[1] for target in pluralize_target(unit, nplurals)],
     }
 
 
@@ -466,20 +446,9 @@ def _path_units_with_meta(path, units):
 
     for unit in iter(units):
         if meta is None:
-            # XXX: Watch out for the query count
-            store = unit.store
-            tp = store.translation_project
-            project = tp.project
-            meta = {
-                'source_lang': project.source_language.code,
-                'source_dir': project.source_language.get_direction(),
-                'target_lang': tp.language.code,
-                'target_dir': tp.language.get_direction(),
-                'project_code': project.code,
-                'project_style': project.checkstyle,
-            }
+            meta = unit.store.get_meta()
 
-        units_list.append(_prepare_unit(unit))
+        units_list.append(_prepare_unit(unit, meta['target_nplurals']))
 
     return {
         path: {
@@ -504,10 +473,103 @@ def _build_units_list(units, reverse=False):
     return return_units
 
 
+#: Ordering of the units in the editor, unique so it can be used as a cursor
+UNITS_ORDERING = ('store__pootle_path', 'index', 'id')
+
+#: GET parameters which don't affect the set of units being listed
+PAGING_PARAMS = ('page', 'uid', 'after', 'pager', '_')
+
+#: Seconds the unit counts of a list are cached for. Quality checks are
+#: updated after the units change, so the counts can't be kept for long
+UNITS_COUNT_TIMEOUT = 60
+
+
+def _get_unit_key(units_queryset, uid):
+    """Returns the :data:`UNITS_ORDERING` values for unit `uid`.
+
+    :raise: `Unit.DoesNotExist` if the unit is not part of the queryset.
+    """
+    return units_queryset.filter(id=uid) \
+                         .values_list(*UNITS_ORDERING) \
+                         .get()
+
+
+def _get_unit_position(units_queryset, uid):
+    """Returns the number of units preceding unit `uid` in
+    `units_queryset`, which must be ordered by :data:`UNITS_ORDERING`.
+
+    :raise: `Unit.DoesNotExist` if the unit is not part of the queryset.
+    """
+    pootle_path, index, uid = _get_unit_key(units_queryset, uid)
+
+    return units_queryset.filter(
+        Q(store__pootle_path__lt=pootle_path) |
+        Q(store__pootle_path=pootle_path, index__lt=index) |
+        Q(store__pootle_path=pootle_path, index=index, id__lt=uid)
+    ).count()
+
+
+def _filter_units_after(units_queryset, uid):
+    """Narrows down `units_queryset` to the units following unit `uid`
+    in :data:`UNITS_ORDERING`.
+
+    The unit itself doesn't need to be part of `units_queryset`, it might
+    have stopped matching the current filter since it was listed.
+
+    :raise: `Unit.DoesNotExist` if the unit doesn't exist.
+    """
+    pootle_path, index, uid = _get_unit_key(Unit.objects.all(), uid)
+
+    return units_queryset.filter(
+        Q(store__pootle_path__gt=pootle_path) |
+        Q(store__pootle_path=pootle_path, index__gt=index) |
+        Q(store__pootle_path=pootle_path, index=index, id__gt=uid)
+    )
+
+
+def _get_units_count(request, units_queryset):
+    """Returns the number of units in `units_queryset`.
+
+    The count is cached for a short while per filter signature, so
+    subsequent page requests for the same list don't need to recount.
+    The signature includes the modification time and suggestion count of
+    the listed path, so changes to its units invalidate the count.
+    """
+    pootle_path = request.GET.get('path')
+    lang, proj, dir_path, filename = split_pootle_path(pootle_path)
+    try:
+        if filename:
+            path_obj = Store.objects.get(pootle_path=pootle_path)
+        else:
+            path_obj = Directory.objects.get(pootle_path=pootle_path)
+    except ObjectDoesNotExist:
+        return units_queryset.count()
+
+    params = sorted((key, value) for key, value in request.GET.iteritems()
+                    if key not in PAGING_PARAMS)
+    params.append(('mtime', path_obj.get_mtime()))
+    params.append(('suggestions', path_obj.get_suggestion_count()))
+    if request.GET.get('filter', '').startswith('user-'):
+        params.append(('profile', request.profile.id))
+
+    key = 'units_count:%s' % md5(repr(params)).hexdigest()
+    count = cache.get(key)
+    if count is None:
+        count = units_queryset.count()
+        cache.set(key, count, UNITS_COUNT_TIMEOUT)
+
+    return count
+
+
 @ajax_required
 def get_units(request):
     """Gets source and target texts and its metadata.
 
+    Units are listed one page at a time. When the ``after`` GET parameter
+    holds a unit id, the page starts right after that unit instead of
+    being looked up by the ``page`` number, which keeps requests for deep
+    pages as cheap as the first one.
+
     :return: A JSON-encoded object containing the source and target texts
         grouped by the store they belong to.
 
@@ -518,45 +580,56 @@ def get_units(request):
     if pootle_path is None:
         raise Http400(_('Arguments missing.'))
 
-    page = None
+    try:
+        page = max(int(request.GET.get('page', 1)), 1)
+    except ValueError:
+        page = 1
 
     request.profile = get_profile(request.user)
     limit = request.profile.get_unit_rows()
 
     units_qs = Unit.objects.get_for_path(pootle_path, request.profile)
-    step_queryset = get_step_query(request, units_qs)
+    step_queryset = get_step_query(request, units_qs) \
+                        .order_by(*UNITS_ORDERING)
 
     # Maybe we are trying to load directly a specific unit, so we have
     # to calculate its page number
     uid = request.GET.get('uid', None)
     if uid is not None:
         try:
-            # XXX: Watch for performance, might want to drop into raw SQL
-            # at some stage
-            uid_list = list(step_queryset.values_list('id', flat=True))
-            preceding = uid_list.index(int(uid))
+            preceding = _get_unit_position(step_queryset, int(uid))
             page = preceding / limit + 1
-        except ValueError:
+        except (ValueError, Unit.DoesNotExist):
             pass  # uid wasn't a number or not present in the results
 
-    pager = paginate(request, step_queryset, items=limit, page=page)
+    response = {}
+
+    if request.GET.get('pager', False):
+        count = _get_units_count(request, step_queryset)
+        num_pages = max((count - 1) / limit + 1, 1)
+        page = min(page, num_pages)
+        response['pager'] = {
+            'count': count,
+            'number': page,
+            'num_pages': num_pages,
+            'per_page': limit,
+        }
+
+    after = request.GET.get('after', None)
+    if uid is None and after is not None:
+        try:
+            units = _filter_units_after(step_queryset, int(after))[:limit]
+        except (ValueError, Unit.DoesNotExist):
+            raise Http400(_('Wrong unit.'))
+    else:
+        units = step_queryset[(page - 1) * limit:page * limit]
 
     unit_groups = []
-    units_by_path = groupby(pager.object_list, lambda x: x.store.pootle_path)
+    units_by_path = groupby(units, lambda x: x.store.pootle_path)
     for pootle_path, units in units_by_path:
         unit_groups.append(_path_units_with_meta(pootle_path, units))
 
-    response = {
-        'unit_groups': unit_groups,
-    }
-
-    if request.GET.get('pager', False):
-        response['pager'] = {
-            'count': pager.paginator.count,
-            'number': pager.number,
-            'num_pages': pager.paginator.num_pages,
-            'per_page': pager.paginator.per_page,
-        }
+    response['unit_groups'] = unit_groups
 
     return HttpResponse(jsonify(response), mimetype="application/json")
 
@@ -698,21 +771,34 @@ def comment(request, unit):
     return HttpResponse(response, status=rcode, mimetype="application/json")
 
 
-@never_cache
-@ajax_required
-@get_unit_context('view')
-def get_edit_unit(request, unit):
-    """Given a store path ``pootle_path`` and unit id ``uid``, gathers all the
-    necessary information to build the editing widget.
+def _get_unit_permissions(profile, directory):
+    """Returns the editing permissions `profile` has in `directory`."""
+    return {
+        'cantranslate': check_profile_permission(profile, "translate",
+                                                 directory),
+        'cansuggest': check_profile_permission(profile, "suggest", directory),
+        'canreview': check_profile_permission(profile, "review", directory),
+    }
 
-    :return: A templatised editing widget is returned within the ``editor``
-             variable and paging information is also returned if the page
-             number has changed.
+
+def _get_edit_unit_json(request, unit, altsrcs, suggestions, terminology,
+                        permissions):
+    """Builds the editing widget for `unit` and its context rows.
+
+    :param altsrcs: Alternative source units for `unit`.
+    :param suggestions: Suggestions for `unit` as returned by
+        :func:`~pootle_store.util.get_sugg_list`.
+    :param terminology: Callable returning the terminology matches for
+        `unit`. It's only evaluated when the widget isn't cached.
+    :param permissions: Editing permissions as returned by
+        :func:`_get_unit_permissions`.
     """
     json = {}
 
-    translation_project = request.translation_project
+    store = unit.store
+    translation_project = store.translation_project
     language = translation_project.language
+    project = translation_project.project
 
     if unit.hasplural():
         snplurals = len(unit.source.strings)
@@ -724,44 +810,31 @@ def get_edit_unit(request, unit):
     comment_form_class = unit_comment_form_factory(language)
     comment_form = comment_form_class({}, instance=unit)
 
-    store = unit.store
-    directory = store.parent
-    profile = request.profile
-    alt_src_langs = get_alt_src_langs(request, profile, translation_project)
-    project = translation_project.project
-    report_target = ensure_uri(project.report_target)
-
-    suggestions = get_sugg_list(unit)
     template_vars = {
         'unit': unit,
         'form': form,
         'comment_form': comment_form,
         'store': store,
-        'directory': directory,
-        'profile': profile,
+        'directory': store.parent,
+        'profile': request.profile,
         'user': request.user,
         'project': project,
         'language': language,
-        'source_language': translation_project.project.source_language,
-        'cantranslate': check_profile_permission(profile, "translate",
-                                                 directory),
-        'cansuggest': check_profile_permission(profile, "suggest", directory),
-        'canreview': check_profile_permission(profile, "review", directory),
-        'altsrcs': find_altsrcs(unit, alt_src_langs, store=store,
-                                project=project),
-        'report_target': report_target,
+        'source_language': project.source_language,
+        'altsrcs': altsrcs,
+        'report_target': ensure_uri(project.report_target),
         'suggestions': suggestions,
+        'terminology': terminology,
     }
+    template_vars.update(permissions)
 
-    if translation_project.project.is_terminology or store.is_terminology:
+    if project.is_terminology or store.is_terminology:
         t = loader.get_template('unit/term_edit.html')
     else:
         t = loader.get_template('unit/edit.html')
     c = RequestContext(request, template_vars)
     json['editor'] = t.render(c)
 
-    rcode = 200
-
     # Return context rows if filtering is applied but
     # don't return any if the user has asked not to have it
     current_filter = request.GET.get('filter', 'all')
@@ -770,14 +843,122 @@ def get_edit_unit(request, unit):
     if ((_is_filtered(request) or current_filter not in ('all',)) and
         show_ctx == 'true'):
         # TODO: review if this first 'if' branch makes sense
-        if translation_project.project.is_terminology or store.is_terminology:
+        if project.is_terminology or store.is_terminology:
             json['ctx'] = _filter_ctx_units(store.units, unit, 0)
         else:
             ctx_qty = int(request.COOKIES.get('ctxQty', 1))
             json['ctx'] = _filter_ctx_units(store.units, unit, ctx_qty)
 
+    return json
+
+
+@never_cache
+@ajax_required
+@get_unit_context('view')
+def get_edit_unit(request, unit):
+    """Given a store path ``pootle_path`` and unit id ``uid``, gathers all the
+    necessary information to build the editing widget.
+
+    :return: A templatised editing widget is returned within the ``editor``
+             variable and paging information is also returned if the page
+             number has changed.
+    """
+    translation_project = request.translation_project
+    store = unit.store
+    project = translation_project.project
+    alt_src_langs = get_alt_src_langs(request, request.profile,
+                                      translation_project)
+
+    json = _get_edit_unit_json(
+        request, unit,
+        altsrcs=find_altsrcs(unit, alt_src_langs, store=store,
+                             project=project),
+        suggestions=get_sugg_list(unit),
+        terminology=unit.get_terminology,
+        permissions=_get_unit_permissions(request.profile, store.parent),
+    )
+
     response = jsonify(json)
-    return HttpResponse(response, status=rcode, mimetype="application/json")
+    return HttpResponse(response, status=200, mimetype="application/json")
+
+
+@never_cache
+@ajax_required
+def get_edit_units(request):
+    """Gathers the editing widgets for several units at once, so the
+    client can prefetch the units it is about to edit.
+
+    Unit ids are read from the comma-separated ``uids`` GET parameter, and
+    at most as many units as the user's unit rows setting are returned.
+    Alternative sources, suggestions and their scores are fetched in bulk.
+    Units the user has no rights to view are left out.
+
+    :return: A JSON object mapping unit ids to the same data returned by
+             :func:`get_edit_unit` for each of them.
+    """
+    try:
+        uids = [int(uid) for uid in request.GET['uids'].split(',')]
+    except (KeyError, ValueError):
+        raise Http400(_('Arguments missing.'))
+
+    request.profile = get_profile(request.user)
+    uids = uids[:request.profile.get_unit_rows()]
+
+    units = Unit.objects.select_related(
+                'store__parent',
+                'store__translation_project__language',
+                'store__translation_project__project__source_language',
+                'store__translation_project__directory',
+            ).filter(id__in=uids)
+
+    units_by_tp = {}
+    for unit in units:
+        units_by_tp.setdefault(unit.store.translation_project_id, []) \
+                   .append(unit)
+
+    json = {}
+    dir_permissions = {}
+    for tp_units in units_by_tp.itervalues():
+        translation_project = tp_units[0].store.translation_project
+        request.translation_project = translation_project
+        request.permissions = get_matching_permissions(
+            request.profile, translation_project.directory,
+        )
+        if not check_permission('view', request):
+            continue
+
+        project = translation_project.project
+        alt_src_langs = get_alt_src_langs(request, request.profile,
+                                          translation_project)
+        altsrcs = find_altsrcs_bulk(tp_units, alt_src_langs, project)
+        suggestions = get_sugg_lists(tp_units)
+        matcher = []
+
+        def get_terminology(unit):
+            # Load the terminology matcher once per translation project
+            if not matcher:
+                matcher.append(translation_project.gettermmatcher())
+            if matcher[0] is None:
+                return []
+            return matcher[0].matches(unit.source)
+
+        for unit in tp_units:
+            directory = unit.store.parent
+            if directory.id not in dir_permissions:
+                dir_permissions[directory.id] = _get_unit_permissions(
+                    request.profile, directory,
+                )
+
+            json[unit.id] = _get_edit_unit_json(
+                request, unit,
+                altsrcs=altsrcs[unit.id],
+                suggestions=suggestions[unit.id],
+                terminology=partial(get_terminology, unit),
+                permissions=dir_permissions[directory.id],
+            )
+
+    response = jsonify(json)
+    return HttpResponse(response, mimetype="application/json")
 
 
 @ajax_required
@@ -796,6 +977,19 @@ def get_failing_checks(request, path_obj):
     return HttpResponse(response, mimetype="application/json")
 
 
+def _send_translation_submitted(translation_project, unit, profile):
+    """Sends the :data:`~pootle_store.signals.translation_submitted`
+    signal, from a background job if :setting:`BACKGROUND_JOBS` is enabled.
+    """
+    if settings.BACKGROUND_JOBS:
+        enqueue('pootle_store.jobs.send_translation_submitted',
+                unit=unit.id, profile=profile.id,
+                translation_project=translation_project.id)
+    else:
+        translation_submitted.send(sender=translation_project, unit=unit,
+                                   profile=profile)
+
+
 @require_POST
 @ajax_required
 @get_unit_context('')
@@ -846,11 +1040,8 @@ def submit(request, unit):
                 sub.save()
 
             form.save()
-            translation_submitted.send(
-                    sender=translation_project,
-                    unit=form.instance,
-                    profile=request.profile,
-            )
+            _send_translation_submitted(translation_project, form.instance,
+                                        request.profile)
 
         rcode = 200
     else:
@@ -978,8 +1169,8 @@ def accept_suggestion(request, unit, suggid):
 
         if suggestion is not None and success:
             if suggestion.user:
-                translation_submitted.send(sender=translation_project,
-                                           unit=unit, profile=suggestion.user)
+                _send_translation_submitted(translation_project, unit,
+                                            suggestion.user)
 
             # FIXME: we need a totally different model for tracking stats, this
             # is just lame
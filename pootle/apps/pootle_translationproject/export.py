@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013 Zuza Software Foundation
+#
+# This file is part of Pootle.
+#
+# Pootle is free software; you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 2 of the License, or (at your option) any later
+# version.
+#
+# Pootle is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# Pootle; if not, see <http://www.gnu.org/licenses/>.
+
+"""Exporting the files of several translation projects as one archive."""
+
+from multiprocessing.pool import ThreadPool
+
+from django.db.models import F, Max
+from django.http import HttpResponse
+from django.utils.cache import add_never_cache_headers
+
+from pootle_misc.util import get_content_disposition
+from pootle_misc.zipstream import iter_zip
+from pootle_store.models import Store, PARSED
+
+
+#: Number of files read in parallel ahead of the archive being streamed
+READ_AHEAD = 16
+
+
+def sync_changed_stores(translation_projects):
+    """Syncs to disk the stores of `translation_projects` whose translations
+    changed since they were last synced.
+    """
+    stores = Store.objects.filter(
+            translation_project__in=translation_projects,
+            state__gte=PARSED,
+        ).exclude(file='') \
+         .annotate(last_change=Max('unit__mtime')) \
+         .filter(last_change__gt=F('sync_time'))
+
+    for store in stores.iterator():
+        store.sync(update_translation=True, conservative=True, create=False)
+
+
+def get_members(translation_projects, get_dirname):
+    """Returns the ``(path, arcname)`` archive members for the files of
+    `translation_projects`, placing the files of each translation project
+    in the directory named by ``get_dirname(translation_project)``.
+    """
+    translation_projects = dict((tp.id, tp) for tp in translation_projects)
+    dirnames = dict((tp.id, get_dirname(tp))
+                    for tp in translation_projects.itervalues())
+
+    stores = Store.objects.filter(
+            translation_project__in=translation_projects.keys(),
+        ).exclude(file='').order_by('pootle_path')
+
+    members = []
+    for store in stores.iterator():
+        tp = translation_projects[store.translation_project_id]
+        arcname = '/'.join([
+            dirnames[tp.id],
+            store.abs_real_path[len(tp.abs_real_path)+1:],
+        ])
+        members.append((store.abs_real_path, arcname))
+
+    return members
+
+
+def read_file(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def read_members(members, jobs):
+    """Yields `members` along with their contents, read by `jobs` threads
+    at most :data:`READ_AHEAD` files ahead.
+    """
+    pool = ThreadPool(jobs)
+    try:
+        for i in xrange(0, len(members), READ_AHEAD):
+            window = members[i:i+READ_AHEAD]
+            contents = pool.map(read_file, [path for path, arcname in window])
+            for (path, arcname), data in zip(window, contents):
+                yield path, arcname, data
+    finally:
+        pool.close()
+
+
+def export_translation_projects(translation_projects, get_dirname, jobs=4):
+    """Returns a ZIP archive of the files of `translation_projects`, as an
+    iterator over its chunks.
+
+    Stores with translations changed since they were last synced are synced
+    first. The archive is generated as it is consumed, with files read in
+    parallel by `jobs` threads.
+
+    :param get_dirname: callable returning the directory holding the files
+        of the translation project it is given within the archive.
+    """
+    translation_projects = list(translation_projects)
+    sync_changed_stores(translation_projects)
+    members = get_members(translation_projects, get_dirname)
+
+    return iter_zip(read_members(members, jobs))
+
+
+def archive_response(archive, archivename):
+    """Returns a response streaming the ZIP `archive` as `archivename`."""
+    response = HttpResponse(archive, mimetype='application/zip')
+    # Keep middleware from reading the whole archive into memory
+    response.streaming = True
+    add_never_cache_headers(response)
+    response['Content-Disposition'] = get_content_disposition(archivename)
+
+    return response
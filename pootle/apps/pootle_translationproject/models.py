@@ -20,6 +20,7 @@
 import gettext
 import logging
 import os
+import threading
 
 from translate.misc.lru import LRUCachingDict
 from translate.storage.base import ParseError
@@ -39,7 +40,7 @@ from pootle.core.url_helpers import get_editor_filter, split_pootle_path
 from pootle_app.lib.util import RelatedManager
 from pootle_app.models.directory import Directory
 from pootle_language.models import Language
-from pootle_misc.aggregate import group_by_count_extra, max_column
+from pootle_misc.aggregate import group_by_count_extra
 from pootle_misc.baseurl import l
 from pootle_misc.stats import stats_message, stats_message_raw
 from pootle_misc.util import getfromcache, dictsum, deletefromcache
@@ -65,9 +66,21 @@ def create_translation_project(language, project):
             return None
 
 
+def get_project_languages(project):
+    """Returns the languages which might have a translation project for
+    :param:`project`.
+    """
+    languages = list(Language.objects.iterator())
+    if project.get_treestyle() == 'gnu':
+        from pootle_app import project_tree
+        languages = project_tree.gnu_project_languages(project, languages)
+
+    return languages
+
+
 def scan_translation_projects():
-    for language in Language.objects.iterator():
-        for project in Project.objects.iterator():
+    for project in Project.objects.iterator():
+        for language in get_project_languages(project):
             create_translation_project(language, project)
 
 
@@ -108,12 +121,17 @@ class TranslationProject(models.Model):
     directory = models.OneToOneField(Directory, db_index=True, editable=False)
     pootle_path = models.CharField(max_length=255, null=False, unique=True,
                                    db_index=True, editable=False)
+    #: Latest submission made in this translation project
+    last_submission = models.ForeignKey(Submission, null=True, blank=True,
+                                        related_name='+', editable=False,
+                                        on_delete=models.SET_NULL)
 
     tags = TaggableManager(blank=True, verbose_name=_("Tags"),
                            help_text=_("A comma-separated list of tags."))
 
     _non_db_state_cache = LRUCachingDict(settings.PARSE_POOL_SIZE,
                                          settings.PARSE_POOL_CULL_FREQUENCY)
+    _non_db_state_lock = threading.RLock()
     index_directory = ".translation_index"
 
     objects = TranslationProjectManager()
@@ -195,12 +213,13 @@ class TranslationProject(models.Model):
 
     def _get_non_db_state(self):
         if not hasattr(self, "_non_db_state"):
-            try:
-                self._non_db_state = self._non_db_state_cache[self.id]
-            except KeyError:
-                self._non_db_state = TranslationProjectNonDBState(self)
-                self._non_db_state_cache[self.id] = \
-                        TranslationProjectNonDBState(self)
+            with self._non_db_state_lock:
+                try:
+                    self._non_db_state = self._non_db_state_cache[self.id]
+                except KeyError:
+                    self._non_db_state = TranslationProjectNonDBState(self)
+                    self._non_db_state_cache[self.id] = \
+                            TranslationProjectNonDBState(self)
 
         return self._non_db_state
     non_db_state = property(_get_non_db_state)
@@ -279,10 +298,8 @@ class TranslationProject(models.Model):
             return ''
         return sub.get_submission_message()
 
-    @getfromcache
     def get_mtime(self):
-        tp_units = Unit.objects.filter(store__translation_project=self)
-        return max_column(tp_units, 'mtime', None)
+        return self.directory.get_mtime()
 
     def require_units(self):
         """Makes sure all stores are parsed"""
@@ -342,8 +359,14 @@ class TranslationProject(models.Model):
         return Suggestion.objects.filter(unit__store__translation_project=self,
                                          unit__state__gt=OBSOLETE).count()
 
-    def update_against_templates(self, pootle_path=None):
-        """Update translation project from templates."""
+    def update_against_templates(self, pootle_path=None, templates=None):
+        """Update translation project from templates.
+
+        :param templates: :class:`~pootle_app.project_tree.TemplateCache`
+            shared with other translation projects of the same project. When
+            given, templates are only parsed once, and targets which didn't
+            change since they were last converted are skipped.
+        """
 
         if self.is_template_project:
             return
@@ -386,8 +409,17 @@ class TranslationProject(models.Model):
                 # Assume hook is not present.
                 pass
 
+            template_file = None
+            if templates is not None:
+                if templates.is_unchanged(store, new_pootle_path, new_path):
+                    continue
+                template_file = templates.get_copy(store)
+
             convert_template(self, store, new_pootle_path, new_path,
-                             monolingual)
+                             monolingual, template_file)
+
+            if templates is not None:
+                templates.record(store, new_pootle_path, new_path)
 
         all_files, new_files = self.scan_files(vcs_sync=False)
 
@@ -438,11 +470,13 @@ class TranslationProject(models.Model):
             post_template_update.send(sender=self, oldstats=oldstats,
                                       newstats=newstats)
 
-    def scan_files(self, vcs_sync=True):
+    def scan_files(self, vcs_sync=True, force=False):
         """Scans the file system and returns a list of translation files.
 
         :param vcs_sync: boolean on whether or not to synchronise the PO
                          directory with the VCS checkout.
+        :param force: boolean on whether or not to list again directories
+                      which didn't change since they were last scanned.
         """
         projects = [p.strip() for p in self.project.ignoredfiles.split(',')]
         ignored_files = set(projects)
@@ -482,6 +516,7 @@ class TranslationProject(models.Model):
                 self.real_path,
                 self.directory,
                 file_filter,
+                force,
         )
 
         return all_files, new_files
@@ -578,9 +613,18 @@ class TranslationProject(models.Model):
         else:
             stores = directory.stores.exclude(file="")
 
-        for store in stores.iterator():
-            if store in new_file_set:
-                # these won't have to be merged, since they are new
+        stores = list(stores.iterator())
+
+        # Files left untouched by the update don't need to be merged
+        changed_files = versioncontrol.get_changed(
+            [store.file.name for store in stores]
+        )
+
+        for store in stores:
+            if (store in new_file_set or
+                store.file.name not in changed_files):
+                # these won't have to be merged, since they are new or
+                # unchanged
                 remotestats = store.getquickstats()
                 remote_stats = dictsum(remote_stats, remotestats)
                 continue
@@ -597,6 +641,8 @@ class TranslationProject(models.Model):
             working_copy = store.file.store
 
             versioncontrol.copy_to_podir(filetoupdate)
+            if filetoupdate != store.file.name:
+                versioncontrol.record_synced([store.file.name])
             store.file._delete_store_cache()
             store.file._update_store_cache()
 
@@ -679,13 +725,10 @@ class TranslationProject(models.Model):
 
         self.scan_files()
 
-    def commit_dir(self, user, directory, request=None):
-        """Commits files under a directory to version control.
-
-        This does not do permission checking.
+    def get_commit_message(self, user, stats):
+        """Returns the ``(author, message)`` tuple used when `user` commits
+        files with the given `stats` to version control.
         """
-        self.sync()
-        stats = self.getquickstats()
         author = user.username
 
         message = stats_message_raw("Commit from %s by user %s." %
@@ -696,10 +739,26 @@ class TranslationProject(models.Model):
         if user.is_authenticated() and len(user.email):
             author += " <%s>" % user.email
 
+        return author, message
+
+    def prepare_commit(self, directory, author, message):
+        """Syncs the stores under `directory` to disk and runs the precommit
+        hooks of those whose file changed since it was last committed.
+
+        :return: A ``(stores, files)`` tuple with the changed stores and the
+            files to commit for them.
+        """
+        from pootle_misc import versioncontrol
+
+        self.sync()
+
         if directory.is_translationproject():
-            stores = list(self.stores.exclude(file=""))
+            stores = self.stores.exclude(file="")
         else:
-            stores = list(directory.stores.exclude(file=""))
+            stores = directory.stores.exclude(file="")
+
+        stores = [store for store in stores.iterator()
+                  if versioncontrol.is_modified(store.file.name)]
 
         filestocommit = []
 
@@ -716,12 +775,46 @@ class TranslationProject(models.Model):
                 # file.
                 filestocommit.append(store.file.name)
 
+        return stores, filestocommit
+
+    def finish_commit(self, user, directory, stores, stats, success):
+        """Runs the postcommit hooks of the committed `stores` and notifies
+        about the commit.
+        """
+        from pootle.scripts import hooks
+        for store in stores:
+            try:
+                hooks.hook(self.project.code, "postcommit", store.file.name,
+                           success=success)
+            except:
+                #FIXME: We should not hide the exception - makes development
+                # impossible
+                pass
+
+        from pootle_app.models.signals import post_vc_commit
+        post_vc_commit.send(sender=self, path_obj=directory, stats=stats,
+                            user=user, success=success)
+
+    def commit_dir(self, user, directory, request=None):
+        """Commits files under a directory to version control.
+
+        Only the files changed since they were last committed are copied to
+        the checkout, and all of them go into a single commit.
+
+        This does not do permission checking.
+        """
+        stats = self.getquickstats()
+        author, message = self.get_commit_message(user, stats)
+        stores, filestocommit = self.prepare_commit(directory, author,
+                                                    message)
+
         success = True
         try:
             from pootle_misc import versioncontrol
-            project_path = self.project.get_real_path()
-            versioncontrol.add_files(project_path, filestocommit, message,
-                                     author)
+            if filestocommit:
+                project_path = self.project.get_real_path()
+                versioncontrol.add_files(project_path, filestocommit, message,
+                                         author)
             # FIXME: This belongs to views
             if request is not None:
                 msg = _("Committed all files under <em>%(path)s</em> to "
@@ -738,18 +831,7 @@ class TranslationProject(models.Model):
 
             success = False
 
-        for store in stores:
-            try:
-                hooks.hook(self.project.code, "postcommit", store.file.name,
-                           success=success)
-            except:
-                #FIXME: We should not hide the exception - makes development
-                # impossible
-                pass
-
-        from pootle_app.models.signals import post_vc_commit
-        post_vc_commit.send(sender=self, path_obj=directory, stats=stats,
-                            user=user, success=success)
+        self.finish_commit(user, directory, stores, stats, success)
 
         return success
 
@@ -761,15 +843,7 @@ class TranslationProject(models.Model):
         store.sync(update_structure=False, update_translation=True,
                    conservative=True)
         stats = store.getquickstats()
-        author = user.username
-
-        message = stats_message_raw("Commit from %s by user %s." % \
-                (settings.TITLE, author), stats)
-
-        # Try to append email as well, since some VCS does not allow omitting
-        # it (ie. Git).
-        if user.is_authenticated() and len(user.email):
-            author += " <%s>" % user.email
+        author, message = self.get_commit_message(user, stats)
 
         from pootle.scripts import hooks
         try:
@@ -835,74 +909,27 @@ class TranslationProject(models.Model):
     ###########################################################################
 
     def get_archive(self, stores, path=None):
-        """Returns an archive of the given files."""
-        import shutil
-        from pootle_misc import ptempfile as tempfile
+        """Returns an archive of the given files.
 
-        tempzipfile = None
+        The archive is returned as an iterator over its chunks, which is
+        generated as it is consumed. If `path` is given, the archive is
+        written there instead.
+        """
+        from pootle_misc.zipstream import iter_zip
 
-        try:
-            # Using zip command line is fast
-            # The temporary file below is opened and immediately closed for
-            # security reasons
-            fd, tempzipfile = tempfile.mkstemp(prefix='pootle', suffix='.zip')
-            os.close(fd)
-
-            file_list = u" ".join(
-                store.abs_real_path[len(self.abs_real_path)+1:] \
-                for store in stores.iterator()
-            )
-            cmd = u"cd %(path)s ; zip -r - %(file_list)s > %(tmpfile)s" % {
-                    'path': self.abs_real_path,
-                    'file_list': file_list,
-                    'tmpfile': tempzipfile,
-            }
-            result = os.system(cmd.encode('utf-8'))
+        # Stores are listed right away, so archives streamed after the
+        # request was handled don't need the database
+        members = [(store.abs_real_path,
+                    store.abs_real_path[len(self.abs_real_path)+1:])
+                   for store in stores.iterator()]
+        archive = iter_zip(members)
 
-            if result == 0:
-                if path is not None:
-                    shutil.move(tempzipfile, path)
-                    return
-                else:
-                    filedata = open(tempzipfile, "r").read()
-                    if filedata:
-                        return filedata
-        finally:
-            if tempzipfile is not None and os.path.exists(tempzipfile):
-                os.remove(tempzipfile)
-
-        # But if it doesn't work, we can do it from python
-        archivecontents = None
-        try:
-            if path is not None:
-                fd, tempzipfile = tempfile.mkstemp(prefix='pootle',
-                                                   suffix='.zip')
-                os.close(fd)
-                archivecontents = open(tempzipfile, "wb")
-            else:
-                import cStringIO
-                archivecontents = cStringIO.StringIO()
-
-            import zipfile
-            archive = zipfile.ZipFile(archivecontents, 'w',
-                                      zipfile.ZIP_DEFLATED)
-            for store in stores.iterator():
-                archive.write(store.abs_real_path.encode('utf-8'),
-                              store.abs_real_path[len(self.abs_real_path)+1:]
-                                   .encode('utf-8'))
-            archive.close()
-
-            if path is not None:
-                shutil.move(tempzipfile, path)
-            else:
-                return archivecontents.getvalue()
-        finally:
-            if tempzipfile is not None and os.path.exists(tempzipfile):
-                os.remove(tempzipfile)
-            try:
-                archivecontents.close()
-            except:
-                pass
+        if path is None:
+            return archive
+
+        with open(path, 'wb') as f:
+            for chunk in archive:
+                f.write(chunk)
 
     ###########################################################################
 
@@ -1112,7 +1139,7 @@ def scan_languages(sender, instance, created=False, raw=False, **kwargs):
     if not created or raw:
         return
 
-    for language in Language.objects.iterator():
+    for language in get_project_languages(instance):
         create_translation_project(language, instance)
 
 post_save.connect(scan_languages, sender=Project)
@@ -1126,3 +1153,20 @@ def scan_projects(sender, instance, created=False, raw=False, **kwargs):
         create_translation_project(instance, project)
 
 post_save.connect(scan_projects, sender=Language)
+
+
+def update_last_submission(sender, instance, created=False, raw=False,
+                           **kwargs):
+    if not created or raw:
+        return
+
+    TranslationProject.objects.filter(id=instance.translation_project_id) \
+                              .update(last_submission=instance)
+
+    if instance.unit_id is not None:
+        pootle_path = instance.unit.store.pootle_path
+    else:
+        pootle_path = instance.translation_project.pootle_path
+    Directory.objects.update_activity(pootle_path, submission=instance)
+
+post_save.connect(update_last_submission, sender=Submission)
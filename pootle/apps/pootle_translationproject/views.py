@@ -27,13 +27,11 @@ from itertools import groupby
 from django import forms
 from django.conf import settings
 from django.contrib import messages
-from django.core.cache import cache
 from django.core.exceptions import PermissionDenied
 from django.core.urlresolvers import reverse
 from django.http import HttpResponse, HttpResponseRedirect
 from django.shortcuts import get_object_or_404, render_to_response
 from django.template import loader, RequestContext
-from django.utils.encoding import iri_to_uri
 from django.utils.translation import ugettext as _
 from django.views.decorators.http import require_POST
 
@@ -47,8 +45,7 @@ from pootle.scripts.actions import (EXTDIR, StoreAction,
 from pootle_app.models.permissions import check_permission
 from pootle_app.models.signals import post_file_upload
 from pootle_app.models import Directory
-from pootle_app.project_tree import (ensure_target_dir_exists,
-                                     direct_language_match_filename)
+from pootle_app.project_tree import direct_language_match_filename
 from pootle_app.views.admin.permissions import admin_permissions as admin_perms
 from pootle_app.views.top_stats import gentopstats_translation_project
 from pootle_misc.baseurl import redirect
@@ -56,7 +53,7 @@ from pootle_misc.browser import get_children, get_table_headings
 from pootle_misc.checks import get_quality_check_failures
 from pootle_misc.stats import (get_raw_stats, get_translation_stats,
                                get_path_summary)
-from pootle_misc.util import jsonify, ajax_required
+from pootle_misc.util import jsonify, ajax_required, get_content_disposition
 from pootle_profile.models import get_profile
 from pootle_statistics.models import Submission, SubmissionTypes
 from pootle_store.models import Store
@@ -65,6 +62,7 @@ from pootle_store.util import (absolute_real_path, relative_real_path,
 from pootle_store.filetypes import factory_classes
 from pootle_store.views import get_step_query
 from pootle_tagging.forms import TagForm
+from pootle_translationproject.export import archive_response
 from pootle_translationproject.forms import (DescriptionForm,
                                              upload_form_factory)
 
@@ -396,9 +394,9 @@ def overview(request, translation_project, dir_path, filename=None):
                     export_path = action.get_download(path_obj)
                     if export_path:
                         response = HttpResponse('/export/' + export_path)
-                        response['Content-Disposition'] = (
-                                'attachment; filename="%s"' %
-                                os.path.basename(export_path))
+                        response['Content-Disposition'] = \
+                                get_content_disposition(
+                                    os.path.basename(export_path))
                         return response
 
                 if not action_output:
@@ -663,24 +661,13 @@ def export_zip(request, translation_project, file_path):
         archivename += '-' + file_path.replace('/', '-')
 
     archivename += '.zip'
-    export_path = os.path.join('POOTLE_EXPORT', translation_project.real_path,
-                               archivename)
-    abs_export_path = absolute_real_path(export_path)
 
-    key = iri_to_uri("%s:export_zip" % pootle_path)
-    last_export = cache.get(key)
+    stores = translation_project.stores.filter(
+        pootle_path__startswith=pootle_path,
+    ).exclude(file='')
 
-    if (not (last_export and last_export == translation_project.get_mtime() and
-        os.path.isfile(abs_export_path))):
-
-        ensure_target_dir_exists(abs_export_path)
-        stores = Store.objects.filter(pootle_path__startswith=pootle_path) \
-                              .exclude(file='')
-        translation_project.get_archive(stores, abs_export_path)
-        cache.set(key, translation_project.get_mtime(),
-                  settings.OBJECT_CACHE_TIMEOUT)
-
-    return redirect('/export/' + export_path)
+    return archive_response(translation_project.get_archive(stores),
+                            archivename)
 
 
 def unix_to_host_path(p):
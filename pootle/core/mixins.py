@@ -25,21 +25,49 @@ from django.db.models.signals import post_save
 class DirtyFieldsMixin(object):
     """Tracks dirty fields in a model.
 
+    The original values of the fields are kept when the instance is loaded
+    or saved, so they can be read back without querying the database again.
+    Models can restrict the tracked fields by listing their names in
+    :attr:`tracked_fields`. Relation fields are only tracked when listed
+    there, and their values are keyed by the field's ``attname``.
+
     Initial code borrowed from django-dirtyfields, which is
     Copyright (c) Praekelt Foundation and individual contributors
     """
+    #: Names of the fields to track, defaults to all the local fields which
+    #: aren't relations
+    tracked_fields = None
+
     def __init__(self, *args, **kwargs):
         super(DirtyFieldsMixin, self).__init__(*args, **kwargs)
-        post_save.connect(
-            reset_state, sender=self.__class__,
-            dispatch_uid='%s-DirtyFieldsMixin-sweeper' %
-                self.__class__.__name__,
-        )
-        reset_state(sender=self.__class__, instance=self)
+        cls = self.__class__
+        if '_dirty_fields_names' not in cls.__dict__:
+            # Connecting the sweeper is only needed once per model
+            post_save.connect(
+                reset_state, sender=cls,
+                dispatch_uid='%s-DirtyFieldsMixin-sweeper' % cls.__name__,
+            )
+            if cls.tracked_fields is None:
+                cls._dirty_fields_names = [f.attname
+                                           for f in cls._meta.local_fields
+                                           if not f.rel]
+            else:
+                cls._dirty_fields_names = [f.attname
+                                           for f in cls._meta.local_fields
+                                           if f.name in cls.tracked_fields]
+        reset_state(sender=cls, instance=self)
 
     def _as_dict(self):
-        return dict([(f.name, self.__dict__[f.name])
-                     for f in self._meta.local_fields if not f.rel])
+        # Deferred fields aren't loaded yet, so they can't be tracked
+        return dict([(name, self.__dict__[name])
+                     for name in self._dirty_fields_names
+                     if name in self.__dict__])
+
+    def get_original_value(self, name):
+        """Returns the value the field with attribute name `name` had when
+        the instance was last loaded or saved.
+        """
+        return self._original_state[name]
 
     def get_dirty_fields(self):
         new_state = self._as_dict()
@@ -67,3 +67,19 @@ def get_editor_filter(state=None, check=None, user=None):
         filter_string = '#filter=checks&checks=%s' % check
 
     return filter_string
+
+
+def get_ancestor_paths(pootle_path):
+    """Returns the paths of the directories containing `pootle_path`.
+
+    The path itself is included if it's a directory. For paths within a
+    translation project, the project's directory is included too.
+    """
+    parts = pootle_path.split(u'/')[:-1]
+    paths = [u'/'.join(parts[:i]) + u'/' for i in range(1, len(parts) + 1)]
+
+    language_code, project_code = split_pootle_path(pootle_path)[:2]
+    if language_code and project_code:
+        paths.append(u'/projects/%s/' % project_code)
+
+    return paths
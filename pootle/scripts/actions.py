@@ -79,13 +79,10 @@ import shutil
 import sys
 from urllib import unquote_plus, urlencode
 
-from django.conf import settings
-from django.core.cache import cache
-from django.utils.encoding import iri_to_uri
 from django.utils.translation import ugettext as _
 
 from pootle_app.models.permissions import check_permission
-from pootle_app.project_tree import ensure_target_dir_exists
+from pootle_misc import exportcache
 from pootle_misc.baseurl import l
 from pootle_store.util import absolute_real_path, relative_real_path
 
@@ -523,23 +520,18 @@ class DownloadAction(ExtensionAction):
         export_path = os.path.join('POOTLE_EXPORT', filename)
         abs_export_path = absolute_real_path(export_path)
         try:
-            ensure_target_dir_exists(abs_export_path)
-            shutil.copyfile(filepath, abs_export_path)
+            exportcache.store_artifact(
+                export_path, exportcache.get_generation(path_obj),
+                lambda path: shutil.copyfile(filepath, path),
+            )
         except (IOError, OSError, shutil.Error), e:
             msg = (_("Failed to copy download file to export directory %s") %
                    abs_export_path)
             logger.exception('%s', msg)
             return ''.join([msg, ": ", str(e)])
-        cache.set(self._cache_key(path_obj), path_obj.get_mtime(),
-                  settings.OBJECT_CACHE_TIMEOUT)
         self._dl_path[path_obj.pootle_path] = export_path
         return ''
 
-    def _cache_key(self, path_obj):
-        """Return cache key for download data"""
-        return iri_to_uri("%s:export_action" %
-                          self._query_url(path_obj.pootle_path))
-
     def get_download(self, path_obj):
         """Return export path of generated (cached) download"""
         return self._dl_path.get(path_obj.pootle_path, None)
@@ -561,13 +553,10 @@ class DownloadAction(ExtensionAction):
             link = {'text': _(self.title),
                     'icon': getattr(self, 'icon', 'icon-download')}
             export_path = self.get_download(path_obj)
-            if export_path:
-                abs_export_path = absolute_real_path(export_path)
-                last_export = cache.get(self._cache_key(path_obj))
-                if last_export and (last_export == path_obj.get_mtime() and
-                                    os.path.isfile(abs_export_path)):
-                    # valid and up-to-date cache file - link to that
-                    link['href'] = l("/export/" + export_path)
+            if export_path and exportcache.get_artifact(
+                    export_path, exportcache.get_generation(path_obj)):
+                # valid and up-to-date cache file - link to that
+                link['href'] = l("/export/" + export_path)
             if 'href' not in link:
                 # no usable cache file, link to action query to generate it
                 link['href'] = l(self._query_url(path_obj.pootle_path))
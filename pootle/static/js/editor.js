@@ -22,6 +22,8 @@
     this.currentPage = 1;
     this.currentNumPages = 0;
     this.pagesGot = {};
+    this.editUnits = {};
+    this.prefetchQty = 3;
     this.filter = 'all';
     this.checks = [];
     this.user = null;
@@ -900,6 +902,11 @@
       // We don't know the page number beforehand —
       // delete the parameter as it's useless
       delete extraData.page
+    } else if (!opts.pager && (opts.page - 1) in this.pagesGot) {
+      // Request the units following the last one from the previous page,
+      // so the server doesn't need to skip over all the preceding pages
+      var previous = this.pagesGot[opts.page - 1];
+      extraData.after = previous[previous.length - 1];
     }
     reqData = $.extend(extraData, this.getReqData());
 
@@ -916,6 +923,7 @@
 
           // Clear old data and add new results
           PTL.editor.pagesGot = {};
+          PTL.editor.editUnits = {};
           PTL.editor.units.reset();
           PTL.editor.updatePager(data.pager);
         }
@@ -1230,28 +1238,37 @@
         editUrl = l(['/xhr/units/', uid, '/edit/'].join('')),
         reqData = this.getReqData(),
         widget = '',
-        ctx = {before: [], after: []};
+        ctx = {before: [], after: []},
+        processData = function (data) {
+          widget = data['editor'];
+          // Update pager in case it's needed
+          PTL.editor.updatePager(PTL.editor.createPager(uid));
+
+          if (data.ctx) {
+            // Initialize context gap to the maximum context rows available
+            PTL.editor.ctxGap = Math.max(data.ctx.before.length,
+                                         data.ctx.after.length);
+            ctx.before = data.ctx.before;
+            ctx.after = data.ctx.after;
+          }
+        };
 
-    $.ajax({
-      url: editUrl,
-      async: false,
-      data: reqData,
-      dataType: 'json',
-      success: function (data) {
-        widget = data['editor'];
-        // Update pager in case it's needed
-        PTL.editor.updatePager(PTL.editor.createPager(uid));
-
-        if (data.ctx) {
-          // Initialize context gap to the maximum context rows available
-          PTL.editor.ctxGap = Math.max(data.ctx.before.length,
-                                       data.ctx.after.length);
-          ctx.before = data.ctx.before;
-          ctx.after = data.ctx.after;
-        }
-      },
-      error: PTL.editor.error
-    });
+    if (uid in this.editUnits) {
+      // Prefetched widgets are only used once, as the unit might change
+      processData(this.editUnits[uid]);
+      delete this.editUnits[uid];
+    } else {
+      $.ajax({
+        url: editUrl,
+        async: false,
+        data: reqData,
+        dataType: 'json',
+        success: processData,
+        error: PTL.editor.error
+      });
+    }
+
+    this.prefetchEditUnits();
 
     eClass += currentUnit.get('isfuzzy') ? " fuzzy-unit" : "";
 
@@ -1270,6 +1287,34 @@
     return editUnit;
   },
 
+  /* Fetches in the background the edit widgets for the units following
+   * the current one, so moving forward doesn't need to wait for them */
+  prefetchEditUnits: function () {
+    var i, unit,
+        index = this.units.indexOf(this.units.getCurrent()),
+        uids = [];
+
+    for (i=index+1; i<this.units.length && uids.length<this.prefetchQty; i++) {
+      unit = this.units.at(i);
+      if (!(unit.id in this.editUnits)) {
+        uids.push(unit.id);
+      }
+    }
+
+    if (!uids.length) {
+      return;
+    }
+
+    $.ajax({
+      url: l('/xhr/units/edit/'),
+      data: $.extend({uids: uids.join(',')}, this.getReqData()),
+      dataType: 'json',
+      success: function (data) {
+        $.extend(PTL.editor.editUnits, data);
+      }
+    });
+  },
+
   /* Pushes translation submissions and moves to the next unit */
   submit: function (e) {
     e.preventDefault();